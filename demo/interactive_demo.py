@@ -2,6 +2,7 @@ import chess
 import time
 from typing import Dict, List
 import json
+from src.engine_pool import close_all_pools
 from src.memory_extractor import StockfishMemoryExtractor
 from src.memory_tokenizer import MemoryTokenizer
 from src.chess_agents import StudentAgent
@@ -279,9 +280,7 @@ class InteractiveMemoryDemo:
         try:
             if hasattr(self, 'extractor'):
                 try:
-                    self.extractor.engine.quit()
-                except chess.engine.EngineTerminatedError:
-                    pass
+                    close_all_pools()
                 except Exception as e:
                     print(f"Engine cleanup warning: {e}")
         except Exception as e:
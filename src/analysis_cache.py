@@ -0,0 +1,117 @@
+import chess
+import chess.polyglot
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+class AnalysisCache:
+    """Persistent, size-bounded cache of engine analyses
+
+    Entries are keyed by the position's Zobrist hash and the multipv count,
+    so transpositions and repeated opening positions share one entry. Each
+    entry remembers the depth it was searched to; a lookup hits when the
+    stored depth is equal to or greater than the requested depth.
+    """
+
+    def __init__(self, filename: Optional[str] = None, max_entries: int = 100000):
+        """Create the cache, loading existing entries from filename if present"""
+        self.filename = filename
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if filename and os.path.exists(filename):
+            self.load(filename)
+
+    def _key(self, board: chess.Board, multipv: int) -> str:
+        """Cache key for a position and multipv count"""
+        return f"{chess.polyglot.zobrist_hash(board):016x}:{multipv}"
+
+    def get(self, board: chess.Board, depth: int, multipv: int) -> Optional[Dict]:
+        """Return the cached analysis if it was searched at least this deep"""
+        key = self._key(board, multipv)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["depth"] < depth:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry["analysis"]
+
+    def put(self, board: chess.Board, depth: int, multipv: int, analysis: Dict):
+        """Store an analysis unless a deeper one is already cached"""
+        key = self._key(board, multipv)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry["depth"] > depth:
+                self.entries.move_to_end(key)
+                return
+
+            self.entries[key] = {"depth": depth, "analysis": analysis}
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_stats(self) -> Dict:
+        """Get cache hit/miss statistics"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def save(self, filename: Optional[str] = None):
+        """Write the cache to disk in LRU order (oldest first)"""
+        filename = filename or self.filename
+        if not filename:
+            return
+
+        with self._lock:
+            data = {
+                "max_entries": self.max_entries,
+                "entries": list(self.entries.items())
+            }
+
+        # Write to a temporary file first so a crash never leaves a torn cache
+        temp_path = filename + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, filename)
+
+    def load(self, filename: str):
+        """Load cache entries from disk"""
+        try:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Failed to load analysis cache {filename}: {e}")
+            return
+
+        with self._lock:
+            self.entries = OrderedDict(data.get("entries", []))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
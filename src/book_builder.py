@@ -0,0 +1,241 @@
+import chess
+import chess.pgn
+import chess.polyglot
+import heapq
+import os
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+ENTRY_FORMAT = '>QHHI'  # Polyglot entry: key, move, weight, learn
+RUN_FORMAT = '>QHI'     # Spill run record: key, move, summed weight
+RUN_RECORD_SIZE = struct.calcsize(RUN_FORMAT)
+MAX_WEIGHT = 0xFFFF
+
+# Points per move for the side that played it
+RESULT_WEIGHTS = {
+    '1-0': (2, 0),
+    '0-1': (0, 2),
+    '1/2-1/2': (1, 1)
+}
+
+def encode_polyglot_move(board: chess.Board, move: chess.Move) -> int:
+    """Polyglot move encoding: to | from << 6 | promotion << 12
+
+    Castling is stored as the king capturing its own rook, as the format
+    requires; promotions are numbered knight=1 .. queen=4.
+    """
+    to_square = move.to_square
+    if board.is_castling(move):
+        rook_file = 7 if board.is_kingside_castling(move) else 0
+        to_square = chess.square(rook_file, chess.square_rank(move.from_square))
+    promotion = move.promotion - 1 if move.promotion else 0
+    return to_square | (move.from_square << 6) | (promotion << 12)
+
+def _entry_pair(board: chess.Board, move: chess.Move) -> int:
+    """Pack a position and move into one key << 16 | move integer"""
+    return (chess.polyglot.zobrist_hash(board) << 16) | encode_polyglot_move(board, move)
+
+class _BookVisitor(chess.pgn.BaseVisitor):
+    """Streams (key, move, weight) entries out of one PGN game
+
+    No game tree is built. Variations are skipped and moves past max_ply are
+    not even parsed, so the cost of a game is bounded by the book depth.
+    Entries are held until the game ends, so a game with an illegal or
+    unparsable move is left out of the book entirely.
+    """
+
+    def __init__(self, builder: 'PolyglotBookBuilder'):
+        self.builder = builder
+        self.weights = (1, 1)
+        self.ply = 0
+        self.skip = False
+        self.error = None
+        self.entries = []
+
+    def begin_headers(self):
+        return None
+
+    def visit_header(self, tagname: str, tagvalue: str):
+        if tagname == 'Result':
+            self.weights = RESULT_WEIGHTS.get(tagvalue, (1, 1))
+        elif tagname == 'Variant' and tagvalue.lower() not in ('standard', 'chess', ''):
+            self.skip = True
+
+    def begin_variation(self):
+        return chess.pgn.SKIP
+
+    def begin_parse_san(self, board: chess.Board, san: str):
+        if self.skip or self.error is not None or self.ply >= self.builder.max_ply:
+            return chess.pgn.SKIP
+        return None
+
+    def visit_move(self, board: chess.Board, move: chess.Move):
+        weight = self.weights[0] if board.turn == chess.WHITE else self.weights[1]
+        if weight > 0:
+            self.entries.append((_entry_pair(board, move), weight))
+        self.ply += 1
+
+    def handle_error(self, error: Exception):
+        # The default re-raises, which would abort the whole build
+        if self.error is None:
+            self.error = error
+
+    def result(self):
+        if self.error is not None:
+            print(f"Skipping game after PGN error: {self.error}")
+            self.builder.games_skipped += 1
+            return False
+        for pair, weight in self.entries:
+            self.builder._add_pair(pair, weight)
+        return True
+
+class PolyglotBookBuilder:
+    """Builds sorted, merged Polyglot (.bin) books from PGN corpora
+
+    Games are streamed one at a time and (key, move) weights are summed in a
+    dictionary. When it holds max_entries pairs it is written to disk as a
+    sorted run, so memory stays bounded however large the corpus is. build()
+    k-way merges the runs, sums duplicate pairs and writes entries sorted by
+    key, which is what binary-searching readers (PolyglotBook) rely on.
+    """
+
+    def __init__(self, max_ply: int = 24, max_entries: int = 1000000,
+                 temp_dir: Optional[str] = None):
+        """Configure book depth, in-memory limit and spill directory"""
+        self.max_ply = max_ply
+        self.max_entries = max_entries
+        self.temp_dir = temp_dir
+        self.entries = {}  # key << 16 | move -> summed weight
+        self.runs: List[str] = []
+        self.games_read = 0
+        self.games_skipped = 0
+
+    def add_entry(self, board: chess.Board, move: chess.Move, weight: int = 1):
+        """Add weight to a position/move pair"""
+        self._add_pair(_entry_pair(board, move), weight)
+
+    def _add_pair(self, pair: int, weight: int):
+        """Add weight to an encoded key << 16 | move pair"""
+        self.entries[pair] = self.entries.get(pair, 0) + weight
+        if len(self.entries) >= self.max_entries:
+            self._spill()
+
+    def add_pgn(self, path: str) -> int:
+        """Stream every valid game of a PGN file into the book"""
+        games = 0
+        with open(path, encoding='utf-8', errors='replace') as handle:
+            while True:
+                added = chess.pgn.read_game(handle, Visitor=lambda: _BookVisitor(self))
+                if added is None:
+                    break
+                if added:
+                    games += 1
+        self.games_read += games
+        return games
+
+    def _spill(self):
+        """Write the in-memory pairs to disk as a sorted run"""
+        if not self.entries:
+            return
+        fd, path = tempfile.mkstemp(suffix='.run', dir=self.temp_dir)
+        pack = struct.Struct(RUN_FORMAT).pack
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b''.join(
+                pack(pair >> 16, pair & 0xFFFF, min(weight, 0xFFFFFFFF))
+                for pair, weight in sorted(self.entries.items())
+            ))
+        self.runs.append(path)
+        self.entries = {}
+
+    def build(self, output: str, pgn_paths: Iterable[str] = (), workers: int = 1) -> int:
+        """Read pgn_paths, merge everything and write the book; returns entry count
+
+        With workers > 1 each PGN file is read by its own process, which
+        leaves its pairs in sorted runs that are merged here.
+        """
+        pgn_paths = list(pgn_paths)
+        if workers > 1 and len(pgn_paths) > 1:
+            self._spill()
+            options = (self.max_ply, self.max_entries, self.temp_dir)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for games, skipped, runs in executor.map(_collect_runs, pgn_paths, [options] * len(pgn_paths)):
+                    self.games_read += games
+                    self.games_skipped += skipped
+                    self.runs.extend(runs)
+        else:
+            for path in pgn_paths:
+                self.add_pgn(path)
+
+        try:
+            if self.runs:
+                self._spill()
+                merged = heapq.merge(*(_iter_run(path) for path in self.runs))
+            else:
+                merged = ((pair >> 16, pair & 0xFFFF, weight)
+                          for pair, weight in sorted(self.entries.items()))
+            return _write_book(output, _sum_pairs(merged))
+        finally:
+            for path in self.runs:
+                os.remove(path)
+            self.runs = []
+            self.entries = {}
+
+def _collect_runs(path: str, options: Tuple) -> Tuple[int, int, List[str]]:
+    """Worker: read one PGN file into sorted runs"""
+    max_ply, max_entries, temp_dir = options
+    builder = PolyglotBookBuilder(max_ply, max_entries, temp_dir)
+    games = builder.add_pgn(path)
+    builder._spill()
+    return games, builder.games_skipped, builder.runs
+
+def _iter_run(path: str, chunk_records: int = 65536) -> Iterator[Tuple[int, int, int]]:
+    """Stream (key, move, weight) records from a run file"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(RUN_RECORD_SIZE * chunk_records)
+            if not chunk:
+                return
+            yield from struct.iter_unpack(RUN_FORMAT, chunk)
+
+def _sum_pairs(records: Iterator[Tuple[int, int, int]]) -> Iterator[Tuple[int, int, int]]:
+    """Sum the weights of equal, adjacent (key, move) pairs in a sorted stream"""
+    current, total = None, 0
+    for key, move, weight in records:
+        if (key, move) == current:
+            total += weight
+            continue
+        if current is not None:
+            yield current[0], current[1], total
+        current, total = (key, move), weight
+    if current is not None:
+        yield current[0], current[1], total
+
+def _write_book(output: str, records: Iterator[Tuple[int, int, int]]) -> int:
+    """Write merged (key, move, weight) records as Polyglot entries
+
+    Weights of one position are scaled together when the largest does not
+    fit in 16 bits, keeping the relative order of its moves.
+    """
+    pack = struct.Struct(ENTRY_FORMAT).pack
+    written = 0
+
+    def flush(f, group):
+        nonlocal written
+        largest = max(weight for _, _, weight in group)
+        scale = MAX_WEIGHT / largest if largest > MAX_WEIGHT else 1
+        for key, move, weight in group:
+            f.write(pack(key, move, max(1, int(weight * scale)), 0))
+        written += len(group)
+
+    with open(output, 'wb') as f:
+        group = []
+        for record in records:
+            if group and record[0] != group[0][0]:
+                flush(f, group)
+                group = []
+            group.append(record)
+        if group:
+            flush(f, group)
+    return written
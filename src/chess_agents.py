@@ -1,49 +1,132 @@
 import time
 import json
+import os
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 import chess
+import chess.engine
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 
+from src.position_index import (
+    ZobristMoveIndex,
+    en_passant_keys,
+    ep_squares_from_fens,
+    position_key,
+    zobrist_keys,
+)
+from src.evaluation import BitboardEvaluator
+from src.knowledge_store import KnowledgeStore, confidence_from_counts
+from src.engine_pool import EnginePool
+from src.history import HistoryBuffer
+from src.limit_strategy import FixedLimit
+from src.memory_format import FLAG_TURN, BinaryMemoryPackage, decode_evaluations, decode_moves, encode_move
+from src.memory_tokenizer import MemoryTokenizer
+from src.pattern_memory import PatternMemory, pattern_key
+from src.records import LearningRecord
+from src.opening_book import OpeningBook, PolyglotBook
+from src.search import AlphaBetaSearch
+from src.similarity import PositionSimilarityIndex, board_bitboards
+
 class BaseAgent(ABC):
-    def __init__(self, name):
+    def __init__(self, name, store_fen_keys: bool = False, history_size: Optional[int] = 10000,
+                 history_dir: Optional[str] = None):
+        """store_fen_keys: also keep FEN-keyed dicts of learned positions;
+        history_size: entries kept per history; with history_dir older
+        entries are spilled to <history_dir>/<name>_<history>.ndjson"""
         self.name = name
+        self.history_size = history_size
+        self.history_dir = history_dir
         self.position_memory = {}
+        self.position_index = ZobristMoveIndex()
+        # FEN-keyed dicts (position_memory, and a student's evaluations and
+        # confidence scores) are only filled for callers that read them
+        # directly; lookups go through the Zobrist index either way
+        self.store_fen_keys = store_fen_keys
         self.game_sequences = []
-        self.move_history = []
+        self._histories: List[HistoryBuffer] = []
+        self.move_history = self._new_history('moves')
+
+    def _new_history(self, kind: str, **aggregates) -> HistoryBuffer:
+        """Bounded history, spilled to history_dir if one is set"""
+        spill_path = None
+        if self.history_dir:
+            os.makedirs(self.history_dir, exist_ok=True)
+            spill_path = os.path.join(self.history_dir, f"{self.name}_{kind}.ndjson".replace(' ', '_'))
+        history = HistoryBuffer(self.history_size, spill_path, **aggregates)
+        self._histories.append(history)
+        return history
+        
+    def remember_move(self, position: str, move: str, board: Optional[chess.Board] = None):
+        """Store a move for a position in memory"""
+        if self.store_fen_keys:
+            self.position_memory[position] = move
+        if board is None:
+            board = chess.Board(position)
+        self.position_index.add(position_key(board), move)
+        
+    def get_move_from_memory(self, position: str, board: Optional[chess.Board] = None) -> Optional[str]:
+        """Get a move from memory for a given position
         
-    def get_move_from_memory(self, position: str) -> Optional[str]:
-        """Get a move from memory for a given position"""
-        return self.position_memory.get(position)
+        Positions match by Zobrist hash, so transpositions and positions with
+        different move counters share the same memory.
+        """
+        if board is None:
+            board = chess.Board(position)
+        return self.position_index.get(position_key(board))
     
     def get_stats(self) -> Dict:
         """Get basic agent statistics"""
         return {
             'name': self.name,
-            'total_positions': len(self.position_memory),
+            'total_positions': len(self.position_index),
             'total_sequences': len(self.game_sequences),
-            'total_moves': len(self.move_history)
+            'total_moves': self.move_history.total
         }
 
+    def close(self):
+        """Close the history spill files"""
+        for history in self._histories:
+            history.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
 class TeacherAgent(BaseAgent):
-    def __init__(self, name, engine):
-        super().__init__(name)
-        self.engine = engine
-        self.teaching_history = []
+    def __init__(self, name, engine, limit_strategy=None, **history_options):
+        """engine: an EnginePool, a ChessEnvironment (its pool is used) or a
+        python-chess engine
+        limit_strategy: how long to search each position (FixedLimit or
+        AdaptiveLimit from src.limit_strategy); depth 20 by default"""
+        super().__init__(name, **history_options)
+        self.engine = getattr(engine, 'pool', engine)
+        self.limit_strategy = limit_strategy or FixedLimit(depth=20)
+        self.teaching_history = self._new_history('teaching', distinct_fields=('student',))
         
     def calculate_best_move(self, position: str) -> Optional[str]:
         """Calculate best move using the engine"""
+        return self._analyse_position(chess.Board(position))[0]
+
+    def _analyse_position(self, board: chess.Board) -> Tuple[Optional[str], Optional[float]]:
+        """Best move and evaluation (pawns, side to move) under the limit strategy"""
         try:
-            board = chess.Board(position)
-            result = self.engine.play(board, chess.engine.Limit(depth=20))
-            return result.move.uci() if result.move else None
+            result = self.limit_strategy.instant_move(board)
+            if result is None:
+                if isinstance(self.engine, EnginePool):
+                    result = self.engine.run(lambda engine: self.limit_strategy.search(engine, board))
+                else:
+                    result = self.limit_strategy.search(self.engine, board)
+            return result.move, result.evaluation
         except Exception as e:
             print(f"Error calculating best move: {e}")
-            return None
+            return None, None
         
     def record_move(self, position: str, move: str):
         """Record a move in memory"""
-        self.position_memory[position] = move
+        self.remember_move(position, move)
         self.move_history.append({
             'position': position,
             'move': move,
@@ -52,10 +135,10 @@ class TeacherAgent(BaseAgent):
 
     def teach(self, student, position: str) -> Optional[str]:
         """Teach a move to a student"""
-        move = self.calculate_best_move(position)
+        move, evaluation = self._analyse_position(chess.Board(position))
         if move:
             self.record_move(position, move)
-            student.learn(position, move)
+            student.learn(position, move, evaluation)
             
             self.teaching_history.append({
                 'student': student.name,
@@ -65,27 +148,95 @@ class TeacherAgent(BaseAgent):
             })
             
         return move
+
+    def teach_batch(self, students: List['StudentAgent'], positions: List[str],
+                    workers: Optional[int] = None) -> Dict[str, Optional[str]]:
+        """Teach a curriculum of positions to a cohort of students
+        
+        Positions are deduplicated by Zobrist key and each unique position
+        is analysed once. With an EnginePool the analyses run on up to
+        workers engines at a time (default: the pool size). Every student
+        then learns all results in one learn_batch call. Returns the move
+        taught for each position (None where the engine found none).
+        """
+        start_time = time.time()
+        unique = {}
+        position_keys = []
+        for position in positions:
+            board = chess.Board(position)
+            key = position_key(board)
+            position_keys.append(key)
+            unique.setdefault(key, (position, board))
+        
+        boards = [board for _, board in unique.values()]
+        self.limit_strategy.start_session(len(boards))
+        if workers is None:
+            workers = self.engine.size if isinstance(self.engine, EnginePool) else 1
+        if workers > 1 and len(boards) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                analyses = list(executor.map(self._analyse_position, boards))
+        else:
+            analyses = [self._analyse_position(board) for board in boards]
+        
+        taught_positions, taught_moves, evaluations = [], [], []
+        moves_by_key = {}
+        for key, (position, board), (move, evaluation) in zip(unique, unique.values(), analyses):
+            moves_by_key[key] = move
+            if move:
+                self.record_move(position, move)
+                taught_positions.append(position)
+                taught_moves.append(move)
+                evaluations.append(evaluation)
+        
+        timestamp = time.time()
+        for student in students:
+            student.learn_batch(taught_positions, taught_moves, evaluations)
+            self.teaching_history.extend(
+                {'student': student.name, 'position': position, 'move': move, 'timestamp': timestamp}
+                for position, move in zip(taught_positions, taught_moves)
+            )
+        
+        print(f"Taught {len(taught_positions)} unique positions ({len(positions)} given) "
+              f"to {len(students)} students in {time.time() - start_time:.2f}s")
+        return {position: moves_by_key[key] for position, key in zip(positions, position_keys)}
     
     def get_teaching_stats(self) -> Dict:
         """Get detailed teaching statistics"""
         return {
             **self.get_stats(),
-            'students_taught': len(set(h['student'] for h in self.teaching_history)),
-            'total_lessons': len(self.teaching_history),
-            'last_teaching': self.teaching_history[-1] if self.teaching_history else None
+            'students_taught': self.teaching_history.distinct_count('student'),
+            'total_lessons': self.teaching_history.total,
+            'last_teaching': self.teaching_history.last,
+            'search_stats': self.limit_strategy.get_stats()
         }
 
 class StudentAgent(BaseAgent):
-    def __init__(self, name):
-        super().__init__(name)
+    def __init__(self, name, store_fen_keys: bool = False, **history_options):
+        super().__init__(name, store_fen_keys, **history_options)
         self.learned_moves = 0
-        self.learning_history = []
+        self.learning_history = self._new_history('learning', sum_fields=('positions',))
         self.position_evaluations = {}
         self.confidence_scores = {}
-        self.pattern_memory = {}
+        self.confidence_total = 0.0
+        self.pattern_memory = PatternMemory()
         self.position_history = {}
         self.draw_threshold = 3
         self.current_opening = "Unknown"
+        self.knowledge: Optional[KnowledgeStore] = None
+        self.tokenizer = MemoryTokenizer()
+        # Nearest learned position for memory misses; a quiet move is 2 bits
+        self.similarity = PositionSimilarityIndex()
+        self.similarity_max_distance = 6
+        self.evaluator = BitboardEvaluator()
+        # Fallback search for positions missing from book and memory;
+        # learned moves are tried first as hash moves
+        self.search = AlphaBetaSearch(
+            self._evaluate_position,
+            max_depth=4,
+            time_limit=0.25,
+            hash_move_provider=self._learned_move,
+            evaluator=BitboardEvaluator()
+        )
         self.opening_knowledge = {
             "Ruy Lopez": [
                 ("e2e4", "e7e5"),
@@ -103,51 +254,150 @@ class StudentAgent(BaseAgent):
                 ("e4e5", None)
             ]
         }
+        self.opening_book = OpeningBook.from_opening_knowledge(self.opening_knowledge)
+        self.polyglot_book = None
 
     def reset_game(self):
         """Reset game state"""
-        self.move_history = []
+        self.move_history.clear()
         self.position_history = {}
         self.current_opening = "Unknown"
 
+    def attach_knowledge(self, knowledge) -> bool:
+        """Use a shared, read-only KnowledgeStore as a second memory tier
+        
+        knowledge is a KnowledgeStore, a store file path or the name of a
+        shared memory block created with KnowledgeStore.create.
+        """
+        try:
+            if isinstance(knowledge, str):
+                if os.path.exists(knowledge):
+                    knowledge = KnowledgeStore.open(knowledge)
+                else:
+                    knowledge = KnowledgeStore.attach(knowledge)
+            self.knowledge = knowledge
+            return True
+        except Exception as e:
+            print(f"Failed to attach knowledge {knowledge}: {e}")
+            return False
+
+    def _learned_move(self, key: int) -> Optional[str]:
+        """Move for a position key from own memory, then shared knowledge"""
+        move = self.position_index.get(key)
+        if move is None and self.knowledge is not None:
+            move = self.knowledge.get_move(key)
+        return move
+
     def learn_from_tokenized_memory(self, tokenized_package: Dict):
         """Learn from tokenized memory package"""
         print(f"\n{self.name} starting to learn...")
         start_time = time.time()
         
-        success_count = 0
-        for key, tokens in tokenized_package["tokenized_memories"].items():
-            try:
-                position = tokens["metadata"]["original_position"]
-                move_tokens = tokens["move_tokens"]
-                move = self._decode_move(move_tokens)
-                
-                self.position_memory[position] = move
-                self.position_evaluations[position] = self._decode_evaluation(tokens["evaluation_token"])
-                self._learn_position_pattern(tokens["position_tokens"], move_tokens, tokens["evaluation_token"])
-                self.confidence_scores[position] = self._calculate_confidence(position, move)
-                
-                self.learning_history.append({
-                    'position': position,
-                    'move': move,
-                    'confidence': self.confidence_scores[position],
-                    'timestamp': time.time()
-                })
-                
-                success_count += 1
-                self.learned_moves += 1
-                
-            except Exception as e:
-                print(f"Error learning position {key}: {e}")
-                continue
+        position_tokens, move_tokens, evaluation_tokens, fens = \
+            self.tokenizer.package_arrays(tokenized_package)
+        stats = self.learn_from_arrays(position_tokens, move_tokens, evaluation_tokens, fens)
         
         end_time = time.time()
         print(f"\nLearning completed!")
-        print(f"Successfully learned positions: {success_count}/{len(tokenized_package['tokenized_memories'])}")
+        print(f"Successfully learned positions: {stats['positions']}/{len(tokenized_package['tokenized_memories'])}")
         print(f"Learning duration: {end_time - start_time:.2f} seconds")
         
         return end_time - start_time
 
+    def learn_from_arrays(self, position_tokens: np.ndarray, move_tokens: np.ndarray,
+                          evaluation_tokens: np.ndarray, fens: Optional[List[str]] = None) -> LearningRecord:
+        """Bulk-learn (N, 775) position, (N, 5) move and (N, 4) evaluation tokens
+        
+        Keys, moves and evaluations are decoded in vectorized passes. FENs
+        are optional; they add en passant to the keys and fill the
+        FEN-keyed dicts.
+        """
+        start_time = time.time()
+        bitboards, turn, castling = self.tokenizer.position_features(position_tokens)
+        pattern_keys = zobrist_keys(bitboards, turn, castling)
+        keys = pattern_keys
+        if fens is not None:
+            keys = pattern_keys ^ en_passant_keys(bitboards, turn, ep_squares_from_fens(fens))
+        moves = self.tokenizer.moves_from_tokens(move_tokens)
+        evaluations = self.tokenizer.evaluations_from_tokens(evaluation_tokens)
+        self.similarity.add_many(bitboards, turn, moves)
+        return self._learn_columns(keys, pattern_keys, moves, evaluations, fens, start_time)
+
+    def learn_from_binary_package(self, binary_package: BinaryMemoryPackage) -> LearningRecord:
+        """Bulk-learn straight from the columns of a binary package"""
+        start_time = time.time()
+        pattern_keys = self.tokenizer.binary_position_keys(binary_package, en_passant=False)
+        keys = self.tokenizer.binary_position_keys(binary_package)
+        evaluations = decode_evaluations(binary_package.evaluation)
+        self.similarity.add_many(binary_package.bitboards,
+                                 (binary_package.flags & FLAG_TURN) != 0,
+                                 binary_package.best_move)
+        return self._learn_columns(keys, pattern_keys, binary_package.best_move, evaluations,
+                                   start_time=start_time)
+
+    def learn(self, position: str, move: str, evaluation: Optional[float] = None) -> LearningRecord:
+        """Learn a single move taught for a position"""
+        return self.learn_batch([position], [move], [evaluation], verbose=False)
+
+    def learn_batch(self, positions: List[str], moves: List[str],
+                    evaluations: Optional[List[Optional[float]]] = None,
+                    verbose: bool = True) -> LearningRecord:
+        """Learn taught moves for many FEN positions in one pass
+        
+        Goes through the same columns as package learning, so taught moves
+        update the index, pattern memory, similarity tier and statistics
+        together. Missing evaluations count as 0.
+        """
+        start_time = time.time()
+        if evaluations is None:
+            evaluations = [None] * len(positions)
+        boards = [chess.Board(position) for position in positions]
+        keys = np.array([position_key(board) for board in boards], dtype=np.uint64)
+        pattern_keys = np.array([pattern_key(board) for board in boards], dtype=np.uint64)
+        encoded_moves = np.array([encode_move(move) for move in moves], dtype=np.uint16)
+        evaluations = np.array([0.0 if e is None else e for e in evaluations], dtype=np.float64)
+        if boards:
+            self.similarity.add_many(np.array([board_bitboards(board) for board in boards]),
+                                     np.array([board.turn for board in boards]), encoded_moves)
+        return self._learn_columns(keys, pattern_keys, encoded_moves, evaluations,
+                                   list(positions), start_time, verbose)
+
+    def _learn_columns(self, keys: np.ndarray, pattern_keys: np.ndarray,
+                       moves: np.ndarray, evaluations: np.ndarray,
+                       fens: Optional[List[str]] = None,
+                       start_time: Optional[float] = None, verbose: bool = True) -> LearningRecord:
+        """Build every index from key, encoded move and evaluation columns"""
+        start_time = start_time or time.time()
+        count = len(keys)
+        if not count:
+            return LearningRecord(0, 0.0, 0.0, 0.0)
+        
+        self.position_index.add_many(keys, moves)
+        
+        # Patterns seen several times, in this or earlier batches, earn confidence
+        self.pattern_memory.add_many(pattern_keys, evaluations)
+        confidence = confidence_from_counts(self.pattern_memory.count_many(pattern_keys))
+        
+        if fens is not None and self.store_fen_keys:
+            self.position_memory.update(zip(fens, decode_moves(moves)))
+            self.position_evaluations.update(zip(fens, evaluations.tolist()))
+            self.confidence_scores.update(zip(fens, confidence.tolist()))
+        
+        self.confidence_total += float(confidence.sum())
+        self.learned_moves += count
+        seconds = time.time() - start_time
+        stats = LearningRecord(
+            positions=count,
+            seconds=seconds,
+            positions_per_second=count / seconds if seconds > 0 else float('inf'),
+            average_confidence=float(confidence.mean())
+        )
+        self.learning_history.append(stats)
+        if verbose:
+            print(f"Ingested {count} positions in {seconds:.2f}s "
+                  f"({stats.positions_per_second:.0f} positions/s)")
+        return stats
+
     def get_move(self, position: str) -> Optional[str]:
         """Get best move for the position"""
         if self.is_draw_by_repetition(position):
@@ -159,31 +409,83 @@ class StudentAgent(BaseAgent):
             self.reset_game()
         
         # 1. Check opening book
-        opening_move = self._get_opening_move(position)
+        opening_move = self._get_opening_move(position, board)
         if opening_move:
             self.make_move(position, opening_move)
             return opening_move
             
         # 2. Check learned memory
-        memory_move = self._get_memory_move(position)
+        memory_move = self._get_memory_move(position, board)
         if memory_move:
             self.make_move(position, memory_move)
             return memory_move
             
-        # 3. Calculate best move
-        best_move = self._calculate_best_move(board)
-        if best_move:
-            move_str = best_move.uci()
+        # 3. Check similar learned positions
+        similar_move = self._get_similar_move(board)
+        if similar_move:
+            self.make_move(position, similar_move)
+            return similar_move
+            
+        # 4. Calculate best move, 5. fall back to first legal move
+        move_str = self._search_move(board)
+        if move_str:
             self.make_move(position, move_str)
-            return move_str
+        return move_str
+
+    def get_moves(self, positions: List[str]) -> List[Optional[str]]:
+        """Get best moves for a batch of positions
         
-        # 4. Fallback to first legal move
-        legal_moves = list(board.legal_moves)
-        if legal_moves:
-            move_str = legal_moves[0].uci()
-            self.make_move(position, move_str)
-            return move_str
+        Each FEN is parsed once; memory hits for the whole batch are resolved
+        with one vectorized index lookup and only the misses are searched.
+        Unlike get_move, this does not track game state (move history or
+        repetitions), so it is safe for stateless serving.
+        """
+        moves = [None] * len(positions)
+        boards = []
+        for position in positions:
+            try:
+                boards.append(chess.Board(position))
+            except ValueError as e:
+                print(f"Invalid position {position}: {e}")
+                boards.append(None)
         
+        # 1. Check opening book
+        pending = []
+        for i, board in enumerate(boards):
+            if board is None:
+                continue
+            moves[i] = self._get_opening_move(positions[i], board)
+            if moves[i] is None:
+                pending.append(i)
+        
+        # 2. Check learned memory for all remaining positions at once
+        keys = [position_key(boards[i]) for i in pending]
+        memory_moves = self.position_index.get_many(keys)
+        if self.knowledge is not None:
+            shared_moves = self.knowledge.get_many(keys)
+            memory_moves = [own or shared for own, shared in zip(memory_moves, shared_moves)]
+        misses = []
+        for i, move in zip(pending, memory_moves):
+            if move and chess.Move.from_uci(move) in boards[i].legal_moves:
+                moves[i] = move
+            else:
+                misses.append(i)
+        
+        # 3. Similar learned positions, then search only what is left
+        for i in misses:
+            moves[i] = self._get_similar_move(boards[i]) or self._search_move(boards[i])
+        
+        return moves
+
+    def _search_move(self, board: chess.Board) -> Optional[str]:
+        """Calculate a move when neither book nor memory has one"""
+        best_move = self._calculate_best_move(board)
+        if best_move:
+            return best_move.uci()
+        
+        # Fallback to first legal move
+        for move in board.legal_moves:
+            return move.uci()
         return None
 
     def make_move(self, position: str, move: str):
@@ -202,95 +504,85 @@ class StudentAgent(BaseAgent):
             self.position_history[position] = 1
         return False
 
-    def _get_opening_move(self, position: str) -> Optional[str]:
+    def add_opening(self, name: str, moves: List[Tuple], weight: int = 1):
+        """Add a named opening line of (white, black) move pairs"""
+        self.opening_knowledge[name] = moves
+        self.opening_book.add_line(name, OpeningBook.flatten_line(moves), weight)
+
+    def load_opening_book(self, path: str) -> bool:
+        """Use a Polyglot .bin book as the first opening lookup tier"""
+        try:
+            if self.polyglot_book is not None:
+                self.polyglot_book.close()
+            self.polyglot_book = PolyglotBook(path)
+            return True
+        except Exception as e:
+            print(f"Failed to load opening book {path}: {e}")
+            self.polyglot_book = None
+            return False
+
+    def close(self):
+        """Close the history spill files and the Polyglot book"""
+        super().close()
+        if self.polyglot_book is not None:
+            self.polyglot_book.close()
+            self.polyglot_book = None
+
+    def load_openings(self, opening_knowledge: Dict[str, List[Tuple]]):
+        """Replace the opening knowledge and recompile the book"""
+        self.opening_knowledge = dict(opening_knowledge)
+        self.opening_book = OpeningBook.from_opening_knowledge(self.opening_knowledge)
+
+    def _get_opening_move(self, position: str, board: Optional[chess.Board] = None) -> Optional[str]:
         """Get move from opening knowledge"""
-        board = chess.Board(position)
-        move_count = len(board.move_stack)
-        
-        for opening_name, moves in self.opening_knowledge.items():
-            if move_count < len(moves):
-                expected_move = moves[move_count][board.turn]
-                if expected_move:
-                    try:
-                        move = chess.Move.from_uci(expected_move)
-                        if move in board.legal_moves:
-                            self.current_opening = opening_name
-                            return expected_move
-                    except:
-                        continue
+        if board is None:
+            board = chess.Board(position)
+        
+        # Polyglot book first, then the compiled named openings
+        book_move = None
+        if self.polyglot_book is not None:
+            book_move = self.polyglot_book.best_move(board)
+        if not book_move:
+            book_move = self.opening_book.best_move(board)
+        if book_move:
+            move, opening_name = book_move
+            self.current_opening = opening_name
+            return move
         return None
 
-    def _get_memory_move(self, position: str) -> Optional[str]:
+    def _get_memory_move(self, position: str, board: Optional[chess.Board] = None) -> Optional[str]:
         """Get move from learned memory"""
-        if position in self.position_memory:
-            move = self.position_memory[position]
-            try:
+        try:
+            if board is None:
                 board = chess.Board(position)
-                chess_move = chess.Move.from_uci(move)
-                if chess_move in board.legal_moves:
-                    return move
-            except:
-                pass
+            move = self._learned_move(position_key(board))
+            if move and chess.Move.from_uci(move) in board.legal_moves:
+                return move
+        except:
+            pass
         return None
 
+    def _get_similar_move(self, board: chess.Board) -> Optional[str]:
+        """Move learned in the nearest similar position, if close enough"""
+        nearest = self.similarity.nearest(board, k=1, max_distance=self.similarity_max_distance)
+        return nearest[0][0] if nearest else None
+
     def _calculate_best_move(self, board: chess.Board) -> Optional[chess.Move]:
-        """Calculate best move using position evaluation"""
-        best_move = None
-        best_score = float('-inf')
-        
-        for move in board.legal_moves:
-            board.push(move)
-            score = -self._evaluate_position(board)
-            board.pop()
-            
-            if score > best_score:
-                best_score = score
-                best_move = move
-                
-        return best_move
+        """Calculate best move with the alpha-beta search"""
+        return self.search.search(board)
 
     def _evaluate_position(self, board: chess.Board) -> float:
-        """Evaluate chess position"""
-        if board.is_checkmate():
-            return float('inf') if board.turn else float('-inf')
-            
-        score = 0
-        piece_values = {
-            chess.PAWN: 100,
-            chess.KNIGHT: 320,
-            chess.BISHOP: 330,
-            chess.ROOK: 500,
-            chess.QUEEN: 900,
-            chess.KING: 20000
-        }
-        
-        # Material evaluation
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece:
-                value = piece_values[piece.piece_type]
-                if piece.color == board.turn:
-                    score += value
-                else:
-                    score -= value
-                    
-        # Center control bonus
-        center_squares = [chess.E4, chess.E5, chess.D4, chess.D5]
-        for square in center_squares:
-            if board.piece_at(square):
-                if board.piece_at(square).color == board.turn:
-                    score += 30
-                else:
-                    score -= 30
-        
-        return score
+        """Evaluate chess position from the side to move's point of view"""
+        if board.is_check() and board.is_checkmate():
+            return float('-inf')
+        return self.evaluator.evaluate(board)
 
     def _calculate_confidence(self, position: str, move: str) -> float:
         """Calculate confidence score"""
         board = chess.Board(position)
         
         # Pattern match score
-        pattern_confidence = self._get_pattern_confidence(position)
+        pattern_confidence = self._get_pattern_confidence(position, board)
         
         # Legal move bonus
         try:
@@ -301,38 +593,12 @@ class StudentAgent(BaseAgent):
         
         return min(pattern_confidence + legal_bonus, 100.0)
 
-    def _get_pattern_confidence(self, position: str) -> float:
+    def _get_pattern_confidence(self, position: str, board: Optional[chess.Board] = None) -> float:
         """Calculate confidence based on pattern recognition"""
-        board = chess.Board(position)
-        pattern = self._create_position_vector(board)
-        pattern_key = tuple(pattern)
-        
-        if pattern_key in self.pattern_memory:
-            pattern_data = self.pattern_memory[pattern_key]
-            return min(pattern_data['count'] / 3, 1.0) * 40  # Max 40 points from pattern recognition
-        return 0.0
-
-    def _create_position_vector(self, board: chess.Board) -> List[float]:
-        """Create a numerical vector representing the position"""
-        vector = []
-        
-        # Piece placement features
-        for piece_type in chess.PIECE_TYPES:
-            for color in [chess.WHITE, chess.BLACK]:
-                mask = board.pieces_mask(piece_type, color)
-                for i in range(64):
-                    vector.append(float((mask >> i) & 1))
-        
-        # Additional features
-        vector.extend([
-            float(board.turn),
-            float(board.has_kingside_castling_rights(chess.WHITE)),
-            float(board.has_queenside_castling_rights(chess.WHITE)),
-            float(board.has_kingside_castling_rights(chess.BLACK)),
-            float(board.has_queenside_castling_rights(chess.BLACK))
-        ])
-        
-        return vector
+        if board is None:
+            board = chess.Board(position)
+        count = self.pattern_memory.count(pattern_key(board))
+        return min(count / 3, 1.0) * 40  # Max 40 points from pattern recognition
 
     def _decode_move(self, move_tokens: List[float]) -> str:
         """Decode move tokens to UCI format"""
@@ -344,41 +610,35 @@ class StudentAgent(BaseAgent):
         """Decode evaluation tokens to score"""
         return float(np.arctanh(eval_tokens[0]))
 
-    def _learn_position_pattern(self, position_tokens: List[float], 
-                              move_tokens: List[float],
-                              eval_tokens: List[float]):
-        """Learn a position pattern"""
-        pattern_key = tuple(position_tokens)
-        
-        if pattern_key not in self.pattern_memory:
-            self.pattern_memory[pattern_key] = {
-                'moves': [],
-                'evaluations': [],
-                'count': 0
-            }
-        
-        self.pattern_memory[pattern_key]['moves'].append(move_tokens)
-        self.pattern_memory[pattern_key]['evaluations'].append(eval_tokens)
-        self.pattern_memory[pattern_key]['count'] += 1
-
     def get_learning_stats(self) -> Dict:
-        """Get detailed learning statistics"""
-        confidence_values = [
-            score for score in self.confidence_scores.values()
-            if score is not None
-        ]
+        """Get detailed learning statistics
+
+        Without FEN keys the average is over every learned move rather than
+        over distinct positions.
+        """
+        if self.store_fen_keys:
+            confidence_values = [
+                score for score in self.confidence_scores.values()
+                if score is not None
+            ]
+            confidence_count = len(confidence_values)
+            confidence_sum = sum(confidence_values)
+        else:
+            confidence_count = self.learned_moves
+            confidence_sum = self.confidence_total
         
         avg_confidence = (
-            sum(confidence_values) / len(confidence_values)
-            if confidence_values else 0.0
+            confidence_sum / confidence_count
+            if confidence_count else 0.0
         )
         
         return {
             'total_learned_moves': self.learned_moves,
-            'unique_positions': len(self.position_memory),
+            'unique_positions': len(self.position_index),
             'unique_patterns': len(self.pattern_memory),
+            'shared_positions': len(self.knowledge) if self.knowledge is not None else 0,
             'average_confidence': f"{avg_confidence:.2f}",
-            'positions_with_confidence': len(confidence_values),
+            'positions_with_confidence': confidence_count,
             'learning_progress': f"{self.learned_moves} moves learned",
-            'last_learned': self.learning_history[-1] if self.learning_history else None
+            'last_learned': self.learning_history.last
         }
\ No newline at end of file
@@ -3,12 +3,17 @@
 import chess
 import chess.engine
 import os
+import weakref
+
+from src.engine_pool import get_pool, release_pool
 
 class ChessEnvironment:
-    def __init__(self, stockfish_path=None):
+    def __init__(self, stockfish_path=None, pool=None, options=None):
         """
         Satranç ortamını başlat
         stockfish_path: Stockfish engine'in yolu
+        pool: Kullanılacak EnginePool (verilmezse ortak havuz kullanılır)
+        options: UCI seçenekleri, örn. {"Threads": 2, "Hash": 128, "Skill Level": 10}
         """
         self.board = chess.Board()
         
@@ -18,7 +23,11 @@ class ChessEnvironment:
             stockfish_path = "/opt/homebrew/bin/stockfish"
         
         try:
-            self.engine = chess.engine.SimpleEngine.popen_uci(stockfish_path)
+            # Engine'ler aynı yol ve seçenekleri kullanan herkesle paylaşılır
+            self.pool = pool or get_pool(stockfish_path, options=options)
+            # Ortak havuz son kullanıcı bırakınca kapanır; close() çağrılmazsa çöp toplamada bırakılır
+            self._release = weakref.finalize(self, release_pool, self.pool) if pool is None else None
+            self.pool.start()
             print("Stockfish engine başarıyla başlatıldı!")
         except Exception as e:
             print(f"Stockfish engine başlatılamadı: {e}")
@@ -45,10 +54,21 @@ class ChessEnvironment:
 
     def get_best_move(self, time_limit=1.0):
         """Stockfish'in önerdiği en iyi hamleyi al"""
-        result = self.engine.play(self.board, chess.engine.Limit(time=time_limit))
+        result = self.pool.play(self.board, chess.engine.Limit(time=time_limit))
         return result.move.uci() if result.move else None
 
-    def __del__(self):
-        """Engine'i temiz bir şekilde kapat"""
-        if hasattr(self, 'engine'):
-            self.engine.quit()
\ No newline at end of file
+    def close(self):
+        """Ortak havuzu bırak; dışarıdan verilen havuz açık kalır"""
+        if self._release is not None:
+            self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @property
+    def engine(self):
+        """Eski kullanım için: havuz engine.play/analyse ile aynı şekilde çağrılır"""
+        return self.pool
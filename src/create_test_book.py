@@ -1,7 +1,6 @@
 import chess
-import chess.polyglot
 import os
-import struct
+from src.book_builder import PolyglotBookBuilder
 
 def create_test_opening_book():
     """Test için popüler açılışları içeren küçük bir kitaplık oluştur"""
@@ -47,24 +46,13 @@ def create_test_opening_book():
     print(f"Toplam pozisyon sayısı: {len(entries)}")
     return book_path
 
-def move_to_int(move_uci):
-    """UCI formatındaki hamleyi integer'a çevir"""
-    from_square = chess.parse_square(move_uci[:2])
-    to_square = chess.parse_square(move_uci[2:4])
-    promotion = 0
-    if len(move_uci) > 4:
-        promotion = "pnbrqk".index(move_uci[4].lower()) + 1
-    return from_square | (to_square << 6) | (promotion << 12)
-
 def save_to_binary(entries, filepath):
-    """Pozisyonları binary formatta kaydet"""
-    with open(filepath, 'wb') as f:
-        for fen, move_uci, weight in entries:
-            board = chess.Board(fen)
-            key = chess.polyglot.zobrist_hash(board)
-            move_int = move_to_int(move_uci)
-            entry_data = struct.pack('>QHHI', key, move_int, weight, 0)
-            f.write(entry_data)
+    """Pozisyonları sıralı ve birleştirilmiş Polyglot formatında kaydet"""
+    builder = PolyglotBookBuilder()
+    for fen, move_uci, weight in entries:
+        board = chess.Board(fen)
+        builder.add_entry(board, chess.Move.from_uci(move_uci), weight)
+    return builder.build(filepath)
 
 if __name__ == "__main__":
     create_test_opening_book()
\ No newline at end of file
@@ -0,0 +1,271 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Union
+
+import chess
+import chess.engine
+
+DEFAULT_ENGINE_PATH = "/opt/homebrew/bin/stockfish"
+
+class EnginePool:
+    """Pool of UCI engine processes leased to engine consumers
+
+    Engines are started lazily up to `size` and handed out with lease() /
+    release() or the engine() context manager; a consumer that finds every
+    engine busy waits for one to be returned. Engines idle for longer than
+    health_check_interval are pinged before being leased, and an engine
+    that died (EngineTerminatedError) is quit and replaced. `options` are
+    UCI options such as Threads, Hash or Skill Level, applied to every
+    engine the pool starts.
+
+    play() and analyse() take the same arguments as SimpleEngine's, so a
+    pool can be passed wherever an engine is expected; each call leases an
+    engine and is retried once on a fresh engine if the old one died.
+    """
+
+    def __init__(self, engine_path: str = DEFAULT_ENGINE_PATH, size: int = 1,
+                 options: Optional[Dict] = None, health_check_interval: float = 30.0,
+                 timeout: Optional[float] = None):
+        """Configure the pool; no engine is started until one is needed"""
+        self.engine_path = engine_path
+        self.size = size
+        self.options = dict(options or {})
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+
+        self._idle: List = []  # (engine, time it was returned)
+        self._leased = set()
+        self._starting = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._users = 0  # Consumers holding a shared pool from get_pool()
+        self.stats = {'started': 0, 'restarts': 0, 'leases': 0, 'health_checks': 0}
+
+    def _start_engine(self) -> chess.engine.SimpleEngine:
+        """Launch and configure one engine process"""
+        engine = chess.engine.SimpleEngine.popen_uci(self.engine_path, timeout=self.timeout)
+        options = {}
+        for name, value in self.options.items():
+            option = engine.options.get(name)
+            if option is None:
+                print(f"Engine option {name} not supported by {self.engine_path}, skipped")
+            elif option.is_managed():
+                print(f"Engine option {name} is managed by python-chess, skipped")
+            else:
+                options[name] = value
+        if options:
+            engine.configure(options)
+        self._count('started')
+        return engine
+
+    def _count(self, counter: str):
+        """Increment a lifetime counter; leases run on many threads"""
+        with self._condition:
+            self.stats[counter] += 1
+
+    def _quit_engine(self, engine: chess.engine.SimpleEngine):
+        """Quit an engine, ignoring one that is already gone"""
+        try:
+            engine.quit()
+        except Exception:
+            try:
+                engine.close()
+            except Exception:
+                pass
+
+    def _healthy(self, engine: chess.engine.SimpleEngine) -> bool:
+        """Ping an engine; False if it does not answer"""
+        self._count('health_checks')
+        try:
+            engine.ping()
+            return True
+        except Exception:
+            return False
+
+    def start(self, count: int = 1):
+        """Start engines ahead of use, so startup is not paid by the first caller"""
+        engines = [self.lease() for _ in range(min(count, self.size))]
+        for engine in engines:
+            self.release(engine)
+
+    def resize(self, size: int):
+        """Allow up to size engines; idle extras are quit when shrinking"""
+        with self._condition:
+            self.size = size
+            extra = len(self._idle) + len(self._leased) - size
+            surplus = [self._idle.pop()[0] for _ in range(max(0, min(extra, len(self._idle))))]
+            self._condition.notify_all()
+        for engine in surplus:
+            self._quit_engine(engine)
+
+    def lease(self, timeout: Optional[float] = None) -> chess.engine.SimpleEngine:
+        """Take an engine, starting one or waiting for a free one"""
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Engine pool is closed")
+                if self._idle:
+                    engine, returned = self._idle.pop()
+                    break
+                if len(self._leased) + self._starting < self.size:
+                    engine, returned = None, None
+                    self._starting += 1
+                    break
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("No engine became free in time")
+                self._condition.wait(remaining)
+
+        try:
+            if engine is not None and time.time() - returned > self.health_check_interval:
+                if not self._healthy(engine):
+                    self._quit_engine(engine)
+                    self._count('restarts')
+                    engine = None
+            if engine is None:
+                engine = self._start_engine()
+        except Exception:
+            with self._condition:
+                if returned is None:
+                    self._starting -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            if returned is None:
+                self._starting -= 1
+            self._leased.add(engine)
+            self.stats['leases'] += 1
+        return engine
+
+    def release(self, engine: chess.engine.SimpleEngine, broken: bool = False):
+        """Return a leased engine; broken engines are quit instead of reused"""
+        with self._condition:
+            self._leased.discard(engine)
+            keep = not broken and not self._closed and len(self._idle) + len(self._leased) < self.size
+            if keep:
+                self._idle.append((engine, time.time()))
+            self._condition.notify()
+        if not keep:
+            self._quit_engine(engine)
+
+    @contextmanager
+    def engine(self, timeout: Optional[float] = None):
+        """Lease an engine for a block of work"""
+        engine = self.lease(timeout)
+        broken = False
+        try:
+            yield engine
+        except chess.engine.EngineTerminatedError:
+            broken = True
+            raise
+        finally:
+            self.release(engine, broken)
+
+    def run(self, work: Callable[[chess.engine.SimpleEngine], object], retries: int = 1):
+        """Call work(engine) on a leased engine, restarting dead engines"""
+        for attempt in range(retries + 1):
+            try:
+                with self.engine() as engine:
+                    return work(engine)
+            except chess.engine.EngineTerminatedError:
+                self._count('restarts')
+                if attempt == retries:
+                    raise
+                print(f"Engine terminated, restarting ({attempt + 1}/{retries})")
+
+    def play(self, board: chess.Board, limit: chess.engine.Limit, **kwargs) -> chess.engine.PlayResult:
+        """SimpleEngine.play on a pooled engine"""
+        return self.run(lambda engine: engine.play(board, limit, **kwargs))
+
+    def analyse(self, board: chess.Board, limit: chess.engine.Limit, **kwargs):
+        """SimpleEngine.analyse on a pooled engine"""
+        return self.run(lambda engine: engine.analyse(board, limit, **kwargs))
+
+    def get_stats(self) -> Dict:
+        """Pool size, engine counts and lifetime counters"""
+        with self._condition:
+            return {
+                'size': self.size,
+                'idle': len(self._idle),
+                'leased': len(self._leased),
+                **self.stats
+            }
+
+    def close(self, force: bool = False):
+        """Quit every idle engine; leased engines are quit when released, or
+        right away with force (at exit, so a forgotten lease cannot keep the
+        engine's threads alive)"""
+        with self._condition:
+            self._closed = True
+            engines = [engine for engine, _ in self._idle]
+            self._idle = []
+            if force:
+                engines.extend(self._leased)
+                self._leased.clear()
+            self._condition.notify_all()
+        for engine in engines:
+            self._quit_engine(engine)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+# Pools shared by every consumer of the same engine binary and options
+_pools: Dict = {}
+_pools_lock = threading.Lock()
+
+def get_pool(engine_path: Union[str, List[str], None] = None, size: int = 1,
+             options: Optional[Dict] = None) -> EnginePool:
+    """Shared pool for an engine binary and option set, grown to at least size
+
+    Every call counts as one user of the pool; hand the pool back with
+    release_pool() when done so its engines are quit with the last user.
+    """
+    engine_path = engine_path or DEFAULT_ENGINE_PATH
+    command = tuple(engine_path) if isinstance(engine_path, list) else engine_path
+    key = (command, tuple(sorted((options or {}).items())))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = EnginePool(engine_path, size, options)
+            _pools[key] = pool
+        elif pool.size < size:
+            pool.resize(size)
+        pool._users += 1
+    return pool
+
+def release_pool(pool: EnginePool):
+    """Give back a pool taken with get_pool(); the last user closes it"""
+    with _pools_lock:
+        pool._users -= 1
+        if pool._users > 0:
+            return
+        for key, shared in list(_pools.items()):
+            if shared is pool:
+                del _pools[key]
+    pool.close()
+
+def close_all_pools():
+    """Quit the engines of every shared pool"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close(force=True)
+
+# Pools still open at exit are closed here; pools released by their owners
+# (or by weakref.finalize when an owner is collected) are already gone.
+atexit.register(close_all_pools)
+# python-chess runs every SimpleEngine on a non-daemon thread, and the
+# interpreter joins those threads before it calls atexit handlers, so with
+# engines still running the atexit handler alone is never reached. The
+# private threading hook runs before that join; close_all_pools is
+# idempotent, so running from both hooks is harmless.
+if hasattr(threading, '_register_atexit'):
+    threading._register_atexit(close_all_pools)
@@ -0,0 +1,180 @@
+import chess
+from typing import Dict, List, Tuple
+
+PIECE_VALUES = {
+    chess.PAWN: 100,
+    chess.KNIGHT: 320,
+    chess.BISHOP: 330,
+    chess.ROOK: 500,
+    chess.QUEEN: 900,
+    chess.KING: 20000
+}
+
+# Piece-square tables from White's point of view, rank 8 first as on a
+# diagram (simplified evaluation function values)
+PIECE_SQUARE_TABLES = {
+    chess.PAWN: [
+         0,   0,   0,   0,   0,   0,   0,   0,
+        50,  50,  50,  50,  50,  50,  50,  50,
+        10,  10,  20,  30,  30,  20,  10,  10,
+         5,   5,  10,  25,  25,  10,   5,   5,
+         0,   0,   0,  20,  20,   0,   0,   0,
+         5,  -5, -10,   0,   0, -10,  -5,   5,
+         5,  10,  10, -20, -20,  10,  10,   5,
+         0,   0,   0,   0,   0,   0,   0,   0
+    ],
+    chess.KNIGHT: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20,   0,   0,   0,   0, -20, -40,
+        -30,   0,  10,  15,  15,  10,   0, -30,
+        -30,   5,  15,  20,  20,  15,   5, -30,
+        -30,   0,  15,  20,  20,  15,   0, -30,
+        -30,   5,  10,  15,  15,  10,   5, -30,
+        -40, -20,   0,   5,   5,   0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50
+    ],
+    chess.BISHOP: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,  10,  10,   5,   0, -10,
+        -10,   5,   5,  10,  10,   5,   5, -10,
+        -10,   0,  10,  10,  10,  10,   0, -10,
+        -10,  10,  10,  10,  10,  10,  10, -10,
+        -10,   5,   0,   0,   0,   0,   5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20
+    ],
+    chess.ROOK: [
+         0,   0,   0,   0,   0,   0,   0,   0,
+         5,  10,  10,  10,  10,  10,  10,   5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+        -5,   0,   0,   0,   0,   0,   0,  -5,
+         0,   0,   0,   5,   5,   0,   0,   0
+    ],
+    chess.QUEEN: [
+        -20, -10, -10,  -5,  -5, -10, -10, -20,
+        -10,   0,   0,   0,   0,   0,   0, -10,
+        -10,   0,   5,   5,   5,   5,   0, -10,
+         -5,   0,   5,   5,   5,   5,   0,  -5,
+          0,   0,   5,   5,   5,   5,   0,  -5,
+        -10,   5,   5,   5,   5,   5,   0, -10,
+        -10,   0,   5,   0,   0,   0,   0, -10,
+        -20, -10, -10,  -5,  -5, -10, -10, -20
+    ],
+    chess.KING: [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+         20,  20,   0,   0,   0,   0,  20,  20,
+         20,  30,  10,   0,   0,  10,  30,  20
+    ]
+}
+
+def _build_square_values() -> Dict[Tuple[int, bool], List[int]]:
+    """Material plus piece-square value per square, signed for White"""
+    values = {}
+    for piece_type, table in PIECE_SQUARE_TABLES.items():
+        # The diagram lists rank 8 first; square ^ 56 flips the rank
+        values[(piece_type, chess.WHITE)] = [
+            PIECE_VALUES[piece_type] + table[square ^ 56] for square in chess.SQUARES
+        ]
+        values[(piece_type, chess.BLACK)] = [
+            -(PIECE_VALUES[piece_type] + table[square]) for square in chess.SQUARES
+        ]
+    return values
+
+def _build_layers(square_values: Dict) -> Dict[Tuple[int, bool], List[Tuple[int, int]]]:
+    """Group the squares of every table into (value, bitboard) layers"""
+    layers = {}
+    for key, values in square_values.items():
+        by_value = {}
+        for square, value in enumerate(values):
+            by_value[value] = by_value.get(value, 0) | chess.BB_SQUARES[square]
+        layers[key] = list(by_value.items())
+    return layers
+
+SQUARE_VALUES = _build_square_values()
+SQUARE_LAYERS = _build_layers(SQUARE_VALUES)
+
+class BitboardEvaluator:
+    """Material and piece-square evaluation over pieces_mask bitboards
+
+    A full evaluation is a handful of popcounts per piece bitboard. For
+    search, push()/pop() keep a running score that is updated in O(1) per
+    move instead of re-evaluating the whole board.
+    """
+
+    def __init__(self):
+        self.score = 0
+        self._stack = []
+
+    def white_score(self, board: chess.Board) -> int:
+        """Full evaluation from White's point of view"""
+        score = 0
+        for (piece_type, color), layers in SQUARE_LAYERS.items():
+            mask = board.pieces_mask(piece_type, color)
+            if mask:
+                for value, layer in layers:
+                    score += value * chess.popcount(mask & layer)
+        return score
+
+    def evaluate(self, board: chess.Board) -> int:
+        """Full evaluation from the side to move's point of view"""
+        score = self.white_score(board)
+        return score if board.turn == chess.WHITE else -score
+
+    def move_delta(self, board: chess.Board, move: chess.Move) -> int:
+        """White-view score change of playing move (board before the move)"""
+        color = board.turn
+        piece_type = board.piece_type_at(move.from_square)
+        values = SQUARE_VALUES[(piece_type, color)]
+        delta = -values[move.from_square]
+
+        if board.is_castling(move):
+            # Standard chess: rooks castle from the a- or h-file
+            shift = 8 * chess.square_rank(move.from_square)
+            if board.is_kingside_castling(move):
+                king_to, rook_from, rook_to = chess.G1, chess.H1, chess.F1
+            else:
+                king_to, rook_from, rook_to = chess.C1, chess.A1, chess.D1
+            rook_values = SQUARE_VALUES[(chess.ROOK, color)]
+            delta += values[king_to + shift]
+            delta += rook_values[rook_to + shift] - rook_values[rook_from + shift]
+            return delta
+
+        if board.is_en_passant(move):
+            captured_square = move.to_square + (-8 if color == chess.WHITE else 8)
+            delta -= SQUARE_VALUES[(chess.PAWN, not color)][captured_square]
+        else:
+            captured = board.piece_type_at(move.to_square)
+            if captured:
+                delta -= SQUARE_VALUES[(captured, not color)][move.to_square]
+
+        landing_type = move.promotion or piece_type
+        delta += SQUARE_VALUES[(landing_type, color)][move.to_square]
+        return delta
+
+    def reset(self, board: chess.Board):
+        """Start incremental tracking from a position"""
+        self.score = self.white_score(board)
+        self._stack = []
+
+    def push(self, board: chess.Board, move: chess.Move):
+        """Play move on board and update the running score"""
+        self._stack.append(self.score)
+        self.score += self.move_delta(board, move)
+        board.push(move)
+
+    def pop(self, board: chess.Board) -> chess.Move:
+        """Undo the last move on board and restore the running score"""
+        self.score = self._stack.pop()
+        return board.pop()
+
+    def current(self, board: chess.Board) -> int:
+        """Running score from the side to move's point of view"""
+        return self.score if board.turn == chess.WHITE else -self.score
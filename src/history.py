@@ -0,0 +1,153 @@
+import json
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, Optional
+
+from src.records import Record, to_jsonable
+
+class HistoryBuffer:
+    """Bounded, list-like history with running aggregates
+
+    Keeps the last maxlen entries in a ring buffer. Entries pushed out are
+    appended to spill_path as line-delimited JSON when one is given, and
+    dropped otherwise. Counts, sums of numeric sum_fields, distinct values
+    of distinct_fields and the entry rate are updated on every append, so
+    statistics cost O(1) however long the history has been running.
+
+    Supports append/extend/clear, len() and iteration over the kept entries,
+    indexing ([-1] for the newest) and truthiness like the list it replaces.
+    """
+
+    def __init__(self, maxlen: Optional[int] = 10000, spill_path: Optional[str] = None,
+                 distinct_fields: Iterable[str] = (), sum_fields: Iterable[str] = ()):
+        """Create an empty history"""
+        self.entries = deque(maxlen=maxlen)
+        self.spill_path = spill_path
+        self._spill_file = None
+        self.distinct_fields = tuple(distinct_fields)
+        self.sum_fields = tuple(sum_fields)
+
+        self.total = 0
+        self.spilled = 0
+        self.sums = {field: 0.0 for field in self.sum_fields}
+        self.distinct = {field: set() for field in self.distinct_fields}
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    @property
+    def maxlen(self) -> Optional[int]:
+        return self.entries.maxlen
+
+    def append(self, entry):
+        """Add an entry, evicting (and spilling) the oldest when full"""
+        if self.entries.maxlen is not None and len(self.entries) == self.entries.maxlen:
+            self._evict(self.entries[0])
+        self.entries.append(entry)
+        self.total += 1
+
+        timestamp = time.time()
+        if isinstance(entry, (dict, Record)):
+            timestamp = entry.get('timestamp', timestamp)
+            for field in self.sum_fields:
+                self.sums[field] += entry.get(field) or 0
+            for field in self.distinct_fields:
+                if field in entry:
+                    self.distinct[field].add(entry[field])
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+
+    def extend(self, entries: Iterable):
+        """Add many entries"""
+        for entry in entries:
+            self.append(entry)
+
+    def _evict(self, entry):
+        """Write an entry leaving the buffer to the spill file"""
+        if self.spill_path is None:
+            return
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, 'a')
+        self._spill_file.write(json.dumps(entry, default=to_jsonable) + '\n')
+        # Spilled entries are on disk even if the owner is never closed
+        self._spill_file.flush()
+        self.spilled += 1
+
+    def iter_spilled(self) -> Iterator:
+        """Entries written to the spill file, oldest first"""
+        if self.spill_path is None:
+            return
+        self.flush()
+        try:
+            with open(self.spill_path) as f:
+                for line in f:
+                    yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def distinct_count(self, field: str) -> int:
+        """Distinct values seen in a distinct field"""
+        return len(self.distinct[field])
+
+    def sum(self, field: str) -> float:
+        """Running sum of a numeric sum field"""
+        return self.sums[field]
+
+    def rate(self) -> float:
+        """Entries per second between the first and last entry"""
+        if self.total < 2 or self.last_timestamp == self.first_timestamp:
+            return 0.0
+        return self.total / (self.last_timestamp - self.first_timestamp)
+
+    @property
+    def last(self):
+        """Newest entry or None"""
+        return self.entries[-1] if self.entries else None
+
+    def get_stats(self) -> Dict:
+        """Aggregates over the whole history"""
+        return {
+            'total': self.total,
+            'kept': len(self.entries),
+            'spilled': self.spilled,
+            'rate_per_second': self.rate(),
+            **{f'distinct_{field}': len(values) for field, values in self.distinct.items()},
+            **{f'sum_{field}': value for field, value in self.sums.items()}
+        }
+
+    def clear(self):
+        """Forget kept entries and aggregates; spilled entries stay on disk"""
+        self.entries.clear()
+        self.total = 0
+        self.spilled = 0
+        self.sums = {field: 0.0 for field in self.sum_fields}
+        self.distinct = {field: set() for field in self.distinct_fields}
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    def flush(self):
+        if self._spill_file is not None:
+            self._spill_file.flush()
+
+    def close(self):
+        """Close the spill file"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self.entries)[index]
+        return self.entries[index]
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def __repr__(self):
+        return f"HistoryBuffer(total={self.total}, kept={len(self.entries)}, maxlen={self.maxlen})"
@@ -0,0 +1,235 @@
+import mmap
+import numpy as np
+import struct
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.memory_format import ALIGNMENT, decode_move
+from src.memory_tokenizer import MemoryTokenizer, _attach_shared_memory, _unlink_shared_memory
+from src.position_index import NO_MOVE
+
+STORE_MAGIC = b"KNOWST\x00\x01"
+STORE_EXTENSION = '.knowledge'
+HEADER_SIZE = ALIGNMENT
+
+# Column name and dtype, in storage order
+STORE_COLUMNS = [
+    ("keys", '<u8'),
+    ("moves", '<u2'),
+    ("evaluations", '<f4'),
+    ("confidence", '<f4')
+]
+
+def confidence_from_counts(counts: np.ndarray) -> np.ndarray:
+    """Confidence of learned engine moves seen counts times
+
+    As in StudentAgent: 30 points for a legal best move plus up to 40 for
+    how often the position was seen (full after three sightings).
+    """
+    return 30.0 + np.minimum(np.asarray(counts) / 3, 1.0) * 40
+
+def _column_offsets(count: int) -> Tuple[Dict[str, int], int]:
+    """Aligned offset of every column and the total store size"""
+    offsets = {}
+    offset = HEADER_SIZE
+    for name, dtype in STORE_COLUMNS:
+        offsets[name] = offset
+        offset += -(-count * np.dtype(dtype).itemsize // ALIGNMENT) * ALIGNMENT
+    return offsets, offset
+
+class KnowledgeStore:
+    """Read-only learned knowledge shared between agent processes
+
+    Sorted Zobrist keys with the best move, evaluation and confidence of
+    each position, laid out as aligned columns in one buffer: a named
+    multiprocessing.shared_memory block or a memory-mapped file. Agents in
+    other processes attach() or open() it and read the columns as NumPy
+    views, so the knowledge is held in RAM once however many workers use it.
+    """
+
+    def __init__(self, buffer, count: int, owner=None, name: Optional[str] = None,
+                 filename: Optional[str] = None):
+        """Wrap a buffer holding a store; use create/attach/save/open instead"""
+        self._buffer = buffer
+        self._owner = owner
+        self.name = name
+        self.filename = filename
+        self.count = count
+
+        offsets, _ = _column_offsets(count)
+        for column, dtype in STORE_COLUMNS:
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offsets[column])
+            array.flags.writeable = False
+            setattr(self, column, array)
+
+    @staticmethod
+    def _prepare(keys: Iterable[int], moves: Iterable[int], evaluations: Iterable[float],
+                 confidence: Optional[Iterable[float]] = None) -> Tuple[int, bytes]:
+        """Sort and deduplicate (later entries win) and serialize a store"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        moves = np.asarray(moves, dtype=np.uint16)
+        evaluations = np.asarray(evaluations, dtype=np.float32)
+        if confidence is None:
+            confidence = np.zeros(len(keys), dtype=np.float32)
+        confidence = np.asarray(confidence, dtype=np.float32)
+
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        last = np.ones(len(sorted_keys), dtype=bool)
+        last[:-1] = sorted_keys[1:] != sorted_keys[:-1]
+        order = order[last]
+        columns = {
+            "keys": keys[order],
+            "moves": moves[order],
+            "evaluations": evaluations[order],
+            "confidence": confidence[order]
+        }
+
+        count = len(order)
+        offsets, size = _column_offsets(count)
+        data = bytearray(size)
+        data[:len(STORE_MAGIC)] = STORE_MAGIC
+        struct.pack_into('<Q', data, len(STORE_MAGIC), count)
+        for column, dtype in STORE_COLUMNS:
+            raw = columns[column].astype(dtype).tobytes()
+            data[offsets[column]:offsets[column] + len(raw)] = raw
+        return count, bytes(data)
+
+    @staticmethod
+    def _read_count(buffer) -> int:
+        if bytes(buffer[:len(STORE_MAGIC)]) != STORE_MAGIC:
+            raise ValueError("Not a knowledge store")
+        return struct.unpack_from('<Q', buffer, len(STORE_MAGIC))[0]
+
+    @classmethod
+    def create(cls, keys: Iterable[int], moves: Iterable[int], evaluations: Iterable[float],
+               confidence: Optional[Iterable[float]] = None,
+               name: Optional[str] = None) -> 'KnowledgeStore':
+        """Build a store in a new shared memory block owned by this process
+
+        moves are encoded as in memory_format.encode_move. The owner must
+        call unlink() when the workers are done with it.
+        """
+        count, data = cls._prepare(keys, moves, evaluations, confidence)
+        block = shared_memory.SharedMemory(name=name, create=True, size=len(data))
+        block.buf[:len(data)] = data
+        return cls(block.buf, count, owner=block, name=block.name)
+
+    @classmethod
+    def attach(cls, name: str) -> 'KnowledgeStore':
+        """Attach to a store created by another process, without copying"""
+        block = _attach_shared_memory(name)
+        return cls(block.buf, cls._read_count(block.buf), owner=block, name=name)
+
+    @classmethod
+    def save(cls, filename: str, keys: Iterable[int], moves: Iterable[int],
+             evaluations: Iterable[float], confidence: Optional[Iterable[float]] = None) -> str:
+        """Write a store file that any number of processes can open()"""
+        if not filename.endswith(STORE_EXTENSION):
+            filename += STORE_EXTENSION
+        _, data = cls._prepare(keys, moves, evaluations, confidence)
+        with open(filename, 'wb') as f:
+            f.write(data)
+        return filename
+
+    @classmethod
+    def open(cls, filename: str) -> 'KnowledgeStore':
+        """Memory-map a store file read-only; pages are shared via the page cache"""
+        with open(filename, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, cls._read_count(mapped), owner=mapped, filename=filename)
+
+    @staticmethod
+    def columns_from_tokenized_package(tokenized_package: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Key, encoded move, evaluation and confidence columns of a tokenized package"""
+        tokenizer = MemoryTokenizer()
+        position_tokens, move_tokens, evaluation_tokens, fens = tokenizer.package_arrays(tokenized_package)
+        keys = tokenizer.position_keys(position_tokens, fens)
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        return (keys, tokenizer.moves_from_tokens(move_tokens),
+                tokenizer.evaluations_from_tokens(evaluation_tokens),
+                confidence_from_counts(counts[inverse]))
+
+    @classmethod
+    def from_tokenized_package(cls, tokenized_package: Dict, filename: Optional[str] = None,
+                               name: Optional[str] = None) -> 'KnowledgeStore':
+        """Build a store from a tokenized package
+
+        With a filename the store is written there and memory-mapped,
+        otherwise it is placed in shared memory.
+        """
+        columns = cls.columns_from_tokenized_package(tokenized_package)
+        if filename:
+            return cls.open(cls.save(filename, *columns))
+        return cls.create(*columns, name=name)
+
+    def _find(self, key: int) -> int:
+        """Row of a key with a move, or -1; NO_MOVE rows count as misses, as in get_many"""
+        index = int(np.searchsorted(self.keys, np.uint64(key)))
+        if index < self.count and self.keys[index] == key and self.moves[index] != NO_MOVE:
+            return index
+        return -1
+
+    def get(self, key: int) -> Optional[Tuple[str, float, float]]:
+        """(move, evaluation, confidence) for a position key"""
+        index = self._find(key)
+        if index < 0:
+            return None
+        return (decode_move(self.moves[index]), float(self.evaluations[index]),
+                float(self.confidence[index]))
+
+    def get_move(self, key: int) -> Optional[str]:
+        """Best move for a position key"""
+        index = self._find(key)
+        return decode_move(self.moves[index]) if index >= 0 else None
+
+    def get_many(self, keys: Iterable[int]) -> List[Optional[str]]:
+        """Vectorized move lookup of many position keys"""
+        query = np.asarray(keys, dtype=np.uint64)
+        if not self.count:
+            return [None] * len(query)
+        index = np.minimum(np.searchsorted(self.keys, query), self.count - 1)
+        found = (self.keys[index] == query) & (self.moves[index] != NO_MOVE)
+        return [
+            decode_move(move) if hit else None
+            for move, hit in zip(self.moves[index], found)
+        ]
+
+    def __contains__(self, key: int) -> bool:
+        return self._find(key) >= 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the shared columns"""
+        return sum(getattr(self, column).nbytes for column, _ in STORE_COLUMNS)
+
+    def close(self):
+        """Detach from the store; other processes keep their views"""
+        for column, _ in STORE_COLUMNS:
+            if hasattr(self, column):
+                delattr(self, column)
+        self.count = 0
+        self._buffer = None
+        if self._owner is not None:
+            try:
+                self._owner.close()
+            except BufferError:
+                pass  # Caller still holds a view; it is released with it
+            self._owner = None
+
+    def unlink(self):
+        """Free the shared memory block (creator only, after workers detach)"""
+        if self.name is None:
+            return
+        block = _attach_shared_memory(self.name) if self._owner is None else self._owner
+        self.close()
+        _unlink_shared_memory(block)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Dict, Iterable, NamedTuple, Optional
+
+import chess
+import chess.engine
+
+def score_to_pawns(score: Optional[chess.engine.PovScore]) -> Optional[float]:
+    """Engine score in pawns for the side to move, mates as +-10000"""
+    if score is None:
+        return None
+    if score.is_mate():
+        return 10000 if score.relative.mate() > 0 else -10000
+    return score.relative.score() / 100.0
+
+class SearchResult(NamedTuple):
+    """Outcome of one teacher search"""
+    move: Optional[str]
+    evaluation: Optional[float]
+    depth: int
+    seconds: float
+    reason: str  # search, single_reply, book, stable, time
+
+class FixedLimit:
+    """Search every position with the same engine limit (depth 20 by default)
+
+    Limit strategies are asked for an instant_move(board) first, which
+    needs no engine, and only search(engine, board) when it returns None.
+    """
+
+    def __init__(self, depth: Optional[int] = 20, time_limit: Optional[float] = None):
+        self.limit = chess.engine.Limit(depth=depth, time=time_limit)
+        # teach_batch searches from several threads
+        self._lock = threading.Lock()
+        self.stats = {'positions': 0, 'seconds': 0.0}
+
+    def start_session(self, positions: int):
+        """Nothing to plan for a fixed limit"""
+
+    def instant_move(self, board: chess.Board) -> Optional[SearchResult]:
+        """Every position is searched"""
+        return None
+
+    def search(self, engine, board: chess.Board) -> SearchResult:
+        """Play the position with the fixed limit"""
+        start_time = time.time()
+        result = engine.play(board, self.limit, info=chess.engine.INFO_BASIC | chess.engine.INFO_SCORE)
+        seconds = time.time() - start_time
+        with self._lock:
+            self.stats['positions'] += 1
+            self.stats['seconds'] += seconds
+        return SearchResult(result.move.uci() if result.move else None,
+                            score_to_pawns(result.info.get("score")),
+                            result.info.get("depth", 0), seconds, "search")
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+class AdaptiveLimit:
+    """Spend engine time where the position needs it
+
+    - positions with a single legal move, or a move in one of `books`
+      (OpeningBook / PolyglotBook), are answered without the engine
+    - otherwise the engine searches up to max_depth, and the search stops
+      once the best move has stayed the same for stable_depths depths in a
+      row (from min_depth on)
+    - each search is capped at max_time seconds and at an equal share of
+      what is left of session_budget (engine seconds over the positions
+      announced with start_session), but never below min_time
+    """
+
+    def __init__(self, max_depth: int = 20, min_depth: int = 8, stable_depths: int = 4,
+                 max_time: float = 2.0, min_time: float = 0.05,
+                 session_budget: Optional[float] = None, books: Iterable = ()):
+        self.max_depth = max_depth
+        self.min_depth = min_depth
+        self.stable_depths = stable_depths
+        self.max_time = max_time
+        self.min_time = min_time
+        self.session_budget = session_budget
+        self.books = list(books)
+
+        self._lock = threading.Lock()
+        self._spent = 0.0
+        self._remaining_positions = 0
+        self.stats = {'positions': 0, 'seconds': 0.0, 'search': 0, 'single_reply': 0,
+                      'book': 0, 'stable': 0, 'time': 0}
+
+    def start_session(self, positions: int):
+        """Reset the budget for a session of that many positions"""
+        with self._lock:
+            self._spent = 0.0
+            self._remaining_positions = positions
+
+    def _time_cap(self) -> float:
+        """Time allowed for the next search"""
+        with self._lock:
+            if self.session_budget is None:
+                return self.max_time
+            share = (self.session_budget - self._spent) / max(self._remaining_positions, 1)
+            return max(self.min_time, min(self.max_time, share))
+
+    def _record(self, result: SearchResult) -> SearchResult:
+        with self._lock:
+            self._spent += result.seconds
+            self._remaining_positions = max(self._remaining_positions - 1, 0)
+            self.stats['positions'] += 1
+            self.stats['seconds'] += result.seconds
+            self.stats[result.reason] += 1
+        return result
+
+    def _book_move(self, board: chess.Board) -> Optional[str]:
+        for book in self.books:
+            entry = book.best_move(board)
+            if entry and chess.Move.from_uci(entry[0]) in board.legal_moves:
+                return entry[0]
+        return None
+
+    def instant_move(self, board: chess.Board) -> Optional[SearchResult]:
+        """Answer for positions that need no search, None otherwise"""
+        legal_moves = list(board.legal_moves)
+        if len(legal_moves) == 1:
+            return self._record(SearchResult(legal_moves[0].uci(), None, 0, 0.0, "single_reply"))
+        book_move = self._book_move(board)
+        if book_move:
+            return self._record(SearchResult(book_move, None, 0, 0.0, "book"))
+        return None
+
+    def search(self, engine, board: chess.Board) -> SearchResult:
+        """Search until the best move is stable, the time cap or max_depth"""
+        start_time = time.time()
+        limit = chess.engine.Limit(depth=self.max_depth, time=self._time_cap())
+        move, evaluation, depth = None, None, 0
+        stable = 0
+        reason = "search"
+        with engine.analysis(board, limit) as analysis:
+            for info in analysis:
+                pv = info.get("pv")
+                # Only completed iterations: a pv with an exact score
+                if not pv or "depth" not in info or "upperbound" in info or "lowerbound" in info:
+                    continue
+                if pv[0].uci() != move:
+                    stable = 1
+                elif info["depth"] > depth:
+                    stable += 1
+                move, evaluation, depth = pv[0].uci(), score_to_pawns(info.get("score")), info["depth"]
+                if depth >= self.min_depth and stable >= self.stable_depths:
+                    reason = "stable"
+                    break
+            best = analysis.wait() if reason == "search" else None
+        seconds = time.time() - start_time
+
+        if best is not None and best.move:
+            move = best.move.uci()
+        if reason == "search" and depth < self.max_depth:
+            reason = "time"
+        return self._record(SearchResult(move, evaluation, depth, seconds, reason))
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
@@ -1,15 +1,168 @@
+import asyncio
 import chess
 import chess.engine
+import chess.polyglot
+import heapq
 import json
 import time
 import os
-from typing import Dict, List, Optional, Tuple
+import queue
+import re
+import threading
+import weakref
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
 
-class StockfishMemoryExtractor:
-    def __init__(self, engine_path: str = "/opt/homebrew/bin/stockfish"):
-        """Initialize Stockfish memory extractor"""
+from src.analysis_cache import AnalysisCache
+from src.engine_pool import EnginePool, get_pool, release_pool
+from src.memory_format import BinaryMemoryPackage, read_memory_package, write_memory_package
+from src.records import AlternativeMove, PositionMemory, to_jsonable
+from src.memory_stream import MemoryStreamWriter, iter_memory_stream, load_memory_stream, stream_filename
+
+class MemoryExtractorBase:
+    """Engine-independent parts shared by the sync and async extractors"""
+
+    multipv = 3  # Number of lines requested per analysis
+    cache: Optional[AnalysisCache] = None
+
+    def _cached_memory(self, board: chess.Board, position: str, depth: int) -> Optional[PositionMemory]:
+        """Return a memory for the position from the analysis cache, if any"""
+        if self.cache is None:
+            return None
+        analysis = self.cache.get(board, depth, self.multipv)
+        if analysis is None:
+            return None
+        return PositionMemory.from_dict({"position": position, **analysis, "timestamp": time.time()})
+
+    def _cache_memory(self, board: chess.Board, memory: Optional[PositionMemory]):
+        """Store a freshly extracted memory in the analysis cache
+
+        Entries are keyed by the depth the engine actually reached, which may
+        be less than requested when the time limit cut the search short.
+        """
+        if self.cache is None or memory is None:
+            return
+        analysis = {
+            key: value for key, value in memory.to_dict().items()
+            if key not in ("position", "timestamp")
+        }
+        self.cache.put(board, memory.depth, self.multipv, analysis)
+
+    def _finish_package(self, memory_package: Dict):
+        """Record cache statistics and persist the cache after a run"""
+        if self.cache is not None:
+            memory_package["metadata"]["cache_stats"] = self.cache.get_stats()
+            self.cache.save()
+
+    def _build_memory(self, position: str, result: List[Dict]) -> Optional[PositionMemory]:
+        """Build a memory entry from a multipv analysis result"""
+        if not result:
+            print(f"No analysis result for position: {position}")
+            return None
+            
+        main_line = result[0]
+        if not main_line.get("pv"):
+            print(f"No PV found for position: {position}")
+            return None
+            
+        best_move = main_line["pv"][0]
+        
+        return PositionMemory(
+            position=position,
+            best_move=best_move.uci(),
+            evaluation=self._parse_evaluation(main_line),
+            depth=main_line.get("depth", 0),
+            principal_variation=[move.uci() for move in main_line["pv"][:5]],
+            alternative_moves=[
+                AlternativeMove(line["pv"][0].uci(), self._parse_evaluation(line))
+                for line in result[1:] if line.get("pv")
+            ]
+        )
+
+    def _parse_evaluation(self, line: Dict) -> float:
+        """Parse Stockfish evaluation score"""
+        if "score" in line:
+            score = line["score"]
+            if score.is_mate():
+                return 10000 if score.mate() > 0 else -10000
+            else:
+                return score.relative.score() / 100.0
+        return 0.0
+
+    def _new_package(self, depth: int, num_games: int, workers: int) -> Dict:
+        """Create an empty memory package"""
+        return {
+            "metadata": {
+                "source": "Stockfish",
+                "creation_date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "engine_depth": depth,
+                "total_positions": 0,
+                "total_games": num_games,
+                "workers": max(1, workers)
+            },
+            "memories": {}
+        }
+
+    def _new_worker_stats(self, worker_id: int) -> Dict:
+        """Create an empty throughput record for a worker"""
+        return {
+            "worker": worker_id,
+            "games": 0,
+            "positions": 0,
+            "seconds": 0.0,
+            "positions_per_second": 0.0
+        }
+
+    def save_memory_package(self, package: Dict, filename: str):
+        """Save memory package to file"""
+        if not filename.endswith('.stockfish'):
+            filename += '.stockfish'
+            
+        with open(filename, 'w') as f:
+            json.dump(package, f, indent=2, default=to_jsonable)
+
+    def load_memory_package(self, filename: str) -> Dict:
+        """Load memory package from file, memories as PositionMemory records"""
+        with open(filename, 'r') as f:
+            package = json.load(f)
+        package["memories"] = {
+            key: PositionMemory.from_dict(memory) for key, memory in package["memories"].items()
+        }
+        return package
+
+    def save_memory_package_binary(self, package: Dict, filename: str) -> str:
+        """Save memory package in the compact columnar binary format"""
+        return write_memory_package(package, filename)
+
+    def load_memory_package_binary(self, filename: str) -> BinaryMemoryPackage:
+        """Memory-map a binary package; columns are zero-copy NumPy views"""
+        return read_memory_package(filename)
+
+    def iter_memory_package(self, filename: str) -> Iterator[Tuple[str, Dict]]:
+        """Lazily iterate over (key, memory) pairs of a streamed package"""
+        return iter_memory_stream(filename)
+
+    def load_memory_stream(self, filename: str) -> Dict:
+        """Load a streamed package into the regular package shape"""
+        return load_memory_stream(filename)
+
+class StockfishMemoryExtractor(MemoryExtractorBase):
+    def __init__(self, engine_path: str = "/opt/homebrew/bin/stockfish",
+                 cache: Optional[AnalysisCache] = None,
+                 pool: Optional[EnginePool] = None,
+                 options: Optional[Dict] = None):
+        """Initialize Stockfish memory extractor
+        
+        Engines come from a shared EnginePool (or the given pool), so
+        extractors, environments and teachers on the same engine binary and
+        UCI options reuse the same processes.
+        """
+        self.engine_path = engine_path
+        self.cache = cache
         try:
-            self.engine = chess.engine.SimpleEngine.popen_uci(engine_path)
+            self.pool = pool or get_pool(engine_path, options=options)
+            # A shared pool is given back by close(), or when the extractor is collected
+            self._release = weakref.finalize(self, release_pool, self.pool) if pool is None else None
+            self.pool.start()
             self.board = chess.Board()
             print("Stockfish engine initialized successfully!")
         except Exception as e:
@@ -18,149 +171,512 @@ class StockfishMemoryExtractor:
 
     def extract_position_knowledge(self, position: str, depth: int = 20) -> Optional[Dict]:
         """Extract Stockfish's knowledge about a specific position"""
+        return self._extract_position(self.pool, self.board, position, depth)
+
+    def _extract_position(self, engine, board: chess.Board,
+                          position: str, depth: int) -> Optional[Dict]:
+        """Analyse a position with the given engine (or EnginePool) and board"""
         try:
-            self.board.set_fen(position)
+            board.set_fen(position)
+            
+            cached = self._cached_memory(board, position, depth)
+            if cached:
+                return cached
             
             # Analyze position with multiple variations
-            result = self.engine.analyse(
-                self.board,
+            result = engine.analyse(
+                board,
                 chess.engine.Limit(depth=depth, time=0.5),
-                multipv=3  # Get top 3 moves
+                multipv=self.multipv
             )
             
-            if not result:
-                print(f"No analysis result for position: {position}")
-                return None
-                
-            main_line = result[0]
-            if not main_line.get("pv"):
-                print(f"No PV found for position: {position}")
-                return None
-                
-            best_move = main_line["pv"][0]
-            
-            return {
-                "position": position,
-                "best_move": best_move.uci(),
-                "evaluation": self._parse_evaluation(main_line),
-                "depth": main_line.get("depth", 0),
-                "principal_variation": [move.uci() for move in main_line["pv"][:5]],
-                "alternative_moves": [
-                    {
-                        "move": line["pv"][0].uci(),
-                        "evaluation": self._parse_evaluation(line)
-                    }
-                    for line in result[1:] if line.get("pv")
-                ],
-                "timestamp": time.time()
-            }
+            memory = self._build_memory(position, result)
+            self._cache_memory(board, memory)
+            return memory
             
         except Exception as e:
             print(f"Analysis error for position {position}: {e}")
             return None
 
-    def _parse_evaluation(self, line: Dict) -> float:
-        """Parse Stockfish evaluation score"""
-        if "score" in line:
-            score = line["score"]
-            if score.is_mate():
-                return 10000 if score.mate() > 0 else -10000
-            else:
-                return score.relative.score() / 100.0
-        return 0.0
-
     def create_memory_package(self, num_games: int = 5, 
                             positions_per_game: int = 20,
-                            depth: int = 20) -> Optional[Dict]:
-        """Create a complete memory package from multiple games"""
+                            depth: int = 20,
+                            workers: int = 1,
+                            stream_to: Optional[str] = None) -> Optional[Dict]:
+        """Create a complete memory package from multiple games
+        
+        With workers > 1, games are taken from a shared queue by worker
+        threads sharing an engine pool of that size. Memories are merged in game order, so keys are
+        the same as in a serial run.
+        
+        With stream_to, each memory is appended to a line-delimited JSON file
+        as soon as it is extracted instead of being kept in memory; the
+        returned package then has empty "memories". Running again with the
+        same file resumes after the last stored position of every game.
+        """
+        writer = None
         try:
-            memory_package = {
-                "metadata": {
-                    "source": "Stockfish",
-                    "creation_date": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "engine_depth": depth,
-                    "total_positions": 0,
-                    "total_games": num_games
-                },
-                "memories": {}
-            }
+            memory_package = self._new_package(depth, num_games, workers)
             
-            for game_id in range(num_games):
-                print(f"\nExtracting game {game_id + 1}/{num_games}...")
-                self.board.reset()
+            resume = {}
+            if stream_to:
+                stream_to = stream_filename(stream_to)
+                resume = self._find_resume_points(stream_to)
+                writer = MemoryStreamWriter(stream_to, memory_package["metadata"])
+                if resume:
+                    print(f"Resuming {len(resume)} game(s) from {stream_to}")
+            
+            if workers > 1:
+                game_results, worker_stats = self._extract_games_parallel(
+                    num_games, positions_per_game, depth, workers, writer, resume
+                )
+            else:
+                game_results = {}
+                worker_stats = [self._new_worker_stats(0)]
+                for game_id in range(num_games):
+                    print(f"\nExtracting game {game_id + 1}/{num_games}...")
+                    self._run_game(self.pool, self.board, game_id,
+                                   positions_per_game, depth,
+                                   game_results, worker_stats[0], writer, resume)
+            
+            for game_id in sorted(game_results):
+                for key, memory in game_results[game_id]:
+                    memory_package["memories"][key] = memory
                 
-                for move_number in range(positions_per_game):
-                    position = self.board.fen()
+            memory_package["metadata"]["total_positions"] = len(memory_package["memories"])
+            if writer:
+                writer.close()
+                resumed = sum(move_number + 1 for move_number, _ in resume.values())
+                memory_package["metadata"]["total_positions"] = resumed + writer.records_written
+                memory_package["metadata"]["stream_file"] = stream_to
+            memory_package["metadata"]["worker_stats"] = worker_stats
+            self._finish_package(memory_package)
+            return memory_package
+            
+        except Exception as e:
+            print(f"Error creating memory package: {e}")
+            return None
+        finally:
+            if writer:
+                writer.close()
+
+    def _find_resume_points(self, filename: str) -> Dict[int, Tuple[int, Dict]]:
+        """Find the last stored (move_number, memory) of every game in a stream"""
+        resume = {}
+        if not os.path.exists(filename):
+            return resume
+            
+        for key, memory in iter_memory_stream(filename):
+            match = re.fullmatch(r"game_(\d+)_pos_(\d+)", key)
+            if not match:
+                continue
+            game_id, move_number = int(match.group(1)), int(match.group(2))
+            if game_id not in resume or move_number > resume[game_id][0]:
+                resume[game_id] = (move_number, memory)
+        return resume
+
+    def create_frontier_package(self, max_nodes: int = 100,
+                                depth: int = 20,
+                                max_ply: int = 20,
+                                strategy: str = "bfs") -> Optional[Dict]:
+        """Create a memory package by expanding the game tree from the start
+        
+        Every analysed position branches on its best move and the multipv
+        alternative moves. Positions are deduplicated by Zobrist hash, so each
+        unique node is analysed once, until max_nodes positions are stored.
+        
+        strategy="bfs" expands the tree level by level; strategy="weighted"
+        expands the nodes whose line loses the least evaluation first.
+        """
+        if strategy not in ("bfs", "weighted"):
+            raise ValueError(f"Unknown frontier strategy: {strategy}")
+            
+        try:
+            memory_package = self._new_package(depth, 0, 1)
+            memory_package["metadata"]["mode"] = "frontier"
+            memory_package["metadata"]["strategy"] = strategy
+            memory_package["metadata"]["max_nodes"] = max_nodes
+            
+            root = chess.Board()
+            visited = {chess.polyglot.zobrist_hash(root)}
+            # Heap entries: (priority, insertion order, ply, fen)
+            frontier = [(0.0, 0, 0, root.fen())]
+            pushed = 1
+            start_time = time.time()
+            
+            while frontier and len(memory_package["memories"]) < max_nodes:
+                priority, _, ply, position = heapq.heappop(frontier)
+                
+                memory = self.extract_position_knowledge(position, depth)
+                if not memory:
+                    print(f"Failed to analyze position: {position}")
+                    continue
+                    
+                key = f"node_{len(memory_package['memories'])}"
+                memory_package["memories"][key] = memory
+                
+                if ply + 1 > max_ply:
+                    continue
                     
-                    # Extract knowledge for current position
-                    memory = self.extract_position_knowledge(position, depth)
-                    if memory:
-                        key = f"game_{game_id}_pos_{move_number}"
-                        memory_package["memories"][key] = memory
+                candidates = [(memory["best_move"], memory["evaluation"])]
+                candidates += [
+                    (alt["move"], alt["evaluation"])
+                    for alt in memory.get("alternative_moves", [])
+                ]
+                
+                board = chess.Board(position)
+                for move_uci, evaluation in candidates:
+                    try:
+                        move = chess.Move.from_uci(move_uci)
+                    except ValueError:
+                        continue
+                    if move not in board.legal_moves:
+                        continue
                         
-                        # Make the best move
-                        try:
-                            best_move = chess.Move.from_uci(memory["best_move"])
-                            if best_move in self.board.legal_moves:
-                                self.board.push(best_move)
-                            else:
-                                print(f"Invalid move generated: {best_move}")
-                                break
-                        except Exception as e:
-                            print(f"Error making move: {e}")
-                            break
-                            
-                        if self.board.is_game_over():
-                            break
+                    board.push(move)
+                    child_hash = chess.polyglot.zobrist_hash(board)
+                    if child_hash not in visited and not board.is_game_over():
+                        visited.add(child_hash)
+                        if strategy == "bfs":
+                            child_priority = float(ply + 1)
+                        else:
+                            child_priority = priority + max(0.0, memory["evaluation"] - evaluation)
+                        heapq.heappush(frontier, (child_priority, pushed, ply + 1, board.fen()))
+                        pushed += 1
+                    board.pop()
+            
+            duration = time.time() - start_time
+            total = len(memory_package["memories"])
+            memory_package["metadata"]["total_positions"] = total
+            memory_package["metadata"]["frontier_remaining"] = len(frontier)
+            memory_package["metadata"]["worker_stats"] = [{
+                **self._new_worker_stats(0),
+                "positions": total,
+                "seconds": duration,
+                "positions_per_second": total / duration if duration > 0 else 0.0
+            }]
+            self._finish_package(memory_package)
+            return memory_package
+            
+        except Exception as e:
+            print(f"Error creating frontier package: {e}")
+            return None
+
+    def _extract_game(self, engine, board: chess.Board,
+                      game_id: int, positions_per_game: int,
+                      depth: int,
+                      writer: Optional[MemoryStreamWriter] = None,
+                      resume_from: Optional[Tuple[int, Dict]] = None) -> List[Tuple[str, Dict]]:
+        """Play one game along the engine's best moves, collecting memories"""
+        memories = []
+        board.reset()
+        first_move = 0
+        
+        if resume_from:
+            # Continue after the last stored position of this game
+            last_move_number, last_memory = resume_from
+            board.set_fen(last_memory["position"])
+            board.push_uci(last_memory["best_move"])
+            first_move = last_move_number + 1
+            if board.is_game_over():
+                return memories
+        
+        for move_number in range(first_move, positions_per_game):
+            position = board.fen()
+            
+            # Extract knowledge for current position
+            memory = self._extract_position(engine, board, position, depth)
+            if memory:
+                key = f"game_{game_id}_pos_{move_number}"
+                memories.append((key, memory))
+                if writer:
+                    writer.write(key, memory)
+                
+                # Make the best move
+                try:
+                    best_move = chess.Move.from_uci(memory["best_move"])
+                    if best_move in board.legal_moves:
+                        board.push(best_move)
                     else:
-                        print(f"Failed to analyze position: {position}")
+                        print(f"Invalid move generated: {best_move}")
                         break
+                except Exception as e:
+                    print(f"Error making move: {e}")
+                    break
+                    
+                if board.is_game_over():
+                    break
+            else:
+                print(f"Failed to analyze position: {position}")
+                break
+        
+        return memories
+
+    def _run_game(self, engine, board: chess.Board,
+                  game_id: int, positions_per_game: int, depth: int,
+                  game_results: Dict, stats: Dict,
+                  writer: Optional[MemoryStreamWriter] = None,
+                  resume: Optional[Dict] = None):
+        """Extract one game and account for it in the worker's stats"""
+        start_time = time.time()
+        memories = self._extract_game(engine, board, game_id, positions_per_game, depth,
+                                      writer, (resume or {}).get(game_id))
+        # Streamed memories are already on disk and are not kept in memory
+        game_results[game_id] = [] if writer else memories
+        
+        stats["games"] += 1
+        stats["positions"] += len(memories)
+        stats["seconds"] += time.time() - start_time
+        if stats["seconds"] > 0:
+            stats["positions_per_second"] = stats["positions"] / stats["seconds"]
+
+    def _extract_games_parallel(self, num_games: int, positions_per_game: int,
+                                depth: int, workers: int,
+                                writer: Optional[MemoryStreamWriter] = None,
+                                resume: Optional[Dict] = None) -> Tuple[Dict, List[Dict]]:
+        """Extract games with worker threads sharing the engine pool
+        
+        The pool is grown to one engine per worker. The engines do the CPU
+        work in their own processes, so plain threads are enough to keep
+        them all busy; every analysis leases an engine, so a crashed engine
+        is restarted without losing the worker.
+        """
+        self.pool.resize(max(self.pool.size, workers))
+        game_queue = queue.Queue()
+        for game_id in range(num_games):
+            game_queue.put(game_id)
+        
+        game_results = {}
+        worker_stats = [self._new_worker_stats(i) for i in range(workers)]
+        
+        def worker(worker_id: int):
+            stats = worker_stats[worker_id]
+            try:
+                board = chess.Board()
+                
+                while True:
+                    try:
+                        game_id = game_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    print(f"\n[worker {worker_id}] Extracting game {game_id + 1}/{num_games}...")
+                    self._run_game(self.pool, board, game_id, positions_per_game,
+                                   depth, game_results, stats, writer, resume)
+            except Exception as e:
+                print(f"Worker {worker_id} error: {e}")
+                stats["error"] = str(e)
+        
+        threads = [
+            threading.Thread(target=worker, args=(i,), daemon=True)
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        return game_results, worker_stats
+
+    def get_engine_stats(self) -> Dict:
+        """Lease, restart and health check counters of the engine pool"""
+        return self.pool.get_stats()
+
+    def close(self):
+        """Give back the shared engine pool; a pool passed in stays open"""
+        if self._release is not None:
+            self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class AsyncStockfishMemoryExtractor(MemoryExtractorBase):
+    """Memory extractor driven by python-chess's asyncio engine protocol
+    
+    Usage:
+        async with AsyncStockfishMemoryExtractor(path, engines=4) as extractor:
+            package = await extractor.create_memory_package(num_games=500)
+    """
+
+    def __init__(self, engine_path: str = "/opt/homebrew/bin/stockfish",
+                 engines: int = 1, cache: Optional[AnalysisCache] = None):
+        """Configure the extractor; engines are started by start()"""
+        self.engine_path = engine_path
+        self.cache = cache
+        self.num_engines = max(1, engines)
+        self.engines = []
+
+    async def start(self):
+        """Start the engine processes"""
+        try:
+            for _ in range(self.num_engines - len(self.engines)):
+                _, engine = await chess.engine.popen_uci(self.engine_path)
+                self.engines.append(engine)
+            print(f"{len(self.engines)} Stockfish engine(s) initialized successfully!")
+        except Exception as e:
+            print(f"Failed to initialize Stockfish engine: {e}")
+            await self.close()
+            raise
+
+    async def close(self):
+        """Quit all engine processes"""
+        engines, self.engines = self.engines, []
+        for engine in engines:
+            try:
+                await engine.quit()
+            except chess.engine.EngineTerminatedError:
+                pass  # Ignore if already terminated
+            except Exception as e:
+                print(f"Warning: Engine cleanup error: {e}")
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def extract_position_knowledge(self, position: str, depth: int = 20,
+                                         engine: Optional[chess.engine.Protocol] = None) -> Optional[Dict]:
+        """Extract Stockfish's knowledge about a specific position"""
+        if engine is None:
+            if not self.engines:
+                await self.start()
+            engine = self.engines[0]
+            
+        try:
+            board = chess.Board(position)
+            
+            cached = self._cached_memory(board, position, depth)
+            if cached:
+                return cached
+            
+            # Analyze position with multiple variations
+            result = await engine.analyse(
+                board,
+                chess.engine.Limit(depth=depth, time=0.5),
+                multipv=self.multipv
+            )
+            
+            memory = self._build_memory(position, result)
+            self._cache_memory(board, memory)
+            return memory
+            
+        except Exception as e:
+            print(f"Analysis error for position {position}: {e}")
+            return None
+
+    async def create_memory_package(self, num_games: int = 5,
+                                    positions_per_game: int = 20,
+                                    depth: int = 20,
+                                    on_memory: Optional[Callable[[str, Dict], Optional[Awaitable]]] = None) -> Optional[Dict]:
+        """Create a complete memory package, one game queue shared by all engines
+        
+        on_memory(key, memory) is called as soon as each memory is extracted,
+        so callers can tokenize or store it while the engines keep searching.
+        It may be a plain function or a coroutine function.
+        """
+        try:
+            if not self.engines:
+                await self.start()
+                
+            memory_package = self._new_package(depth, num_games, len(self.engines))
+            
+            game_queue = asyncio.Queue()
+            for game_id in range(num_games):
+                game_queue.put_nowait(game_id)
+            
+            game_results = {}
+            worker_stats = [self._new_worker_stats(i) for i in range(len(self.engines))]
+            
+            await asyncio.gather(*[
+                self._game_worker(engine, game_queue, game_results, worker_stats[i],
+                                  num_games, positions_per_game, depth, on_memory)
+                for i, engine in enumerate(self.engines)
+            ])
+            
+            for game_id in sorted(game_results):
+                for key, memory in game_results[game_id]:
+                    memory_package["memories"][key] = memory
                 
             memory_package["metadata"]["total_positions"] = len(memory_package["memories"])
+            memory_package["metadata"]["worker_stats"] = worker_stats
+            self._finish_package(memory_package)
             return memory_package
             
         except Exception as e:
             print(f"Error creating memory package: {e}")
             return None
 
-    def save_memory_package(self, package: Dict, filename: str):
-        """Save memory package to file"""
-        if not filename.endswith('.stockfish'):
-            filename += '.stockfish'
+    async def _game_worker(self, engine: chess.engine.Protocol, game_queue: asyncio.Queue,
+                           game_results: Dict, stats: Dict, num_games: int,
+                           positions_per_game: int, depth: int, on_memory):
+        """Take games from the queue until it is empty"""
+        while not game_queue.empty():
+            game_id = game_queue.get_nowait()
+            print(f"\n[engine {stats['worker']}] Extracting game {game_id + 1}/{num_games}...")
             
-        with open(filename, 'w') as f:
-            json.dump(package, f, indent=2)
-
-    def load_memory_package(self, filename: str) -> Dict:
-        """Load memory package from file"""
-        with open(filename, 'r') as f:
-            return json.load(f)
+            start_time = time.time()
+            memories = await self._extract_game(engine, game_id, positions_per_game,
+                                                depth, on_memory)
+            game_results[game_id] = memories
+            
+            stats["games"] += 1
+            stats["positions"] += len(memories)
+            stats["seconds"] += time.time() - start_time
+            if stats["seconds"] > 0:
+                stats["positions_per_second"] = stats["positions"] / stats["seconds"]
 
-    def __del__(self):
-        """Cleanup engine properly"""
-        try:
-            if hasattr(self, 'engine') and self.engine:
-                try:
-                    self.engine.quit()
-                except chess.engine.EngineTerminatedError:
-                    pass  # Ignore if already terminated
-                except Exception as e:
-                    print(f"Warning: Engine cleanup error: {e}")
-                finally:
-                    self.engine = None
-        except Exception as e:
-            print(f"Cleanup error: {e}")
+    async def _extract_game(self, engine: chess.engine.Protocol, game_id: int,
+                            positions_per_game: int, depth: int,
+                            on_memory) -> List[Tuple[str, Dict]]:
+        """Play one game along the engine's best moves, collecting memories"""
+        memories = []
+        board = chess.Board()
+        
+        for move_number in range(positions_per_game):
+            position = board.fen()
+            
+            memory = await self.extract_position_knowledge(position, depth, engine)
+            if not memory:
+                print(f"Failed to analyze position: {position}")
+                break
+                
+            key = f"game_{game_id}_pos_{move_number}"
+            memories.append((key, memory))
+            if on_memory is not None:
+                callback_result = on_memory(key, memory)
+                if asyncio.iscoroutine(callback_result):
+                    await callback_result
+            
+            # Make the best move
+            try:
+                best_move = chess.Move.from_uci(memory["best_move"])
+                if best_move in board.legal_moves:
+                    board.push(best_move)
+                else:
+                    print(f"Invalid move generated: {best_move}")
+                    break
+            except Exception as e:
+                print(f"Error making move: {e}")
+                break
+                
+            if board.is_game_over():
+                break
+        
+        return memories
 
 def test_extraction():
     """Test memory extraction functionality"""
-    extractor = StockfishMemoryExtractor()
-    
-    # Create test package
-    package = extractor.create_memory_package(
-        num_games=2,
-        positions_per_game=10,
-        depth=15
-    )
+    with StockfishMemoryExtractor() as extractor:
+        # Create test package
+        package = extractor.create_memory_package(
+            num_games=2,
+            positions_per_game=10,
+            depth=15
+        )
     
     if package:
         # Save package
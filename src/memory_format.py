@@ -0,0 +1,332 @@
+import chess
+import json
+import mmap
+import numpy as np
+import struct
+from typing import Dict, Iterator, List, Tuple
+
+from src.records import AlternativeMove, PositionMemory
+
+MAGIC = b"MEMPKG\x00\x01"
+FORMAT_VERSION = 1
+BINARY_EXTENSION = '.mempack'
+ALIGNMENT = 64
+
+PV_LENGTH = 5       # Moves kept from the principal variation
+MATE_CP = 32000     # int16 sentinel for the +-10000 pawn mate score
+MATE_SCORE = 10000
+
+# Bits of the per-position "flags" column
+FLAG_TURN = 1 << 0
+FLAG_WHITE_KINGSIDE = 1 << 1
+FLAG_WHITE_QUEENSIDE = 1 << 2
+FLAG_BLACK_KINGSIDE = 1 << 3
+FLAG_BLACK_QUEENSIDE = 1 << 4
+FLAG_CHECK = 1 << 5
+
+# Bitboard column order: (piece_type, color), matching the tokenizer
+BITBOARD_LAYOUT = [
+    (piece_type, color)
+    for piece_type in chess.PIECE_TYPES
+    for color in [chess.WHITE, chess.BLACK]
+]
+
+def encode_move(move_uci: str) -> int:
+    """Pack a UCI move into 16 bits: from | to << 6 | promotion << 12"""
+    move = chess.Move.from_uci(move_uci)
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+def decode_move(value: int) -> str:
+    """Unpack a 16-bit move back to UCI"""
+    value = int(value)
+    promotion = (value >> 12) & 0x7
+    return chess.Move(value & 0x3F, (value >> 6) & 0x3F, promotion or None).uci()
+
+# UCI text of every from | to << 6 move without promotion
+_MOVE_NAMES = np.array([
+    chess.SQUARE_NAMES[value & 0x3F] + chess.SQUARE_NAMES[value >> 6]
+    for value in range(4096)
+])
+
+def decode_moves(values: np.ndarray) -> List[str]:
+    """Unpack many 16-bit moves back to UCI"""
+    values = np.asarray(values, dtype=np.uint16)
+    names = _MOVE_NAMES[values & 0xFFF].tolist()
+    for i in np.flatnonzero(values >> 12):
+        names[i] = decode_move(values[i])
+    return names
+
+def encode_evaluation(evaluation: float) -> int:
+    """Convert a pawn evaluation to int16 centipawns"""
+    if evaluation >= MATE_SCORE:
+        return MATE_CP
+    if evaluation <= -MATE_SCORE:
+        return -MATE_CP
+    return int(max(-MATE_CP + 1, min(MATE_CP - 1, round(evaluation * 100))))
+
+def decode_evaluation(value: int) -> float:
+    """Convert int16 centipawns back to a pawn evaluation"""
+    value = int(value)
+    if value == MATE_CP:
+        return MATE_SCORE
+    if value == -MATE_CP:
+        return -MATE_SCORE
+    return value / 100.0
+
+def decode_evaluations(values: np.ndarray) -> np.ndarray:
+    """Vectorized decode_evaluation"""
+    values = np.asarray(values, dtype=np.int64)
+    return np.where(np.abs(values) == MATE_CP, np.sign(values) * MATE_SCORE, values / 100.0)
+
+def _encode_flags(board: chess.Board) -> int:
+    flags = 0
+    if board.turn == chess.WHITE:
+        flags |= FLAG_TURN
+    if board.has_kingside_castling_rights(chess.WHITE):
+        flags |= FLAG_WHITE_KINGSIDE
+    if board.has_queenside_castling_rights(chess.WHITE):
+        flags |= FLAG_WHITE_QUEENSIDE
+    if board.has_kingside_castling_rights(chess.BLACK):
+        flags |= FLAG_BLACK_KINGSIDE
+    if board.has_queenside_castling_rights(chess.BLACK):
+        flags |= FLAG_BLACK_QUEENSIDE
+    if board.is_check():
+        flags |= FLAG_CHECK
+    return flags
+
+def write_memory_package(package: Dict, filename: str) -> str:
+    """Write a memory package in the columnar binary format"""
+    if not filename.endswith(BINARY_EXTENSION):
+        filename += BINARY_EXTENSION
+
+    items = list(package["memories"].items())
+    count = len(items)
+    alternatives = max(
+        [len(memory.get("alternative_moves", [])) for _, memory in items] or [0]
+    )
+
+    columns = {
+        "bitboards": np.zeros((count, len(BITBOARD_LAYOUT)), dtype='<u8'),
+        "flags": np.zeros(count, dtype='u1'),
+        "ep_square": np.full(count, -1, dtype='i1'),
+        "halfmove_clock": np.zeros(count, dtype='<u2'),
+        "fullmove_number": np.zeros(count, dtype='<u2'),
+        "legal_moves": np.zeros(count, dtype='u1'),
+        "evaluation": np.zeros(count, dtype='<i2'),
+        "best_move": np.zeros(count, dtype='<u2'),
+        "depth": np.zeros(count, dtype='<u2'),
+        "pv": np.zeros((count, PV_LENGTH), dtype='<u2'),
+        "pv_length": np.zeros(count, dtype='u1'),
+        "alternative_moves": np.zeros((count, alternatives), dtype='<u2'),
+        "alternative_evaluations": np.zeros((count, alternatives), dtype='<i2'),
+        "alternative_count": np.zeros(count, dtype='u1'),
+        "timestamp": np.zeros(count, dtype='<f8'),
+    }
+
+    encoded_keys = [key.encode('utf-8') for key, _ in items]
+    key_offsets = np.zeros(count + 1, dtype='<u8')
+    key_offsets[1:] = np.cumsum([len(key) for key in encoded_keys])
+    columns["key_offsets"] = key_offsets
+    columns["key_data"] = np.frombuffer(b"".join(encoded_keys), dtype='u1')
+
+    for i, (_, memory) in enumerate(items):
+        board = chess.Board(memory["position"])
+        for j, (piece_type, color) in enumerate(BITBOARD_LAYOUT):
+            columns["bitboards"][i, j] = board.pieces_mask(piece_type, color)
+        columns["flags"][i] = _encode_flags(board)
+        if board.ep_square is not None:
+            columns["ep_square"][i] = board.ep_square
+        columns["halfmove_clock"][i] = board.halfmove_clock
+        columns["fullmove_number"][i] = board.fullmove_number
+        columns["legal_moves"][i] = board.legal_moves.count()
+
+        columns["evaluation"][i] = encode_evaluation(memory["evaluation"])
+        columns["best_move"][i] = encode_move(memory["best_move"])
+        columns["depth"][i] = memory.get("depth", 0)
+        columns["timestamp"][i] = memory.get("timestamp", 0.0)
+
+        pv = memory.get("principal_variation", [])[:PV_LENGTH]
+        columns["pv_length"][i] = len(pv)
+        for j, move_uci in enumerate(pv):
+            columns["pv"][i, j] = encode_move(move_uci)
+
+        alts = memory.get("alternative_moves", [])
+        columns["alternative_count"][i] = len(alts)
+        for j, alt in enumerate(alts):
+            columns["alternative_moves"][i, j] = encode_move(alt["move"])
+            columns["alternative_evaluations"][i, j] = encode_evaluation(alt["evaluation"])
+
+    # Lay out the columns at aligned offsets after the header
+    header = {
+        "version": FORMAT_VERSION,
+        "count": count,
+        "metadata": package.get("metadata", {}),
+        "columns": {}
+    }
+    header_bytes = b""
+    # The header size determines the data offsets, so settle it iteratively
+    data_start = 0
+    while True:
+        offset = data_start
+        for name, array in columns.items():
+            header["columns"][name] = {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset
+            }
+            offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        header_bytes = json.dumps(header).encode('utf-8')
+        needed = -(-(len(MAGIC) + 4 + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+        if needed == data_start:
+            break
+        data_start = needed
+
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in columns.items():
+            f.seek(header["columns"][name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(offset)
+
+    return filename
+
+class BinaryMemoryPackage:
+    """Memory-mapped, read-only view of a binary memory package
+
+    Every column is exposed as a zero-copy NumPy array attribute:
+    bitboards (N, 12) uint64, flags, ep_square, halfmove_clock,
+    fullmove_number, legal_moves, evaluation (int16 centipawns),
+    best_move (uint16), depth, pv (N, 5), pv_length, alternative_moves,
+    alternative_evaluations, alternative_count and timestamp.
+    """
+
+    def __init__(self, filename: str):
+        """Map the file and build the column views"""
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a binary memory package: {filename}")
+
+        header_length = struct.unpack_from('<I', self._mmap, len(MAGIC))[0]
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._mmap[header_start:header_start + header_length])
+
+        self.version = header["version"]
+        self.count = header["count"]
+        self.metadata = header["metadata"]
+        self.column_names = list(header["columns"])
+
+        for name, spec in header["columns"].items():
+            dtype = np.dtype(spec["dtype"])
+            shape = tuple(spec["shape"])
+            size = int(np.prod(shape)) if shape else 1
+            array = np.frombuffer(self._mmap, dtype=dtype, count=size, offset=spec["offset"])
+            setattr(self, name, array.reshape(shape))
+
+    def __len__(self):
+        return self.count
+
+    def key(self, index: int) -> str:
+        """Key of the memory at index"""
+        start, end = self.key_offsets[index], self.key_offsets[index + 1]
+        return self.key_data[start:end].tobytes().decode('utf-8')
+
+    def keys(self) -> List[str]:
+        """All memory keys, in file order"""
+        return [self.key(i) for i in range(self.count)]
+
+    def board(self, index: int) -> chess.Board:
+        """Rebuild the chess.Board stored at index"""
+        board = chess.Board.empty()
+        for j, (piece_type, color) in enumerate(BITBOARD_LAYOUT):
+            for square in chess.scan_forward(int(self.bitboards[index, j])):
+                board.set_piece_at(square, chess.Piece(piece_type, color))
+
+        flags = int(self.flags[index])
+        board.turn = bool(flags & FLAG_TURN)
+        castling = 0
+        if flags & FLAG_WHITE_KINGSIDE:
+            castling |= chess.BB_H1
+        if flags & FLAG_WHITE_QUEENSIDE:
+            castling |= chess.BB_A1
+        if flags & FLAG_BLACK_KINGSIDE:
+            castling |= chess.BB_H8
+        if flags & FLAG_BLACK_QUEENSIDE:
+            castling |= chess.BB_A8
+        board.castling_rights = castling
+
+        ep_square = int(self.ep_square[index])
+        board.ep_square = ep_square if ep_square >= 0 else None
+        board.halfmove_clock = int(self.halfmove_clock[index])
+        board.fullmove_number = int(self.fullmove_number[index])
+        return board
+
+    def fen(self, index: int) -> str:
+        """FEN of the position at index, exactly as it was stored"""
+        return self.board(index).fen(en_passant="fen")
+
+    def memory(self, index: int) -> PositionMemory:
+        """Rebuild the memory at index"""
+        pv_length = int(self.pv_length[index])
+        alt_count = int(self.alternative_count[index])
+        return PositionMemory(
+            position=self.fen(index),
+            best_move=decode_move(self.best_move[index]),
+            evaluation=decode_evaluation(self.evaluation[index]),
+            depth=int(self.depth[index]),
+            principal_variation=[
+                decode_move(value) for value in self.pv[index, :pv_length]
+            ],
+            alternative_moves=[
+                AlternativeMove(decode_move(self.alternative_moves[index, j]),
+                                decode_evaluation(self.alternative_evaluations[index, j]))
+                for j in range(alt_count)
+            ],
+            timestamp=float(self.timestamp[index])
+        )
+
+    def iter_memories(self) -> Iterator[Tuple[str, Dict]]:
+        """Lazily iterate over (key, memory) pairs"""
+        for i in range(self.count):
+            yield self.key(i), self.memory(i)
+
+    def to_dict(self) -> Dict:
+        """Convert back to the regular memory package dict"""
+        return {
+            "metadata": dict(self.metadata),
+            "memories": dict(self.iter_memories())
+        }
+
+    def close(self):
+        """Release the column views and unmap the file"""
+        for name in getattr(self, 'column_names', []):
+            if hasattr(self, name):
+                delattr(self, name)
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # Caller still holds a view; the map closes with it
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def read_memory_package(filename: str) -> BinaryMemoryPackage:
+    """Memory-map a binary memory package"""
+    return BinaryMemoryPackage(filename)
+
+def is_binary_package(filename: str) -> bool:
+    """Check whether a file is in the binary memory package format"""
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.records import PositionMemory, to_jsonable
+
+STREAM_EXTENSION = '.ndjson'
+
+def stream_filename(filename: str) -> str:
+    """Add the stream extension if it is missing"""
+    if not filename.endswith(STREAM_EXTENSION):
+        filename += STREAM_EXTENSION
+    return filename
+
+class MemoryStreamWriter:
+    """Append-only, line-delimited JSON writer for memory packages
+
+    The first line holds {"metadata": ...}; every following line holds one
+    {"key": ..., "memory": ...} record. Each record is flushed as soon as it
+    is written, so a crash loses at most the line being written.
+    """
+
+    def __init__(self, filename: str, metadata: Optional[Dict] = None, sync: bool = False):
+        """Open the stream for appending, writing the header for a new file"""
+        self.filename = stream_filename(filename)
+        self.sync = sync
+        self.records_written = 0
+        self._lock = threading.Lock()
+
+        self._drop_partial_line()
+        is_new = not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0
+        self.file = open(self.filename, 'a')
+        if is_new:
+            self._write_line({"metadata": metadata or {}})
+
+    def _drop_partial_line(self, block_size: int = 65536):
+        """Truncate a trailing line left incomplete by a crash
+
+        Reads backwards from the end of the file up to the last newline, so
+        only the torn line is read however large the stream is.
+        """
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - block_size)
+                f.seek(start)
+                block = f.read(position - start)
+                newline = block.rfind(b'\n')
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                f.truncate(position)
+
+    def _write_line(self, record: Dict):
+        self.file.write(json.dumps(record, default=to_jsonable) + '\n')
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+
+    def write(self, key: str, memory: Dict):
+        """Append one memory to the stream"""
+        with self._lock:
+            self._write_line({"key": key, "memory": memory})
+            self.records_written += 1
+
+    def close(self):
+        """Close the underlying file"""
+        with self._lock:
+            if self.file and not self.file.closed:
+                self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _iter_lines(filename: str) -> Iterator[Dict]:
+    """Yield decoded records, skipping a torn final line"""
+    with open(stream_filename(filename), 'r') as f:
+        for line in f:
+            if not line.endswith('\n'):
+                break  # Incomplete record from an interrupted run
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def read_stream_metadata(filename: str) -> Dict:
+    """Read the metadata header of a memory stream"""
+    for record in _iter_lines(filename):
+        return record.get("metadata", {})
+    return {}
+
+def iter_memory_stream(filename: str) -> Iterator[Tuple[str, Dict]]:
+    """Lazily iterate over (key, PositionMemory) pairs of a memory stream"""
+    for record in _iter_lines(filename):
+        if "key" in record:
+            yield record["key"], PositionMemory.from_dict(record["memory"])
+
+def load_memory_stream(filename: str) -> Dict:
+    """Load a memory stream into the regular memory package shape"""
+    package = {
+        "metadata": read_stream_metadata(filename),
+        "memories": {}
+    }
+    for key, memory in iter_memory_stream(filename):
+        package["memories"][key] = memory
+    package["metadata"]["total_positions"] = len(package["memories"])
+    return package
@@ -1,9 +1,70 @@
 import chess
 import numpy as np
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Any, Optional, Tuple
 import json
+import sys
 import time
 
+from src.memory_format import (
+    BITBOARD_LAYOUT,
+    FLAG_BLACK_KINGSIDE,
+    FLAG_BLACK_QUEENSIDE,
+    FLAG_CHECK,
+    FLAG_TURN,
+    FLAG_WHITE_KINGSIDE,
+    FLAG_WHITE_QUEENSIDE,
+    BinaryMemoryPackage,
+    read_memory_package,
+    write_memory_package,
+)
+from src.position_index import ep_squares_from_fens, zobrist_keys
+from src.records import AlternativeMove, PositionMemory, TokenizedMemory, to_jsonable
+
+POSITION_TOKEN_SIZE = 64 * len(BITBOARD_LAYOUT) + 7
+CASTLING_MOVES = ['e1g1', 'e1c1', 'e8g8', 'e8c8']
+MOVE_TOKEN_SIZE = 5
+EVALUATION_TOKEN_SIZE = 4
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attach to a parent-owned shared memory block without taking ownership"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching always registers the block, and an independent
+    # process's tracker would unlink it when that process exits
+    block = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+def _unlink_shared_memory(block: shared_memory.SharedMemory):
+    """Unlink a block whose tracker registration an attacher may have dropped"""
+    if sys.version_info < (3, 13):
+        # Forked workers share the creator's tracker; re-register so unlink's
+        # own unregister finds the entry
+        resource_tracker.register(block._name, "shared_memory")
+    block.unlink()
+
+def _tokenize_shard(shm_names: Tuple[str, str, str], count: int, start: int,
+                    fens: List[str], moves: List[str], evaluations: List[float]):
+    """Worker: tokenize one shard straight into the shared output arrays"""
+    tokenizer = MemoryTokenizer()
+    blocks = [_attach_shared_memory(name) for name in shm_names]
+    try:
+        end = start + len(fens)
+        positions = np.ndarray((count, POSITION_TOKEN_SIZE), dtype=np.float64, buffer=blocks[0].buf)
+        move_tokens = np.ndarray((count, MOVE_TOKEN_SIZE), dtype=np.float64, buffer=blocks[1].buf)
+        eval_tokens = np.ndarray((count, EVALUATION_TOKEN_SIZE), dtype=np.float64, buffer=blocks[2].buf)
+
+        positions[start:end] = tokenizer.tokenize_batch(fens)
+        move_tokens[start:end] = tokenizer.tokenize_moves_batch(moves)
+        eval_tokens[start:end] = tokenizer.tokenize_evaluations_batch(evaluations)
+        del positions, move_tokens, eval_tokens
+    finally:
+        for block in blocks:
+            block.close()
+    return len(fens)
+
 class MemoryTokenizer:
     def __init__(self):
         """Initialize the memory tokenizer with piece values and token types"""
@@ -20,57 +81,243 @@ class MemoryTokenizer:
             'ALTERNATIVE': 5
         }
 
-    def tokenize_stockfish_memory(self, memory_package: Dict) -> Dict:
-        """Tokenize a Stockfish memory package"""
+    def tokenize_stockfish_memory(self, memory_package: Dict, workers: int = 1) -> Dict:
+        """Tokenize a Stockfish memory package
+        
+        With workers > 1 the memories are split into shards that a process
+        pool tokenizes in parallel. Output is identical to the serial path.
+        """
         tokenized_package = {
             "metadata": memory_package["metadata"],
             "tokenized_memories": {}
         }
 
-        for key, memory in memory_package["memories"].items():
-            tokenized_package["tokenized_memories"][key] = {
-                "position_tokens": self._tokenize_position(memory["position"]),
-                "evaluation_token": self._tokenize_evaluation(memory["evaluation"]),
-                "move_tokens": self._tokenize_move(memory["best_move"]),
-                "pv_tokens": self._tokenize_principal_variation(
-                    memory.get("principal_variation", [])
-                ),
-                "alternative_tokens": self._tokenize_alternatives(
+        items = list(memory_package["memories"].items())
+        if not items:
+            return tokenized_package
+
+        fens = [memory["position"] for _, memory in items]
+        moves = [memory["best_move"] for _, memory in items]
+        evaluations = [memory["evaluation"] for _, memory in items]
+
+        # Positions, best moves and evaluations are tokenized in batches
+        if workers > 1 and len(items) >= 2 * workers:
+            self._tokenize_sharded(tokenized_package, items, fens, moves, evaluations, workers)
+            return tokenized_package
+
+        position_tokens = self.tokenize_batch(fens)
+        move_tokens = self.tokenize_moves_batch(moves)
+        evaluation_tokens = self.tokenize_evaluations_batch(evaluations)
+        self._fill_tokenized_memories(tokenized_package, items, position_tokens,
+                                      move_tokens, evaluation_tokens)
+        return tokenized_package
+
+    def _tokenize_sharded(self, tokenized_package: Dict, items: List, fens: List[str],
+                          moves: List[str], evaluations: List[float], workers: int):
+        """Tokenize shards in a process pool, collecting results in shared memory"""
+        count = len(items)
+        sizes = [
+            count * POSITION_TOKEN_SIZE * 8,
+            count * MOVE_TOKEN_SIZE * 8,
+            count * EVALUATION_TOKEN_SIZE * 8
+        ]
+        blocks = [shared_memory.SharedMemory(create=True, size=size) for size in sizes]
+        try:
+            names = tuple(block.name for block in blocks)
+            bounds = np.linspace(0, count, workers + 1, dtype=int)
+            
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_tokenize_shard, names, count, start,
+                                fens[start:end], moves[start:end], evaluations[start:end])
+                    for start, end in zip(bounds[:-1], bounds[1:])
+                ]
+                for future in futures:
+                    future.result()
+            
+            # Copied out of shared memory: the records keep views of these
+            position_tokens = np.ndarray((count, POSITION_TOKEN_SIZE), dtype=np.float64, buffer=blocks[0].buf).copy()
+            move_tokens = np.ndarray((count, MOVE_TOKEN_SIZE), dtype=np.float64, buffer=blocks[1].buf).copy()
+            evaluation_tokens = np.ndarray((count, EVALUATION_TOKEN_SIZE), dtype=np.float64, buffer=blocks[2].buf).copy()
+            self._fill_tokenized_memories(tokenized_package, items, position_tokens,
+                                          move_tokens, evaluation_tokens)
+        finally:
+            for block in blocks:
+                block.close()
+                _unlink_shared_memory(block)
+
+    def _fill_tokenized_memories(self, tokenized_package: Dict, items: List,
+                                 position_tokens: np.ndarray, move_tokens: np.ndarray,
+                                 evaluation_tokens: np.ndarray):
+        """Assemble TokenizedMemory records from the batched token arrays
+        
+        Token fields are row views of the batch arrays, which must not be
+        shared memory (the sharded path passes copies).
+        """
+        for i, (key, memory) in enumerate(items):
+            tokenized_package["tokenized_memories"][key] = TokenizedMemory(
+                position_tokens=position_tokens[i],
+                evaluation_token=evaluation_tokens[i],
+                move_tokens=move_tokens[i],
+                pv_tokens=self.tokenize_moves_batch(memory.get("principal_variation", [])),
+                alternative_tokens=self._tokenize_alternatives(
                     memory.get("alternative_moves", [])
                 ),
-                "metadata": {
-                    "original_position": memory["position"],
-                    "depth": memory.get("depth", 0),
-                    "timestamp": memory.get("timestamp", time.time())
-                }
-            }
+                original_position=memory["position"],
+                depth=memory.get("depth", 0),
+                timestamp=memory.get("timestamp", time.time())
+            )
 
-        return tokenized_package
+    def tokenize_batch(self, fens: List[str]) -> np.ndarray:
+        """Tokenize N FEN strings into an (N, 775) array
+        
+        Each FEN is parsed once; the 768 piece-square features are produced
+        by unpacking the pieces_mask bitboards in a single NumPy pass.
+        """
+        bitboards = np.zeros((len(fens), len(BITBOARD_LAYOUT)), dtype=np.uint64)
+        features = np.zeros((len(fens), 7), dtype=np.float64)
 
-    def _tokenize_position(self, fen: str) -> List[float]:
-        """Tokenize a chess position from FEN string"""
-        board = chess.Board(fen)
-        tokens = []
+        for i, fen in enumerate(fens):
+            board = chess.Board(fen)
+            for j, (piece_type, color) in enumerate(BITBOARD_LAYOUT):
+                bitboards[i, j] = board.pieces_mask(piece_type, color)
+            features[i] = (
+                board.turn,
+                board.has_kingside_castling_rights(chess.WHITE),
+                board.has_queenside_castling_rights(chess.WHITE),
+                board.has_kingside_castling_rights(chess.BLACK),
+                board.has_queenside_castling_rights(chess.BLACK),
+                board.is_check(),
+                board.legal_moves.count()  # Number of legal moves
+            )
+
+        return self.tokenize_bitboards(bitboards, features)
+
+    def tokenize_bitboards(self, bitboards: np.ndarray, features: np.ndarray) -> np.ndarray:
+        """Build (N, 775) position tokens from (N, 12) bitboards and (N, 7) features"""
+        count = len(bitboards)
+        tokens = np.empty((count, POSITION_TOKEN_SIZE), dtype=np.float64)
+
+        # Little-endian bytes + little bit order put square i at bit i
+        square_bits = np.unpackbits(
+            np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8),
+            bitorder='little'
+        )
+        tokens[:, :-7] = square_bits.reshape(count, -1)
+        tokens[:, -7:] = features
+        return tokens
+
+    def tokenize_binary_positions(self, binary_package: BinaryMemoryPackage) -> np.ndarray:
+        """Position tokens for every entry of a binary package, without FEN parsing"""
+        flags = binary_package.flags
+        features = np.column_stack([
+            (flags & flag) != 0
+            for flag in (FLAG_TURN, FLAG_WHITE_KINGSIDE, FLAG_WHITE_QUEENSIDE,
+                         FLAG_BLACK_KINGSIDE, FLAG_BLACK_QUEENSIDE, FLAG_CHECK)
+        ] + [binary_package.legal_moves])
+        return self.tokenize_bitboards(binary_package.bitboards, features)
+
+    def package_arrays(self, tokenized_package: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """Stack a tokenized package into (N, 775), (N, 5) and (N, 4) arrays plus FENs"""
+        memories = [
+            TokenizedMemory.coerce(tokens) for tokens in tokenized_package["tokenized_memories"].values()
+        ]
+        count = len(memories)
+        position_tokens = np.empty((count, POSITION_TOKEN_SIZE), dtype=np.float64)
+        move_tokens = np.empty((count, MOVE_TOKEN_SIZE), dtype=np.float64)
+        evaluation_tokens = np.empty((count, EVALUATION_TOKEN_SIZE), dtype=np.float64)
+        for i, tokens in enumerate(memories):
+            position_tokens[i] = tokens.position_tokens
+            move_tokens[i] = tokens.move_tokens
+            evaluation_tokens[i] = tokens.evaluation_token
+        fens = [tokens.original_position for tokens in memories]
+        return position_tokens, move_tokens, evaluation_tokens, fens
+
+    def bitboards_from_tokens(self, position_tokens: np.ndarray) -> np.ndarray:
+        """Recover (N, 12) bitboards from (N, 775) position tokens"""
+        count = len(position_tokens)
+        square_bits = np.asarray(position_tokens)[:, :-7] > 0.5
+        packed = np.packbits(square_bits, axis=1, bitorder='little')
+        return np.ascontiguousarray(packed).view('<u8').reshape(count, len(BITBOARD_LAYOUT))
+
+    def position_features(self, position_tokens: np.ndarray,
+                          chunk_size: int = 65536) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(N, 12) bitboards, (N,) side to move and (N, 4) castling rights of position tokens"""
+        position_tokens = np.asarray(position_tokens)
+        bitboards = np.empty((len(position_tokens), len(BITBOARD_LAYOUT)), dtype='<u8')
+        for start in range(0, len(position_tokens), chunk_size):
+            bitboards[start:start + chunk_size] = self.bitboards_from_tokens(
+                position_tokens[start:start + chunk_size]
+            )
+        features = position_tokens[:, -7:]
+        return bitboards, features[:, 0] > 0.5, features[:, 1:5] > 0.5
+
+    def position_keys(self, position_tokens: np.ndarray, fens: Optional[List[str]] = None) -> np.ndarray:
+        """Zobrist keys of tokenized positions, without building boards
         
-        # Piece-centric encoding for each piece type and color
-        for piece_type in chess.PIECE_TYPES:
-            for color in [chess.WHITE, chess.BLACK]:
-                mask = board.pieces_mask(piece_type, color)
-                for i in range(64):
-                    tokens.append(float((mask >> i) & 1))
+        Tokens carry no en passant square; pass the FENs to hash it in.
+        Without them the keys are the en passant-free pattern keys.
+        """
+        bitboards, turn, castling = self.position_features(position_tokens)
+        ep_squares = ep_squares_from_fens(fens) if fens is not None else None
+        return zobrist_keys(bitboards, turn, castling, ep_squares)
+
+    def moves_from_tokens(self, move_tokens: np.ndarray) -> np.ndarray:
+        """Encoded moves (memory_format.encode_move) from (N, 5) move tokens"""
+        move_tokens = np.asarray(move_tokens)
+        from_squares = np.rint(move_tokens[:, 0] * 63).astype(np.uint16)
+        to_squares = np.rint(move_tokens[:, 1] * 63).astype(np.uint16)
+        return from_squares | (to_squares << 6)
+
+    def evaluations_from_tokens(self, evaluation_tokens: np.ndarray) -> np.ndarray:
+        """Evaluations from (N, 4) evaluation tokens"""
+        with np.errstate(divide='ignore'):
+            return np.arctanh(np.asarray(evaluation_tokens)[:, 0])
+
+    def binary_position_keys(self, binary_package: BinaryMemoryPackage,
+                             en_passant: bool = True) -> np.ndarray:
+        """Zobrist keys of every entry of a binary package, without building boards
         
-        # Additional position features
-        tokens.extend([
-            float(board.turn),
-            float(board.has_kingside_castling_rights(chess.WHITE)),
-            float(board.has_queenside_castling_rights(chess.WHITE)),
-            float(board.has_kingside_castling_rights(chess.BLACK)),
-            float(board.has_queenside_castling_rights(chess.BLACK)),
-            float(board.is_check()),
-            float(len(list(board.legal_moves)))  # Number of legal moves
+        With en_passant=False these are the pattern keys (see pattern_memory).
+        """
+        flags = binary_package.flags
+        castling = np.column_stack([
+            (flags & flag) != 0
+            for flag in (FLAG_WHITE_KINGSIDE, FLAG_WHITE_QUEENSIDE,
+                         FLAG_BLACK_KINGSIDE, FLAG_BLACK_QUEENSIDE)
         ])
-        
+        ep_squares = binary_package.ep_square if en_passant else None
+        return zobrist_keys(binary_package.bitboards, (flags & FLAG_TURN) != 0,
+                            castling, ep_squares)
+
+    def tokenize_moves_batch(self, moves: List[str]) -> np.ndarray:
+        """Tokenize N UCI moves into an (N, 5) array"""
+        parsed = [chess.Move.from_uci(move) for move in moves]
+        tokens = np.zeros((len(moves), 5), dtype=np.float64)
+        if not parsed:
+            return tokens
+
+        tokens[:, 0] = np.fromiter((move.from_square for move in parsed), dtype=np.float64) / 63.0
+        tokens[:, 1] = np.fromiter((move.to_square for move in parsed), dtype=np.float64) / 63.0
+        tokens[:, 2] = [float('x' in move) for move in moves]
+        tokens[:, 3] = [move.promotion is not None for move in parsed]
+        tokens[:, 4] = np.isin(moves, CASTLING_MOVES)
         return tokens
+
+    def tokenize_evaluations_batch(self, evaluations: List[float]) -> np.ndarray:
+        """Tokenize N evaluation scores into an (N, 4) array"""
+        scores = np.asarray(evaluations, dtype=np.float64)
+        magnitude = np.abs(scores)
+        return np.column_stack([
+            np.tanh(scores),
+            magnitude > 3,   # Significant advantage
+            magnitude > 5,   # Winning position
+            magnitude > 10   # Near mate
+        ]).astype(np.float64)
+
+    def _tokenize_position(self, fen: str) -> List[float]:
+        """Tokenize a chess position from FEN string"""
+        return self.tokenize_batch([fen])[0].tolist()
     
     def _tokenize_evaluation(self, eval_score: float) -> List[float]:
         """Tokenize evaluation score"""
@@ -96,7 +343,7 @@ class MemoryTokenizer:
         # Special move type flags
         is_capture = float('x' in move_uci)
         is_promotion = float(move.promotion is not None)
-        is_castle = float(move_uci in ['e1g1', 'e1c1', 'e8g8', 'e8c8'])
+        is_castle = float(move_uci in CASTLING_MOVES)
         
         return [from_square, to_square, is_capture, is_promotion, is_castle]
 
@@ -119,13 +366,14 @@ class MemoryTokenizer:
         }
 
         for key, tokens in tokenized_package["tokenized_memories"].items():
-            original_package["memories"][key] = {
-                "position": tokens["metadata"]["original_position"],
-                "best_move": self._detokenize_move(tokens["move_tokens"]),
-                "evaluation": self._detokenize_evaluation(tokens["evaluation_token"]),
-                "depth": tokens["metadata"]["depth"],
-                "timestamp": tokens["metadata"]["timestamp"]
-            }
+            tokens = TokenizedMemory.coerce(tokens)
+            original_package["memories"][key] = PositionMemory(
+                position=tokens.original_position,
+                best_move=self._detokenize_move(tokens.move_tokens),
+                evaluation=self._detokenize_evaluation(tokens.evaluation_token),
+                depth=tokens.depth,
+                timestamp=tokens.timestamp
+            )
 
         return original_package
 
@@ -145,12 +393,59 @@ class MemoryTokenizer:
             filename += '.tokens'
         
         with open(filename, 'w') as f:
-            json.dump(package, f, indent=2)
+            json.dump(package, f, indent=2, default=to_jsonable)
 
     def load_tokenized_package(self, filename: str) -> Dict:
-        """Load tokenized package from file"""
+        """Load tokenized package from file, memories as TokenizedMemory records"""
         with open(filename, 'r') as f:
-            return json.load(f)
+            package = json.load(f)
+        package["tokenized_memories"] = {
+            key: TokenizedMemory.from_dict(tokens)
+            for key, tokens in package["tokenized_memories"].items()
+        }
+        return package
+
+    def save_tokenized_package_binary(self, package: Dict, filename: str) -> str:
+        """Save tokenized package in the compact columnar binary format
+        
+        Tokens are stored as the packed position, move and evaluation data
+        they are derived from, not as float lists.
+        """
+        memory_package = {
+            "metadata": package["metadata"],
+            "memories": {
+                key: self._memory_from_tokens(tokens)
+                for key, tokens in package["tokenized_memories"].items()
+            }
+        }
+        return write_memory_package(memory_package, filename)
+
+    def load_tokenized_package_binary(self, filename: str) -> BinaryMemoryPackage:
+        """Memory-map a binary package; columns are zero-copy NumPy views"""
+        return read_memory_package(filename)
+
+    def tokenize_binary_package(self, binary_package: BinaryMemoryPackage) -> Dict:
+        """Rebuild the tokenized package dict from a binary package"""
+        return self.tokenize_stockfish_memory(binary_package.to_dict())
+
+    def _memory_from_tokens(self, tokens) -> PositionMemory:
+        """Rebuild a memory from its tokens (record or legacy dict)"""
+        tokens = TokenizedMemory.coerce(tokens)
+        with np.errstate(divide='ignore'):
+            evaluation = self._detokenize_evaluation(tokens.evaluation_token)
+        return PositionMemory(
+            position=tokens.original_position,
+            best_move=self._detokenize_move(tokens.move_tokens),
+            evaluation=evaluation,
+            depth=tokens.depth,
+            principal_variation=[self._detokenize_move(move) for move in tokens.pv_tokens],
+            alternative_moves=[
+                AlternativeMove(self._detokenize_move(alt["move"]),
+                                self._detokenize_evaluation(alt["evaluation"]))
+                for alt in tokens.alternative_tokens
+            ],
+            timestamp=tokens.timestamp
+        )
 
 def test_tokenizer():
     """Test tokenizer functionality"""
@@ -0,0 +1,126 @@
+import chess
+import chess.polyglot
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class OpeningBook:
+    """Opening knowledge compiled into a Zobrist-keyed position map
+
+    Every named line is played out once when it is added; each position on
+    the way maps to its candidate moves with summed weights. A lookup is a
+    single hash probe, however many lines are loaded, and works at any ply
+    and through transpositions.
+    """
+
+    def __init__(self):
+        """Create an empty book"""
+        # zobrist key -> {move_uci: [weight, first opening name]}
+        self.entries: Dict[int, Dict[str, list]] = {}
+        self.line_count = 0
+
+    @classmethod
+    def from_opening_knowledge(cls, opening_knowledge: Dict[str, List[Tuple]]) -> 'OpeningBook':
+        """Compile StudentAgent-style {name: [(white, black), ...]} lines"""
+        book = cls()
+        for name, moves in opening_knowledge.items():
+            book.add_line(name, book.flatten_line(moves))
+        return book
+
+    @staticmethod
+    def flatten_line(moves: List[Tuple]) -> List[str]:
+        """Turn [(white, black), ...] move pairs into a flat move list"""
+        flat = []
+        for pair in moves:
+            for move in pair:
+                if move is None:
+                    return flat
+                flat.append(move)
+        return flat
+
+    def add_line(self, name: str, moves: Iterable[str], weight: int = 1,
+                 start_fen: str = chess.STARTING_FEN):
+        """Add a named line of UCI moves"""
+        board = chess.Board(start_fen)
+        for move_uci in moves:
+            try:
+                move = chess.Move.from_uci(move_uci)
+            except ValueError:
+                print(f"Invalid move {move_uci} in opening {name}")
+                break
+            if move not in board.legal_moves:
+                print(f"Illegal move {move_uci} in opening {name}")
+                break
+
+            candidates = self.entries.setdefault(chess.polyglot.zobrist_hash(board), {})
+            if move_uci in candidates:
+                candidates[move_uci][0] += weight
+            else:
+                candidates[move_uci] = [weight, name]
+            board.push(move)
+        self.line_count += 1
+
+    def candidates(self, board: chess.Board) -> List[Tuple[str, int, str]]:
+        """(move, weight, opening name) for a position, heaviest first"""
+        moves = self.entries.get(chess.polyglot.zobrist_hash(board))
+        if not moves:
+            return []
+        return sorted(
+            ((move, weight, name) for move, (weight, name) in moves.items()),
+            key=lambda candidate: candidate[1],
+            reverse=True
+        )
+
+    def best_move(self, board: chess.Board) -> Optional[Tuple[str, str]]:
+        """Heaviest legal book move and its opening name"""
+        for move_uci, _, name in self.candidates(board):
+            if chess.Move.from_uci(move_uci) in board.legal_moves:
+                return move_uci, name
+        return None
+
+    def __len__(self):
+        return len(self.entries)
+
+class PolyglotBook:
+    """Read-only Polyglot (.bin) opening book
+
+    The file is memory-mapped by python-chess's polyglot reader and entries
+    are found by binary search on the Zobrist key, so books of any size are
+    used without loading them into Python objects. The book must be sorted
+    by key, as every valid Polyglot book is.
+    """
+
+    def __init__(self, path: str, minimum_weight: int = 1):
+        """Memory-map the book at path"""
+        self.path = path
+        self.name = os.path.basename(path)
+        self.minimum_weight = minimum_weight
+        self.reader = chess.polyglot.open_reader(path)
+
+    def candidates(self, board: chess.Board) -> List[Tuple[str, int, str]]:
+        """Legal (move, weight, book name) entries for a position, heaviest first"""
+        entries = self.reader.find_all(board, minimum_weight=self.minimum_weight)
+        return sorted(
+            ((entry.move.uci(), entry.weight, self.name) for entry in entries),
+            key=lambda candidate: candidate[1],
+            reverse=True
+        )
+
+    def best_move(self, board: chess.Board) -> Optional[Tuple[str, str]]:
+        """Heaviest legal book move and the book name"""
+        entry = self.reader.get(board, minimum_weight=self.minimum_weight)
+        if entry is None:
+            return None
+        return entry.move.uci(), self.name
+
+    def __len__(self):
+        return len(self.reader)
+
+    def close(self):
+        """Unmap the book file"""
+        self.reader.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
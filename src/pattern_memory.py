@@ -0,0 +1,120 @@
+import chess
+import chess.polyglot
+import numpy as np
+from typing import Iterable, Optional
+
+_HASHER = chess.polyglot.ZobristHasher(chess.polyglot.POLYGLOT_RANDOM_ARRAY)
+
+def pattern_key(board: chess.Board) -> int:
+    """Canonical 64-bit key of a position pattern
+
+    Pieces, side to move and castling rights hashed as in Polyglot, but
+    without en passant or move counters, so it is computable from position
+    tokens and matches MemoryTokenizer.position_keys(tokens).
+    """
+    return _HASHER.hash_board(board) ^ _HASHER.hash_castling(board) ^ _HASHER.hash_turn(board)
+
+class PatternMemory:
+    """Counts and evaluation sums of seen position patterns
+
+    Stored as sorted uint64 keys with uint32 counts and float64 evaluation
+    sums (20 bytes per pattern). Batches smaller than merge_threshold are
+    buffered in a pending dict, like ZobristMoveIndex; larger ones are
+    folded in with one linear merge. Lookups binary-search and add the
+    pending counts.
+    """
+
+    def __init__(self, merge_threshold: int = 4096):
+        """Create an empty pattern memory"""
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.uint32)
+        self.evaluation_sums = np.empty(0, dtype=np.float64)
+        self.merge_threshold = merge_threshold
+        self._pending = {}  # key -> [count, evaluation sum]
+
+    def add_many(self, keys: Iterable[int], evaluations: Iterable[float]):
+        """Record many sightings at once"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        evaluations = np.nan_to_num(np.asarray(evaluations, dtype=np.float64))
+        if not len(keys):
+            return
+        if len(self._pending) + len(keys) < self.merge_threshold:
+            for key, evaluation in zip(keys.tolist(), evaluations.tolist()):
+                entry = self._pending.setdefault(key, [0, 0.0])
+                entry[0] += 1
+                entry[1] += evaluation
+            return
+        self._merge()
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        self._merge_arrays(unique_keys,
+                           np.bincount(inverse, minlength=len(unique_keys)),
+                           np.bincount(inverse, weights=evaluations, minlength=len(unique_keys)))
+
+    def _merge(self):
+        """Fold pending sightings into the sorted arrays"""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        keys = np.fromiter(pending.keys(), dtype=np.uint64, count=len(pending))
+        order = np.argsort(keys)
+        entries = list(pending.values())
+        counts = np.array([count for count, _ in entries], dtype=np.uint32)
+        sums = np.array([total for _, total in entries], dtype=np.float64)
+        self._merge_arrays(keys[order], counts[order], sums[order])
+
+    def _merge_arrays(self, keys: np.ndarray, counts: np.ndarray, sums: np.ndarray):
+        """Add sorted, unique keys' counts and sums into the arrays"""
+        index, found = self._find(keys)
+        new_counts, new_sums = self.counts.copy(), self.evaluation_sums.copy()
+        new_counts[index[found]] += counts[found].astype(np.uint32)
+        new_sums[index[found]] += sums[found]
+        missing = ~found
+        self.keys = np.insert(self.keys, index[missing], keys[missing])
+        self.counts = np.insert(new_counts, index[missing], counts[missing].astype(np.uint32))
+        self.evaluation_sums = np.insert(new_sums, index[missing], sums[missing])
+
+    def _find(self, keys: np.ndarray):
+        """Rows of keys and whether each was found"""
+        index = np.searchsorted(self.keys, keys)
+        found = index < len(self.keys)
+        found[found] = self.keys[index[found]] == keys[found]
+        return index, found
+
+    def count(self, key: int) -> int:
+        """Times a pattern was seen"""
+        return int(self.count_many([key])[0])
+
+    def count_many(self, keys: Iterable[int]) -> np.ndarray:
+        """Vectorized count lookup"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        index, found = self._find(keys)
+        counts = np.zeros(len(keys), dtype=np.int64)
+        counts[found] = self.counts[index[found]]
+        if self._pending:
+            counts += [self._pending.get(key, (0, 0.0))[0] for key in keys.tolist()]
+        return counts
+
+    def mean_evaluation(self, key: int) -> Optional[float]:
+        """Average evaluation of a pattern, None if never seen"""
+        index, found = self._find(np.asarray([key], dtype=np.uint64))
+        count, total = self._pending.get(key, (0, 0.0))
+        if found[0]:
+            count += int(self.counts[index[0]])
+            total += float(self.evaluation_sums[index[0]])
+        if not count:
+            return None
+        return float(total / count)
+
+    def __contains__(self, key: int) -> bool:
+        return self.count(key) > 0
+
+    def __len__(self):
+        if not self._pending:
+            return len(self.keys)
+        pending = np.fromiter(self._pending.keys(), dtype=np.uint64, count=len(self._pending))
+        return len(self.keys) + int(np.count_nonzero(~self._find(pending)[1]))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays"""
+        return self.keys.nbytes + self.counts.nbytes + self.evaluation_sums.nbytes
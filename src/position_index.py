@@ -0,0 +1,197 @@
+import chess
+import chess.polyglot
+import numpy as np
+from typing import Iterable, List, Optional
+
+from src.memory_format import BITBOARD_LAYOUT, decode_move, encode_move
+
+NO_MOVE = 0  # a1a1 is never a legal move, so 0 marks "no move"
+
+def _build_byte_tables() -> np.ndarray:
+    """XOR of the Polyglot piece randoms for every byte of every bitboard
+
+    tables[j, b, v] is the hash contribution of value v in byte b of
+    bitboard j (BITBOARD_LAYOUT order), so a bitboard hashes in 8 lookups.
+    """
+    randoms = np.array(chess.polyglot.POLYGLOT_RANDOM_ARRAY[:768], dtype=np.uint64)
+    tables = np.zeros((len(BITBOARD_LAYOUT), 8, 256), dtype=np.uint64)
+    values = np.arange(256)
+    for j, (piece_type, color) in enumerate(BITBOARD_LAYOUT):
+        piece_index = (piece_type - 1) * 2 + int(color)
+        for byte in range(8):
+            for bit in range(8):
+                square = byte * 8 + bit
+                tables[j, byte, (values >> bit) & 1 == 1] ^= randoms[64 * piece_index + square]
+    return tables
+
+_BYTE_TABLES = _build_byte_tables()
+_CASTLING_RANDOMS = np.array(chess.polyglot.POLYGLOT_RANDOM_ARRAY[768:772], dtype=np.uint64)
+_EP_RANDOMS = np.array(chess.polyglot.POLYGLOT_RANDOM_ARRAY[772:780], dtype=np.uint64)
+_TURN_RANDOM = np.uint64(chess.polyglot.POLYGLOT_RANDOM_ARRAY[780])
+
+def position_key(board: chess.Board) -> int:
+    """64-bit Zobrist key of a position; move counters do not affect it"""
+    return chess.polyglot.zobrist_hash(board)
+
+def zobrist_keys(bitboards: np.ndarray, turn: np.ndarray, castling: np.ndarray,
+                 ep_squares: Optional[np.ndarray] = None) -> np.ndarray:
+    """Vectorized position_key for N positions
+
+    bitboards is (N, 12) in BITBOARD_LAYOUT order, turn (N,) True for
+    White, castling (N, 4) as white kingside/queenside, black
+    kingside/queenside and ep_squares (N,) with -1 for none. Keys equal
+    position_key() of the same boards.
+    """
+    bitboards = np.ascontiguousarray(bitboards, dtype='<u8')
+    count = len(bitboards)
+    keys = np.zeros(count, dtype=np.uint64)
+    # (N, 12, 8) bytes; one table lookup per byte
+    board_bytes = bitboards.view(np.uint8).reshape(count, len(BITBOARD_LAYOUT), 8)
+    for j in range(len(BITBOARD_LAYOUT)):
+        for byte in range(8):
+            keys ^= _BYTE_TABLES[j, byte][board_bytes[:, j, byte]]
+
+    castling = np.asarray(castling, dtype=bool)
+    for right in range(4):
+        keys[castling[:, right]] ^= _CASTLING_RANDOMS[right]
+    turn = np.asarray(turn, dtype=bool)
+    keys[turn] ^= _TURN_RANDOM
+
+    if ep_squares is not None:
+        keys ^= en_passant_keys(bitboards, turn, ep_squares)
+    return keys
+
+def en_passant_keys(bitboards: np.ndarray, turn: np.ndarray, ep_squares: np.ndarray) -> np.ndarray:
+    """En passant part of zobrist_keys; XOR it into keys hashed without one"""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    turn = np.asarray(turn, dtype=bool)
+    ep_squares = np.asarray(ep_squares, dtype=np.int64)
+    keys = np.zeros(len(ep_squares), dtype=np.uint64)
+    rows = np.flatnonzero(ep_squares >= 0)
+    if len(rows):
+        # Hashed only when a pawn of the side to move stands next to
+        # the pawn that can be taken, as in chess.polyglot
+        ep = ep_squares[rows]
+        white = turn[rows]
+        behind = np.where(white, ep - 8, ep + 8)
+        pawns = np.where(white, bitboards[rows, 0], bitboards[rows, 1])
+        file = ep % 8
+        attacker = np.zeros(len(rows), dtype=bool)
+        for side, valid in ((-1, file > 0), (1, file < 7)):
+            square = np.clip(behind + side, 0, 63).astype(np.uint64)
+            attacker |= valid & (((pawns >> square) & np.uint64(1)) == 1)
+        keys[rows[attacker]] = _EP_RANDOMS[file[attacker]]
+    return keys
+
+def ep_squares_from_fens(fens: Iterable[str]) -> np.ndarray:
+    """En passant square of every FEN, -1 for none"""
+    return np.fromiter(
+        (-1 if field == '-' else chess.parse_square(field)
+         for field in (fen.split(' ')[3] for fen in fens)),
+        dtype=np.int64
+    )
+
+class ZobristMoveIndex:
+    """Move memory keyed by Zobrist hash, stored as sorted NumPy arrays
+
+    Keys are uint64 and moves uint16 (10 bytes per position instead of a
+    FEN string key). Single inserts and batches smaller than
+    merge_threshold go to a small pending dict that is merged into the
+    sorted arrays in batches; lookups binary-search and check the pending
+    dict, so learning one move at a time never re-sorts the index.
+    """
+
+    def __init__(self, merge_threshold: int = 4096):
+        """Create an empty index"""
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.moves = np.empty(0, dtype=np.uint16)
+        self.merge_threshold = merge_threshold
+        self._pending = {}
+
+    def add(self, key: int, move: str):
+        """Remember a move for a position key"""
+        self._pending[key] = encode_move(move)
+        if len(self._pending) >= self.merge_threshold:
+            self._merge()
+
+    def add_many(self, keys: Iterable[int], moves: Iterable[int]):
+        """Remember many encoded moves at once; later entries win"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        moves = np.asarray(moves, dtype=np.uint16)
+        if len(self._pending) + len(keys) < self.merge_threshold:
+            self._pending.update(zip(keys.tolist(), moves.tolist()))
+            return
+        self._merge()
+        self._merge_arrays(keys, moves)
+
+    def get(self, key: int) -> Optional[str]:
+        """Look up the move for a position key"""
+        if key in self._pending:
+            return decode_move(self._pending[key])
+        index = np.searchsorted(self.keys, np.uint64(key))
+        if index < len(self.keys) and self.keys[index] == key:
+            return decode_move(self.moves[index])
+        return None
+
+    def get_many(self, keys: Iterable[int]) -> List[Optional[str]]:
+        """Vectorized lookup of many position keys"""
+        query = np.asarray(keys, dtype=np.uint64)
+        index, found = self._find(query)
+        moves = [
+            decode_move(self.moves[i]) if hit else None
+            for i, hit in zip(index.tolist(), found.tolist())
+        ]
+        if self._pending:
+            for i, key in enumerate(query.tolist()):
+                if key in self._pending:
+                    moves[i] = decode_move(self._pending[key])
+        return moves
+
+    def _find(self, keys: np.ndarray):
+        """Rows of keys in the sorted arrays and whether each was found"""
+        index = np.searchsorted(self.keys, keys)
+        found = index < len(self.keys)
+        found[found] = self.keys[index[found]] == keys[found]
+        return index, found
+
+    def _merge(self):
+        """Fold pending inserts into the sorted arrays"""
+        if not self._pending:
+            return
+        keys = np.fromiter(self._pending.keys(), dtype=np.uint64, count=len(self._pending))
+        moves = np.fromiter(self._pending.values(), dtype=np.uint16, count=len(self._pending))
+        self._pending = {}
+        self._merge_arrays(keys, moves)
+
+    def _merge_arrays(self, keys: np.ndarray, moves: np.ndarray):
+        """Merge new entries into the sorted arrays, newer entries winning
+
+        Only the new entries are sorted; they are then inserted into the
+        existing arrays in one linear pass.
+        """
+        order = np.argsort(keys, kind='stable')
+        keys, moves = keys[order], moves[order]
+        # Keep the last (newest) entry of every run of equal keys
+        last = np.ones(len(keys), dtype=bool)
+        last[:-1] = keys[1:] != keys[:-1]
+        keys, moves = keys[last], moves[last]
+
+        index, found = self._find(keys)
+        updated = self.moves.copy() if found.any() else self.moves
+        updated[index[found]] = moves[found]
+        self.keys = np.insert(self.keys, index[~found], keys[~found])
+        self.moves = np.insert(updated, index[~found], moves[~found])
+
+    def __contains__(self, key: int) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self):
+        if not self._pending:
+            return len(self.keys)
+        pending = np.fromiter(self._pending.keys(), dtype=np.uint64, count=len(self._pending))
+        return len(self.keys) + int(np.count_nonzero(~self._find(pending)[1]))
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the key and move arrays"""
+        return self.keys.nbytes + self.moves.nbytes
@@ -0,0 +1,167 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+class Record:
+    """Read access by key for code written against the legacy dict forms
+
+    record["best_move"], record.get("depth", 0), "key" in record and
+    record.keys()/items() work as they did on the dicts, and a record
+    equals its dict form. Records are not writable by key; use attributes.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str):
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __eq__(self, other):
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == to_jsonable(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def to_dict(self) -> Dict:
+        """Legacy dict form, JSON-serializable"""
+        return {name: to_jsonable(getattr(self, name)) for name in self.__dataclass_fields__}
+
+    @classmethod
+    def coerce(cls, value):
+        """A record from either a record or its legacy dict"""
+        return value if isinstance(value, cls) else cls.from_dict(value)
+
+def to_jsonable(value):
+    """json default= hook: records and NumPy values as plain JSON types"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    return value
+
+@dataclass(slots=True, eq=False)
+class AlternativeMove(Record):
+    """A multipv alternative to the best move"""
+    move: str
+    evaluation: float
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'AlternativeMove':
+        return cls(data["move"], data["evaluation"])
+
+@dataclass(slots=True, eq=False)
+class PositionMemory(Record):
+    """Engine knowledge about one position, as produced by the extractors"""
+    position: str
+    best_move: str
+    evaluation: float
+    depth: int = 0
+    principal_variation: List[str] = field(default_factory=list)
+    alternative_moves: List[AlternativeMove] = field(default_factory=list)
+    timestamp: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'PositionMemory':
+        return cls(
+            data["position"],
+            data["best_move"],
+            data["evaluation"],
+            data.get("depth", 0),
+            list(data.get("principal_variation", [])),
+            [AlternativeMove.coerce(alt) for alt in data.get("alternative_moves", [])],
+            data.get("timestamp", time.time())
+        )
+
+@dataclass(slots=True, eq=False)
+class TokenizedMemory(Record):
+    """Tokens of one memory
+
+    Token fields are NumPy arrays; memories tokenized together hold row
+    views of the batch arrays rather than lists of Python floats. The
+    legacy dict form nests original_position, depth and timestamp under
+    "metadata", which record["metadata"] still returns.
+    """
+    position_tokens: np.ndarray
+    evaluation_token: np.ndarray
+    move_tokens: np.ndarray
+    pv_tokens: np.ndarray
+    alternative_tokens: List[Dict] = field(default_factory=list)
+    original_position: str = ""
+    depth: int = 0
+    timestamp: float = field(default_factory=time.time)
+
+    def __getitem__(self, key: str):
+        if key == "metadata":
+            return {
+                "original_position": self.original_position,
+                "depth": self.depth,
+                "timestamp": self.timestamp
+            }
+        return Record.__getitem__(self, key)
+
+    def to_dict(self) -> Dict:
+        return {
+            "position_tokens": self.position_tokens.tolist(),
+            "evaluation_token": self.evaluation_token.tolist(),
+            "move_tokens": self.move_tokens.tolist(),
+            "pv_tokens": self.pv_tokens.tolist(),
+            "alternative_tokens": to_jsonable(self.alternative_tokens),
+            "metadata": self["metadata"]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TokenizedMemory':
+        metadata = data.get("metadata", {})
+        return cls(
+            np.asarray(data["position_tokens"], dtype=np.float64),
+            np.asarray(data["evaluation_token"], dtype=np.float64),
+            np.asarray(data["move_tokens"], dtype=np.float64),
+            np.asarray(data.get("pv_tokens", []), dtype=np.float64).reshape(-1, len(data["move_tokens"])),
+            list(data.get("alternative_tokens", [])),
+            metadata.get("original_position", ""),
+            metadata.get("depth", 0),
+            metadata.get("timestamp", time.time())
+        )
+
+@dataclass(slots=True, eq=False)
+class LearningRecord(Record):
+    """One learning session of a StudentAgent"""
+    positions: int
+    seconds: float
+    positions_per_second: float
+    average_confidence: float
+    timestamp: float = field(default_factory=time.time)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LearningRecord':
+        return cls(data["positions"], data["seconds"], data["positions_per_second"],
+                   data.get("average_confidence", 0.0), data.get("timestamp", time.time()))
@@ -0,0 +1,286 @@
+import chess
+import chess.polyglot
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+MATE_SCORE = 1000000
+MATE_THRESHOLD = MATE_SCORE - 1000  # Scores beyond this are forced mates
+INFINITY = float('inf')
+
+# Piece values used for MVV-LVA capture ordering
+ORDER_VALUES = {
+    chess.PAWN: 1,
+    chess.KNIGHT: 3,
+    chess.BISHOP: 3,
+    chess.ROOK: 5,
+    chess.QUEEN: 9,
+    chess.KING: 100
+}
+
+# Transposition table entry bounds
+EXACT, LOWER, UPPER = 0, 1, 2
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time or node budget runs out"""
+
+class AlphaBetaSearch:
+    """Iterative-deepening alpha-beta search with a transposition table
+
+    evaluate(board) must score the position from the side to move's point
+    of view. An incremental evaluator (see BitboardEvaluator) may be passed
+    instead; its score is then updated on every push/pop rather than
+    recomputed at each leaf. Moves are ordered hash move first (transposition table, then
+    hash_move_provider), then captures by MVV-LVA, killer moves and the
+    history heuristic. The search stops at max_depth or when the time or
+    node budget is spent, returning the best move of the deepest completed
+    iteration.
+    """
+
+    def __init__(self, evaluate: Callable[[chess.Board], float],
+                 max_depth: int = 4,
+                 time_limit: Optional[float] = 0.5,
+                 node_limit: Optional[int] = None,
+                 hash_move_provider: Optional[Callable[[int], Optional[str]]] = None,
+                 max_table_entries: int = 200000,
+                 evaluator=None):
+        """Configure the search and its budget"""
+        self.evaluate = evaluate
+        self.evaluator = evaluator
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.hash_move_provider = hash_move_provider
+        self.max_table_entries = max_table_entries
+
+        self.transposition_table: Dict[int, Tuple[int, float, int, Optional[chess.Move]]] = {}
+        self.killer_moves: Dict[int, List[chess.Move]] = {}
+        self.history: Dict[Tuple[int, int], int] = {}
+        self.last_stats = {}
+        self._nodes = 0
+        self._deadline = None
+
+    def search(self, board: chess.Board) -> Optional[chess.Move]:
+        """Find the best move for the side to move"""
+        legal_moves = list(board.legal_moves)
+        if not legal_moves:
+            return None
+        if len(legal_moves) == 1:
+            self.last_stats = {'depth': 0, 'nodes': 0, 'score': None, 'seconds': 0.0}
+            return legal_moves[0]
+
+        board = board.copy(stack=False)
+        if self.evaluator is not None:
+            self.evaluator.reset(board)
+        start_time = time.time()
+        self._deadline = start_time + self.time_limit if self.time_limit else None
+        self._nodes = 0
+        self.killer_moves = {}
+        if len(self.transposition_table) > self.max_table_entries:
+            self.transposition_table.clear()
+
+        best_move = None
+        best_score = None
+        completed_depth = 0
+
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._search_root(board, depth, best_move)
+            except SearchTimeout:
+                break
+            if move is not None:
+                best_move, best_score = move, score
+                completed_depth = depth
+            if best_score is not None and abs(best_score) >= MATE_THRESHOLD:
+                break  # Forced mate found
+
+        if best_move is None:
+            # Not even depth 1 finished; fall back on move ordering alone
+            best_move = self._order_moves(board, legal_moves, None, 0)[0]
+
+        self.last_stats = {
+            'depth': completed_depth,
+            'nodes': self._nodes,
+            'score': best_score,
+            'seconds': time.time() - start_time
+        }
+        return best_move
+
+    def _check_budget(self):
+        """Abort the search once the time or node budget is spent"""
+        self._nodes += 1
+        if self.node_limit is not None and self._nodes > self.node_limit:
+            raise SearchTimeout()
+        if self._deadline is not None and self._nodes % 256 == 0 and time.time() > self._deadline:
+            raise SearchTimeout()
+
+    def _search_root(self, board: chess.Board, depth: int,
+                     previous_best: Optional[chess.Move]) -> Tuple[float, Optional[chess.Move]]:
+        """Search all root moves to the given depth"""
+        alpha, beta = -INFINITY, INFINITY
+        best_move = None
+        key = chess.polyglot.zobrist_hash(board)
+        hash_move = previous_best or self._hash_move(board, key)
+
+        for move in self._order_moves(board, list(board.legal_moves), hash_move, 0):
+            self._push(board, move)
+            try:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, 1)
+            finally:
+                self._pop(board)
+            if score > alpha or best_move is None:
+                alpha = max(alpha, score)
+                best_move = move
+
+        self._store(key, depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def _negamax(self, board: chess.Board, depth: int, alpha: float, beta: float, ply: int) -> float:
+        """Alpha-beta negamax; scores are from the side to move's view"""
+        self._check_budget()
+
+        if board.is_repetition(2) or board.halfmove_clock >= 100 or board.is_insufficient_material():
+            return 0.0
+        if depth <= 0:
+            return self._quiescence(board, alpha, beta, ply)
+
+        key = chess.polyglot.zobrist_hash(board)
+        original_alpha = alpha
+        entry = self.transposition_table.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, tt_move = entry
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_score
+                if entry_flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                elif entry_flag == UPPER:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        moves = list(board.legal_moves)
+        if not moves:
+            return -(MATE_SCORE - ply) if board.is_check() else 0.0
+
+        hash_move = tt_move or self._hash_move(board, key)
+        best_score = -INFINITY
+        best_move = None
+
+        for move in self._order_moves(board, moves, hash_move, ply):
+            is_capture = board.is_capture(move)
+            self._push(board, move)
+            try:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                self._pop(board)
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                if not is_capture:
+                    self._record_cutoff(move, depth, ply)
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self._store(key, depth, best_score, flag, best_move)
+        return best_score
+
+    def _quiescence(self, board: chess.Board, alpha: float, beta: float, ply: int) -> float:
+        """Resolve captures (and check evasions) before evaluating"""
+        self._check_budget()
+
+        in_check = board.is_check()
+        if in_check:
+            moves = list(board.legal_moves)
+            if not moves:
+                return -(MATE_SCORE - ply)
+        else:
+            stand_pat = self._evaluate(board)
+            if stand_pat >= beta:
+                return stand_pat
+            alpha = max(alpha, stand_pat)
+            moves = list(board.generate_legal_captures())
+
+        for move in self._order_moves(board, moves, None, ply):
+            self._push(board, move)
+            try:
+                score = -self._quiescence(board, -beta, -alpha, ply + 1)
+            finally:
+                self._pop(board)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def _push(self, board: chess.Board, move: chess.Move):
+        if self.evaluator is not None:
+            self.evaluator.push(board, move)
+        else:
+            board.push(move)
+
+    def _pop(self, board: chess.Board):
+        if self.evaluator is not None:
+            self.evaluator.pop(board)
+        else:
+            board.pop()
+
+    def _evaluate(self, board: chess.Board) -> float:
+        if self.evaluator is not None:
+            return self.evaluator.current(board)
+        return self.evaluate(board)
+
+    def _hash_move(self, board: chess.Board, key: int) -> Optional[chess.Move]:
+        """Learned move for the position, if the provider knows one"""
+        if self.hash_move_provider is None:
+            return None
+        move_uci = self.hash_move_provider(key)
+        if not move_uci:
+            return None
+        try:
+            move = chess.Move.from_uci(move_uci)
+        except ValueError:
+            return None
+        return move if board.is_legal(move) else None
+
+    def _order_moves(self, board: chess.Board, moves: List[chess.Move],
+                     hash_move: Optional[chess.Move], ply: int) -> List[chess.Move]:
+        """Hash move, then MVV-LVA captures, killers and history-ranked quiets"""
+        killers = self.killer_moves.get(ply, [])
+
+        def score(move: chess.Move) -> float:
+            if move == hash_move:
+                return 10000000
+            if board.is_capture(move):
+                victim = board.piece_type_at(move.to_square) or chess.PAWN  # En passant
+                attacker = board.piece_type_at(move.from_square)
+                return 1000000 + ORDER_VALUES[victim] * 100 - ORDER_VALUES[attacker]
+            if move.promotion:
+                return 900000 + ORDER_VALUES[move.promotion]
+            if move in killers:
+                return 800000 - killers.index(move)
+            return self.history.get((move.from_square, move.to_square), 0)
+
+        return sorted(moves, key=score, reverse=True)
+
+    def _record_cutoff(self, move: chess.Move, depth: int, ply: int):
+        """Update killer moves and history after a quiet beta cutoff"""
+        killers = self.killer_moves.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        history_key = (move.from_square, move.to_square)
+        self.history[history_key] = self.history.get(history_key, 0) + depth * depth
+
+    def _store(self, key: int, depth: int, score: float, flag: int, move: Optional[chess.Move]):
+        """Store a search result, keeping deeper entries"""
+        entry = self.transposition_table.get(key)
+        if entry is None or entry[0] <= depth:
+            self.transposition_table[key] = (depth, score, flag, move)
@@ -0,0 +1,242 @@
+import chess
+import numpy as np
+from typing import List, Optional, Tuple
+
+from src.memory_format import BITBOARD_LAYOUT, decode_move, encode_move
+from src.position_index import zobrist_keys
+
+TABLE_SHIFT = 48  # Bucket hashes hold up to 48 sampled bits below the table number
+_MOVE_MIX = np.uint64(0x9E3779B97F4A7C15)  # Spreads encoded moves over the fingerprint bits
+
+_BYTE_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Set bits per uint64 (np.bitwise_count needs NumPy 2)"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    bytes_view = np.ascontiguousarray(values).view(np.uint8).reshape(values.shape + (8,))
+    return _BYTE_POPCOUNT[bytes_view].sum(axis=-1, dtype=np.uint8)
+
+def board_bitboards(board: chess.Board) -> np.ndarray:
+    """(12,) piece bitboards of a board in BITBOARD_LAYOUT order"""
+    return np.array([board.pieces_mask(piece_type, color) for piece_type, color in BITBOARD_LAYOUT],
+                    dtype=np.uint64)
+
+class PositionSimilarityIndex:
+    """Nearest learned positions by piece-placement Hamming distance
+
+    Positions are their 12 piece bitboards (768 bits); the distance is the
+    number of piece-square bits that differ, so a quiet move away is 2 and
+    a capture 3. Small indexes are scanned brute force. Larger ones use
+    bit-sampling LSH: each of `tables` hash tables buckets positions by
+    `bits_per_table` sampled bits, chosen among the bits that actually vary
+    in the data, and only the union of the query's buckets is scanned.
+
+    Single adds and batches smaller than merge_threshold wait in a pending
+    buffer that queries scan brute force; merged rows are hashed into the
+    existing LSH buckets, so the tables are built only once. A (position,
+    move) pair already in the index is not added again.
+    """
+
+    def __init__(self, tables: int = 12, bits_per_table: int = 24,
+                 brute_force_limit: int = 20000, max_candidates: int = 256, seed: int = 0,
+                 merge_threshold: int = 1024):
+        """Configure the LSH tables and when to use them"""
+        self.tables = tables
+        self.bits_per_table = bits_per_table
+        self.brute_force_limit = brute_force_limit
+        self.max_candidates = max_candidates
+        self.merge_threshold = merge_threshold
+        self.random = np.random.default_rng(seed)
+
+        self.bitboards = np.empty((0, len(BITBOARD_LAYOUT)), dtype=np.uint64)
+        self.turn = np.empty(0, dtype=bool)
+        self.moves = np.empty(0, dtype=np.uint16)
+        self._fingerprints = np.empty(0, dtype=np.uint64)  # sorted, one per row
+        self._pending = []
+        self._pending_arrays = None
+        self._sampled_bits = None  # (tables, bits_per_table) bit positions
+        self._bit_weights = None
+        self._bucket_hashes = None  # sorted (table << 48 | hash) of every row
+        self._bucket_rows = None    # row of each sorted hash
+
+    def add(self, board: chess.Board, move: str):
+        """Add one learned position"""
+        self._pending.append((board_bitboards(board), board.turn, encode_move(move)))
+        self._pending_arrays = None
+        if len(self._pending) >= self.merge_threshold:
+            self._merge()
+
+    def add_many(self, bitboards: np.ndarray, turn: np.ndarray, moves: np.ndarray):
+        """Add (N, 12) bitboards with side to move and encoded moves"""
+        bitboards = np.asarray(bitboards, dtype=np.uint64)
+        turn = np.asarray(turn, dtype=bool)
+        moves = np.asarray(moves, dtype=np.uint16)
+        if len(self._pending) + len(moves) < self.merge_threshold:
+            # Copied, as the rows may be views of a package that gets closed
+            self._pending.extend(zip(bitboards.copy(), turn.tolist(), moves.tolist()))
+            self._pending_arrays = None
+            return
+        self._merge()
+        self._append_rows(bitboards, turn, moves)
+
+    def _merge(self):
+        """Fold pending adds into the arrays"""
+        if not self._pending:
+            return
+        bitboards, turn, moves = self._pending_columns()
+        self._pending, self._pending_arrays = [], None
+        self._append_rows(bitboards, turn, moves)
+
+    def _pending_columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pending adds as (bitboards, turn, moves) arrays"""
+        if self._pending_arrays is None:
+            self._pending_arrays = (
+                np.array([bitboards for bitboards, _, _ in self._pending], dtype=np.uint64).reshape(-1, len(BITBOARD_LAYOUT)),
+                np.array([turn for _, turn, _ in self._pending], dtype=bool),
+                np.array([move for _, _, move in self._pending], dtype=np.uint16)
+            )
+        return self._pending_arrays
+
+    def _fingerprint(self, bitboards: np.ndarray, turn: np.ndarray, moves: np.ndarray) -> np.ndarray:
+        """64-bit hash of every (bitboards, turn, move) row"""
+        no_castling = np.zeros((len(moves), 4), dtype=bool)
+        return zobrist_keys(bitboards, turn, no_castling) ^ (moves.astype(np.uint64) * _MOVE_MIX)
+
+    def _append_rows(self, bitboards: np.ndarray, turn: np.ndarray, moves: np.ndarray):
+        """Append rows not yet in the index and hash them into the LSH tables"""
+        fingerprints = self._fingerprint(bitboards, turn, moves)
+        fingerprints, first = np.unique(fingerprints, return_index=True)
+        index = np.searchsorted(self._fingerprints, fingerprints)
+        known = index < len(self._fingerprints)
+        known[known] = self._fingerprints[index[known]] == fingerprints[known]
+        if known.all():
+            return
+        self._fingerprints = np.insert(self._fingerprints, index[~known], fingerprints[~known])
+        new = np.sort(first[~known])  # keep insertion order
+
+        start = len(self.bitboards)
+        self.bitboards = np.concatenate([self.bitboards, bitboards[new]])
+        self.turn = np.concatenate([self.turn, turn[new]])
+        self.moves = np.concatenate([self.moves, moves[new]])
+        if self._bucket_hashes is not None:
+            self._insert_buckets(start)
+
+    def _insert_buckets(self, start: int):
+        """Hash rows from start on with the existing sampled bits and merge
+        them into the sorted bucket arrays"""
+        count = len(self.bitboards) - start
+        hashes = self._hash_rows(self._bits(self.bitboards[start:])).ravel()
+        rows = np.tile(np.arange(start, start + count, dtype=np.uint32), self.tables)
+        order = np.argsort(hashes, kind='stable')
+        hashes, rows = hashes[order], rows[order]
+        index = np.searchsorted(self._bucket_hashes, hashes, side='right')
+        self._bucket_hashes = np.insert(self._bucket_hashes, index, hashes)
+        self._bucket_rows = np.insert(self._bucket_rows, index, rows)
+
+    def _bits(self, bitboards: np.ndarray) -> np.ndarray:
+        """(N, 768) bit matrix of (N, 12) bitboards"""
+        return np.unpackbits(
+            np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8), axis=1, bitorder='little'
+        )
+
+    def _build_tables(self, chunk_size: int = 65536):
+        """Choose the sampled bits and sort all bucket hashes into one array"""
+        count = len(self.bitboards)
+        frequency = np.zeros(64 * len(BITBOARD_LAYOUT))
+        for start in range(0, count, chunk_size):
+            frequency += self._bits(self.bitboards[start:start + chunk_size]).sum(axis=0)
+        frequency /= max(count, 1)
+        # Bits that are (nearly) always equal split nothing; prefer balanced ones
+        spread = frequency * (1 - frequency)
+        candidates = np.flatnonzero(spread > 0)
+        bits = min(self.bits_per_table, len(candidates), TABLE_SHIFT)
+        weights = spread[candidates] / spread[candidates].sum()
+        self._sampled_bits = np.array([
+            np.sort(self.random.choice(candidates, size=bits, replace=False, p=weights))
+            for _ in range(self.tables)
+        ])
+        self._bit_weights = np.uint64(1) << np.arange(bits, dtype=np.uint64)
+
+        # Table number in the high bits keeps every table's buckets apart
+        hashes = np.empty(self.tables * count, dtype=np.uint64)
+        for start in range(0, count, chunk_size):
+            bits_chunk = self._bits(self.bitboards[start:start + chunk_size])
+            end = min(start + chunk_size, count)
+            for table, bucket in enumerate(self._hash_rows(bits_chunk)):
+                hashes[table * count + start:table * count + end] = bucket
+        order = np.argsort(hashes, kind='stable')
+        self._bucket_hashes = hashes[order]
+        self._bucket_rows = (order % max(count, 1)).astype(np.uint32)
+
+    def _hash_rows(self, bits: np.ndarray) -> np.ndarray:
+        """(tables, N) bucket hashes of bit rows: sampled bits packed into a uint64"""
+        sampled = bits[:, self._sampled_bits].astype(np.uint64)  # (N, tables, bits)
+        hashes = (sampled @ self._bit_weights).T
+        return hashes | (np.arange(self.tables, dtype=np.uint64)[:, None] << np.uint64(TABLE_SHIFT))
+
+    def _candidates(self, bitboards: np.ndarray) -> np.ndarray:
+        """Rows sharing at least one LSH bucket with the query (may repeat)"""
+        if self._bucket_hashes is None:
+            self._build_tables()
+        buckets = self._hash_rows(self._bits(bitboards[None, :]))[:, 0]
+        starts = np.searchsorted(self._bucket_hashes, buckets, side='left')
+        ends = np.minimum(np.searchsorted(self._bucket_hashes, buckets, side='right'),
+                          starts + self.max_candidates)
+        return np.concatenate([
+            self._bucket_rows[start:end] for start, end in zip(starts, ends)
+        ]).astype(np.intp)
+
+    def nearest(self, board: chess.Board, k: int = 5,
+                max_distance: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(move, distance) of the k nearest positions with the same side to
+        move whose learned move is legal on board, nearest first"""
+        query = board_bitboards(board)
+        distances, moves = [], []
+        if len(self.bitboards):
+            if len(self.bitboards) <= self.brute_force_limit:
+                rows = np.flatnonzero(self.turn == board.turn)
+            else:
+                rows = self._candidates(query)
+                rows = rows[self.turn[rows] == board.turn]
+            distances.append(_popcount(self.bitboards[rows] ^ query).sum(axis=1, dtype=np.int64))
+            moves.append(self.moves[rows])
+        if self._pending:
+            bitboards, turn, pending_moves = self._pending_columns()
+            same_side = turn == board.turn
+            distances.append(_popcount(bitboards[same_side] ^ query).sum(axis=1, dtype=np.int64))
+            moves.append(pending_moves[same_side])
+        if not distances:
+            return []
+        distances, moves = np.concatenate(distances), np.concatenate(moves)
+        if max_distance is not None:
+            keep = distances <= max_distance
+            distances, moves = distances[keep], moves[keep]
+        if not len(moves):
+            return []
+
+        order = np.argsort(distances, kind='stable')
+        distances, moves = distances[order], moves[order]
+        # Nearest occurrence of every distinct move
+        _, first = np.unique(moves, return_index=True)
+        first.sort()
+
+        results = []
+        for i in first:
+            move_uci = decode_move(moves[i])
+            if board.is_legal(chess.Move.from_uci(move_uci)):
+                results.append((move_uci, int(distances[i])))
+                if len(results) == k:
+                    break
+        return results
+
+    def __len__(self):
+        return len(self.bitboards) + len(self._pending)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by positions and LSH tables"""
+        total = self.bitboards.nbytes + self.turn.nbytes + self.moves.nbytes + self._fingerprints.nbytes
+        if self._bucket_hashes is not None:
+            total += self._bucket_hashes.nbytes + self._bucket_rows.nbytes
+        return total
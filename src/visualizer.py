@@ -3,10 +3,131 @@
 import chess
 import chess.svg
 import matplotlib.pyplot as plt
+import numpy as np
 import os
 import imageio
+import io
 import time
+from collections import OrderedDict
 from datetime import datetime
+from PIL import Image, ImageDraw, ImageFont
+
+try:
+    import cairosvg
+except (ImportError, OSError):  # cairosvg needs the cairo library at import time
+    cairosvg = None
+
+LIGHT_SQUARE = (255, 206, 158)
+DARK_SQUARE = (209, 139, 71)
+MOVE_HIGHLIGHT = (205, 210, 106)
+ARROW_COLOR = (21, 120, 27)
+
+class FrameRenderer:
+    """Rasterizes positions in-process by compositing cached piece sprites
+
+    The board background and the 12 piece sprites are drawn once; a frame
+    is the background with sprites pasted on, so no SVG is rasterized per
+    frame. Sprites come from chess.svg rasterized with cairosvg, or from
+    the DejaVu chess glyphs when the cairo library is not installed.
+    Recent frames are kept in an LRU cache keyed by placement and move.
+    """
+
+    def __init__(self, size: int = 400, cache_size: int = 64):
+        self.square = size // 8
+        self.size = self.square * 8
+        self.cache_size = cache_size
+        self.frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.background = self._draw_background()
+        self.sprites = {
+            piece: self._draw_sprite(chess.Piece.from_symbol(piece))
+            for piece in "PNBRQKpnbrqk"
+        }
+
+    def _square_box(self, square: int):
+        """Pixel box of a square, White at the bottom"""
+        x = chess.square_file(square) * self.square
+        y = (7 - chess.square_rank(square)) * self.square
+        return x, y, x + self.square, y + self.square
+
+    def _draw_background(self) -> Image.Image:
+        image = Image.new("RGB", (self.size, self.size), LIGHT_SQUARE)
+        draw = ImageDraw.Draw(image)
+        for square in chess.SQUARES:
+            if (chess.square_file(square) + chess.square_rank(square)) % 2 == 0:
+                draw.rectangle(self._square_box(square), fill=DARK_SQUARE)
+        return image
+
+    def _draw_sprite(self, piece: chess.Piece) -> Image.Image:
+        if cairosvg is not None:
+            png = cairosvg.svg2png(bytestring=chess.svg.piece(piece).encode(),
+                                   output_width=self.square, output_height=self.square)
+            return Image.open(io.BytesIO(png)).convert("RGBA")
+
+        sprite = Image.new("RGBA", (self.square, self.square), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+        white = piece.color == chess.WHITE
+        try:
+            # Filled glyphs for both colors, told apart by fill and outline
+            font = ImageFont.truetype("DejaVuSans.ttf", int(self.square * 0.8))
+            text = chess.UNICODE_PIECE_SYMBOLS[piece.symbol().lower()]
+        except OSError:
+            font = ImageFont.load_default()
+            text = piece.symbol().upper()
+        draw.text((self.square / 2, self.square / 2), text, font=font, anchor="mm",
+                  fill="white" if white else "black", stroke_width=max(1, self.square // 25),
+                  stroke_fill="black" if white else "white")
+        return sprite
+
+    def _compose(self, board: chess.Board, move) -> np.ndarray:
+        image = self.background.copy()
+        draw = ImageDraw.Draw(image)
+        if move:
+            for square in (move.from_square, move.to_square):
+                draw.rectangle(self._square_box(square), fill=MOVE_HIGHLIGHT)
+        for square, piece in board.piece_map().items():
+            x, y, _, _ = self._square_box(square)
+            sprite = self.sprites[piece.symbol()]
+            image.paste(sprite, (x, y), sprite)
+        if move:
+            self._draw_arrow(draw, move.from_square, move.to_square)
+        return np.asarray(image)
+
+    def _draw_arrow(self, draw: ImageDraw.ImageDraw, from_square: int, to_square: int):
+        start = np.array(self._square_box(from_square)[:2]) + self.square / 2
+        end = np.array(self._square_box(to_square)[:2]) + self.square / 2
+        direction = end - start
+        length = np.hypot(*direction)
+        if not length:
+            return
+        direction /= length
+        normal = np.array([-direction[1], direction[0]])
+        head = self.square * 0.4
+        base = end - direction * head
+        draw.line([tuple(start), tuple(base)], fill=ARROW_COLOR, width=max(2, self.square // 7))
+        draw.polygon([tuple(end), tuple(base + normal * head / 2), tuple(base - normal * head / 2)],
+                     fill=ARROW_COLOR)
+
+    def render(self, board: chess.Board, move=None) -> np.ndarray:
+        """(size, size, 3) uint8 frame of a board with an optional move arrow"""
+        if isinstance(move, str):
+            try:
+                move = chess.Move.from_uci(move)
+            except ValueError:
+                move = None
+        key = (board.board_fen(), move)
+        frame = self.frames.get(key)
+        if frame is not None:
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return frame
+        self.misses += 1
+        frame = self._compose(board, move)
+        self.frames[key] = frame
+        if len(self.frames) > self.cache_size:
+            self.frames.popitem(last=False)
+        return frame
 
 class ChessVisualizer:
     def __init__(self, output_dir='chess_visuals'):
@@ -15,10 +136,8 @@ class ChessVisualizer:
         # Ana klasörü oluştur
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
-        # Temp klasörü oluştur
-        self.temp_dir = os.path.join(output_dir, 'temp')
-        if not os.path.exists(self.temp_dir):
-            os.makedirs(self.temp_dir)
+        # Kareler bellekte çizilir, geçici dosya gerekmez
+        self.renderer = FrameRenderer()
     
     def save_position(self, position, move=None, filename=None, description=None):
         """Pozisyonu SVG olarak kaydet"""
@@ -56,38 +175,30 @@ class ChessVisualizer:
             f.write(svg_content)
         return filepath
     
-    def create_learning_animation(self, positions, moves, descriptions=None):
-        """Tüm hamleleri animasyonlu GIF olarak kaydet"""
-        images = []
+    def create_learning_animation(self, positions, moves, descriptions=None,
+                                  output_path=None, fps=1.0):
+        """Tüm hamleleri animasyon olarak kaydet (.gif veya .mp4)
         
-        for i, (pos, move) in enumerate(zip(positions, moves)):
-            description = descriptions[i] if descriptions else f"Move {i+1}: {move}"
-            temp_path = os.path.join(self.temp_dir, f"temp_{i}.svg")
-            
-            # Her kareyi kaydet
-            self.save_position(pos, move, temp_path, description)
-            
-            # SVG'yi PNG'ye çevir
-            png_path = os.path.join(self.temp_dir, f"frame_{i}.png")
-            os.system(f"magick {temp_path} {png_path}")
-            
-            try:
-                images.append(imageio.imread(png_path))
-            except Exception as e:
-                print(f"Frame {i} oluşturulurken hata: {e}")
-                continue
-        
-        if images:
-            # Animasyonu kaydet
+        Kareler bellekte çizilip doğrudan yazıcıya aktarılır; harici
+        program veya geçici dosya kullanılmaz.
+        """
+        if output_path is None:
             output_path = os.path.join(self.output_dir, 'game_animation.gif')
-            imageio.mimsave(output_path, images, duration=1)
+        if output_path.endswith('.gif'):
+            writer = imageio.get_writer(output_path, mode='I', duration=1000 / fps, loop=0)
+        else:
+            writer = imageio.get_writer(output_path, fps=fps)
         
-        # Temp dosyaları temizle
-        for file in os.listdir(self.temp_dir):
-            try:
-                os.remove(os.path.join(self.temp_dir, file))
-            except Exception as e:
-                print(f"Temp dosya silinirken hata: {e}")
+        try:
+            for i, (pos, move) in enumerate(zip(positions, moves)):
+                try:
+                    self.board.set_fen(pos)
+                    writer.append_data(self.renderer.render(self.board, move))
+                except Exception as e:
+                    print(f"Frame {i} oluşturulurken hata: {e}")
+                    continue
+        finally:
+            writer.close()
         
         return output_path
 
@@ -122,7 +233,10 @@ class LearningVisualizer:
         # Öğrenme hızı grafiği
         times = [h['timestamp'] for h in student.learning_history]
         relative_times = [(t - times[0]) for t in times]
-        moves = range(1, len(times) + 1)
+        # Bulk ingests record one entry per batch; positions of entries
+        # that left the bounded history are the offset of the curve
+        moves = np.cumsum([h.get('positions', 1) for h in student.learning_history])
+        moves += int(student.learning_history.sum('positions')) - int(moves[-1])
         
         ax1.plot(relative_times, moves, marker='o', color='green', linewidth=2)
         ax1.set_title('Learning Speed')
@@ -0,0 +1,94 @@
+# tests/fake_engines.py
+# Testlerin paylaştığı sahte UCI engine betikleri
+
+import os
+import sys
+
+# Stockfish gerektirmeyen sahte UCI engine: her zaman e2e4 oynar.
+# crash dosyası varsa onu silip ilk "go" komutunda çöker.
+FAKE_ENGINE = '''
+import os, sys
+crash_file = sys.argv[1]
+for line in sys.stdin:
+    command = line.split()
+    if not command:
+        continue
+    if command[0] == "uci":
+        print("id name FakeFish")
+        print("option name Threads type spin default 1 min 1 max 64")
+        print("option name Hash type spin default 16 min 1 max 1024")
+        print("option name Skill Level type spin default 20 min 0 max 20")
+        print("uciok")
+    elif command[0] == "isready":
+        print("readyok")
+    elif command[0] == "setoption":
+        with open(crash_file + ".options", "a") as f:
+            f.write(line)
+    elif command[0] == "go":
+        with open(crash_file + ".go", "a") as f:
+            f.write(line)
+        if os.path.exists(crash_file):
+            os.remove(crash_file)
+            sys.exit(1)
+        depth = int(command[command.index("depth") + 1]) if "depth" in command else 1
+        for d in range(1, depth + 1):
+            print(f"info depth {d} score cp 30 pv e2e4")
+        print("bestmove e2e4")
+    elif command[0] == "quit":
+        break
+    sys.stdout.flush()
+'''
+
+# Pozisyonu takip eden sahte UCI engine: önce PREFERRED listesindeki, sonra
+# alfabetik sıradaki yasal hamleleri MultiPV satırları olarak verir.
+# İkinci argüman verilirse arama o derinlikte kesilir.
+ANALYSIS_ENGINE = '''
+import sys
+import chess
+crash_file = sys.argv[1]
+max_depth = int(sys.argv[2]) if len(sys.argv) > 2 else None
+PREFERRED = ["g1f3", "b1c3", "g8f6", "b8c6"]
+board = chess.Board()
+multipv = 1
+for line in sys.stdin:
+    command = line.split()
+    if not command:
+        continue
+    if command[0] == "uci":
+        print("id name FakeFish Analysis")
+        print("option name MultiPV type spin default 1 min 1 max 500")
+        print("uciok")
+    elif command[0] == "isready":
+        print("readyok")
+    elif command[0] == "setoption" and command[2] == "MultiPV":
+        multipv = int(command[4])
+    elif command[0] == "position":
+        if command[1] == "startpos":
+            board, rest = chess.Board(), command[2:]
+        else:
+            board, rest = chess.Board(" ".join(command[2:8])), command[8:]
+        for move in rest[1:]:
+            board.push_uci(move)
+    elif command[0] == "go":
+        with open(crash_file + ".go", "a") as f:
+            f.write(board.fen() + "\\n")
+        depth = int(command[command.index("depth") + 1]) if "depth" in command else 1
+        depth = min(depth, max_depth or depth)
+        legal = sorted(move.uci() for move in board.legal_moves)
+        moves = [move for move in PREFERRED if move in legal]
+        moves += [move for move in legal if move not in PREFERRED]
+        for i, move in enumerate(moves[:multipv], 1):
+            print(f"info depth {depth} multipv {i} score cp {40 - 10 * i} pv {move}")
+        print(f"bestmove {moves[0]}")
+    elif command[0] == "quit":
+        break
+    sys.stdout.flush()
+'''
+
+def fake_engine(directory, source=FAKE_ENGINE):
+    """Sahte engine betiğini yaz, komutunu ve çökme dosyasını döndür"""
+    script = os.path.join(directory, "fake_engine.py")
+    with open(script, "w") as f:
+        f.write(source)
+    crash_file = os.path.join(directory, "crash")
+    return [sys.executable, script, crash_file], crash_file
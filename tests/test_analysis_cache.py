@@ -0,0 +1,73 @@
+# tests/test_analysis_cache.py
+
+import sys
+import os
+import tempfile
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+from src.analysis_cache import AnalysisCache
+
+SAMPLE_ANALYSIS = {
+    "best_move": "e2e4",
+    "evaluation": 0.3,
+    "depth": 15,
+    "principal_variation": ["e2e4", "e7e5"],
+    "alternative_moves": []
+}
+
+def test_depth_and_transpositions():
+    """Daha derin analiz tekrar kullanılmalı, transpozisyonlar eşleşmeli"""
+    print("\n=== Analysis Cache Depth Test ===")
+    cache = AnalysisCache()
+    board = chess.Board()
+    cache.put(board, 15, 3, SAMPLE_ANALYSIS)
+
+    assert cache.get(board, 12, 3) == SAMPLE_ANALYSIS
+    assert cache.get(board, 18, 3) is None
+    assert cache.get(board, 15, 1) is None
+
+    # Aynı pozisyon, farklı hamle sayaçları
+    transposed = chess.Board(board.fen().replace(" 0 1", " 4 9"))
+    assert cache.get(transposed, 15, 3) == SAMPLE_ANALYSIS
+
+    stats = cache.get_stats()
+    print(stats)
+    assert stats['hits'] == 2 and stats['misses'] == 2
+
+def test_lru_eviction_and_persistence():
+    """Boyut sınırı ve diske kaydetme"""
+    print("\n=== Analysis Cache LRU Test ===")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "analysis_cache.json")
+        cache = AnalysisCache(path, max_entries=2)
+
+        board = chess.Board()
+        positions = []
+        for move in ["e2e4", "e7e5", "g1f3"]:
+            positions.append(board.copy())
+            board.push_uci(move)
+
+        cache.put(positions[0], 10, 3, SAMPLE_ANALYSIS)
+        cache.put(positions[1], 10, 3, SAMPLE_ANALYSIS)
+        cache.get(positions[0], 10, 3)  # positions[0] en son kullanılan olur
+        cache.put(positions[2], 10, 3, SAMPLE_ANALYSIS)
+
+        assert cache.get_stats()['evictions'] == 1
+        assert cache.get(positions[1], 10, 3) is None
+
+        cache.save()
+        reloaded = AnalysisCache(path, max_entries=2)
+        assert len(reloaded) == 2
+        assert reloaded.get(positions[0], 10, 3) == SAMPLE_ANALYSIS
+        assert reloaded.get(positions[2], 10, 3) == SAMPLE_ANALYSIS
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_depth_and_transpositions()
+    test_lru_eviction_and_persistence()
+
+if __name__ == "__main__":
+    main()
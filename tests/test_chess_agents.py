@@ -0,0 +1,85 @@
+# tests/test_chess_agents.py
+
+import sys
+import os
+import tempfile
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+from src.chess_agents import StudentAgent, TeacherAgent
+from src.engine_pool import EnginePool
+from src.pattern_memory import pattern_key
+from fake_engines import fake_engine
+
+def test_teach_batch():
+    """Aynı pozisyonlar bir kez analiz edilip tüm öğrencilere öğretilmeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, crash_file = fake_engine(directory)
+        after_knights = chess.Board()
+        for move in ("g1f3", "g8f6"):
+            after_knights.push_uci(move)
+        back_home = after_knights.copy()
+        for move in ("f3g1", "f6g8"):
+            back_home.push_uci(move)
+        # back_home başlangıç pozisyonunun transpozisyonu
+        positions = [chess.STARTING_FEN, after_knights.fen(), back_home.fen()]
+
+        with EnginePool(command, size=2) as pool:
+            teacher = TeacherAgent("Batch Teacher", pool)
+            students = [StudentAgent("Student A", store_fen_keys=True), StudentAgent("Student B", store_fen_keys=True)]
+            taught = teacher.teach_batch(students, positions)
+
+        with open(crash_file + ".go") as f:
+            analyses = len(f.readlines())
+        print(f"Analiz sayısı: {analyses}, öğretilen: {taught}")
+        assert analyses == 2
+        assert list(taught.values()) == ["e2e4"] * 3
+        for student in students:
+            assert student.get_move_from_memory(back_home.fen()) == "e2e4"
+            assert student.position_evaluations[after_knights.fen()] == 0.3
+            assert student.learned_moves == 2
+        assert teacher.get_teaching_stats()['students_taught'] == 2
+        assert teacher.get_teaching_stats()['total_lessons'] == 4
+
+        # Tek pozisyonluk öğretim de aynı yoldan geçmeli
+        student = StudentAgent("Student C")
+        with EnginePool(command) as pool:
+            assert TeacherAgent("Single Teacher", pool).teach(student, after_knights.fen()) == "e2e4"
+        assert student.get_move_from_memory(after_knights.fen()) == "e2e4"
+
+def test_single_learns_are_buffered():
+    """Tek dersler indeksleri yeniden sıralamadan öğrenilmeli"""
+    student = StudentAgent("Buffered Student")
+    index_keys = student.position_index.keys
+    pattern_keys = student.pattern_memory.keys
+    after_e4 = chess.Board()
+    after_e4.push_uci("e2e4")
+    student.learn(chess.STARTING_FEN, "d2d4", 0.2)
+    student.learn(chess.STARTING_FEN, "e2e4", 0.4)
+    student.learn(after_e4.fen(), "e7e5", 0.1)
+
+    assert student.position_index.keys is index_keys
+    assert student.pattern_memory.keys is pattern_keys
+    assert student.get_move_from_memory(chess.STARTING_FEN) == "e2e4"
+    assert student.get_moves([after_e4.fen()]) == ["e7e5"]
+    assert len(student.position_index) == 2 and len(student.pattern_memory) == 2
+    assert student.pattern_memory.count(pattern_key(chess.Board())) == 2
+    assert abs(student.pattern_memory.mean_evaluation(pattern_key(chess.Board())) - 0.3) < 1e-9
+
+    # Büyük bir toplu öğrenme bekleyenleri de dizilere katmalı
+    student.position_index.merge_threshold = student.pattern_memory.merge_threshold = 2
+    student.learn_batch([chess.STARTING_FEN, after_e4.fen()], ["e2e4", "e7e5"], [0.3, 0.1], verbose=False)
+    print(f"Birleştirilmiş indeks: {len(student.position_index.keys)} pozisyon")
+    assert len(student.position_index.keys) == 2 and not student.position_index._pending
+    assert student.pattern_memory.count(pattern_key(chess.Board())) == 3
+    assert student.get_move_from_memory(chess.STARTING_FEN) == "e2e4"
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_teach_batch()
+    test_single_learns_are_buffered()
+
+if __name__ == "__main__":
+    main()
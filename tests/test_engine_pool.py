@@ -0,0 +1,107 @@
+# tests/test_engine_pool.py
+
+import sys
+import os
+import subprocess
+import tempfile
+import threading
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+import chess.engine
+from src.chess_agents import TeacherAgent
+from src.chess_env import ChessEnvironment
+from src.engine_pool import EnginePool, get_pool, release_pool
+from fake_engines import fake_engine
+
+def test_lease_and_reuse():
+    """Engine'ler tekrar kullanılmalı, havuz boyutu aşılmamalı"""
+    print("\n=== Engine Pool Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        command, _ = fake_engine(directory)
+        with EnginePool(command, size=2, options={"Threads": 2, "Skill Level": 5, "Unknown": 1}) as pool:
+            board = chess.Board()
+            for _ in range(5):
+                assert pool.play(board, chess.engine.Limit(depth=1)).move == chess.Move.from_uci("e2e4")
+            assert pool.get_stats()['started'] == 1
+
+            # Aynı anda en fazla iki engine başlatılmalı
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(pool.analyse(board, chess.engine.Limit(depth=1))))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            stats = pool.get_stats()
+            print(f"Havuz istatistikleri: {stats}")
+            assert len(results) == 8
+            assert stats['started'] <= 2 and stats['leased'] == 0
+
+            engines = [pool.lease(), pool.lease(timeout=0.1)]
+            try:
+                pool.lease(timeout=0.1)
+                assert False, "Havuz boyutu aşıldı"
+            except TimeoutError:
+                pass
+            for engine in engines:
+                pool.release(engine)
+
+        with open(command[2] + ".options") as f:
+            options = f.read()
+        assert "name Threads value 2" in options and "name Skill Level value 5" in options
+        assert "Unknown" not in options
+
+def test_restart_after_crash():
+    """Çöken engine yeniden başlatılıp hamle tekrar denenmeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, crash_file = fake_engine(directory)
+        with EnginePool(command) as pool:
+            pool.start()
+            open(crash_file, "w").close()
+            teacher = TeacherAgent("Pool Teacher", pool)
+            assert teacher.calculate_best_move(chess.STARTING_FEN) == "e2e4"
+            stats = pool.get_stats()
+            print(f"Yeniden başlatma sonrası: {stats}")
+            assert stats['restarts'] == 1 and stats['started'] == 2
+
+def test_shared_pool_release():
+    """Ortak havuz son kullanıcı kapanınca kapanmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, _ = fake_engine(directory)
+        with ChessEnvironment(command) as first:
+            with ChessEnvironment(command) as second:
+                assert second.pool is first.pool
+                assert second.get_best_move(0.01) == "e2e4"
+            assert not first.pool._closed
+            assert first.get_best_move(0.01) == "e2e4"
+        assert first.pool._closed
+        pool = get_pool(command)
+        assert pool is not first.pool
+        release_pool(pool)
+
+def test_exit_without_close():
+    """close() çağrılmasa da süreç engine'ler açıkken takılmadan çıkmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, _ = fake_engine(directory)
+        script = (
+            f"import sys; sys.path.append({parent_dir!r})\n"
+            "from src.chess_env import ChessEnvironment\n"
+            f"print(ChessEnvironment({command!r}).get_best_move(0.01))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30)
+        assert result.returncode == 0 and "e2e4" in result.stdout
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_lease_and_reuse()
+    test_restart_after_crash()
+    test_shared_pool_release()
+    test_exit_without_close()
+
+if __name__ == "__main__":
+    main()
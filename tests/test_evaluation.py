@@ -0,0 +1,91 @@
+# tests/test_evaluation.py
+
+import sys
+import os
+import random
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+from src.evaluation import BitboardEvaluator
+
+# Rok, geçerken alma, terfi ve alma içeren hamle dizileri
+SEQUENCES = [
+    # İki taraf da kısa rok
+    (chess.STARTING_FEN, ["e2e4", "e7e5", "g1f3", "g8f6", "f1c4", "f8c5", "e1g1", "e8g8"]),
+    # İki taraf da uzun rok
+    (chess.STARTING_FEN, ["d2d4", "d7d5", "b1c3", "b8c6", "c1f4", "c8f5", "d1d2", "d8d7", "e1c1", "e8c8"]),
+    # Beyaz ve siyah geçerken alma
+    (chess.STARTING_FEN, ["e2e4", "a7a6", "e4e5", "d7d5", "e5d6", "h7h5", "a2a3", "h5h4", "g2g4", "h4g3"]),
+    # Alarak vezir terfisi ve at terfisi
+    ("rn5k/1P6/8/8/8/8/6p1/4K2R w - - 0 1", ["b7a8q", "g2h1n", "a8a7", "h8g8"]),
+    # Siyah alarak terfi, beyaz kale terfisi
+    ("r3k3/1P6/8/8/8/8/1p6/RN5K b - - 0 1", ["b2a1q", "b7a8r", "e8d7", "a8a1"]),
+]
+
+def _check(evaluator, board):
+    """Artımlı skor tam hesaplamayla aynı olmalı"""
+    assert evaluator.score == evaluator.white_score(board), board.fen()
+
+def test_incremental_matches_full():
+    """push/pop sonrası artımlı skor white_score ile aynı kalmalı"""
+    print("\n=== Bitboard Evaluator Test ===")
+    evaluator = BitboardEvaluator()
+    for fen, moves in SEQUENCES:
+        board = chess.Board(fen)
+        evaluator.reset(board)
+        for uci in moves:
+            move = chess.Move.from_uci(uci)
+            assert move in board.legal_moves, (fen, uci)
+            evaluator.push(board, move)
+            _check(evaluator, board)
+        while board.move_stack:
+            evaluator.pop(board)
+            _check(evaluator, board)
+        assert board.fen() == fen
+
+def test_random_games():
+    """Rastgele oyunlarda her hamleden sonra skor doğru kalmalı"""
+    random.seed(12)
+    evaluator = BitboardEvaluator()
+    moves = 0
+    for _ in range(30):
+        board = chess.Board()
+        evaluator.reset(board)
+        while not board.is_game_over() and board.ply() < 150:
+            evaluator.push(board, random.choice(list(board.legal_moves)))
+            _check(evaluator, board)
+            moves += 1
+        while board.move_stack:
+            evaluator.pop(board)
+            _check(evaluator, board)
+    print(f"{moves} hamle kontrol edildi")
+
+def test_side_to_move_sign():
+    """evaluate ve current sırası gelen tarafın bakış açısından olmalı"""
+    evaluator = BitboardEvaluator()
+    board = chess.Board()
+    assert evaluator.white_score(board) == 0
+
+    # Siyah vezirsiz: beyaz önde
+    white_ahead = chess.Board("rnb1kbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+    score = evaluator.white_score(white_ahead)
+    assert score > 0
+    assert evaluator.evaluate(white_ahead) == score
+    black_to_move = chess.Board(white_ahead.fen().replace(" w ", " b "))
+    assert evaluator.evaluate(black_to_move) == -score
+
+    evaluator.reset(white_ahead)
+    assert evaluator.current(white_ahead) == score
+    evaluator.push(white_ahead, chess.Move.from_uci("e2e4"))
+    assert evaluator.current(white_ahead) == evaluator.evaluate(white_ahead) < 0
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_incremental_matches_full()
+    test_random_games()
+    test_side_to_move_sign()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# tests/test_history.py
+
+import sys
+import os
+import tempfile
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+from src.chess_agents import StudentAgent
+from src.history import HistoryBuffer
+
+def test_ring_buffer_and_spill():
+    """Tampon sınırlı kalmalı, taşan kayıtlar dosyaya yazılmalı"""
+    print("\n=== History Buffer Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        spill_path = os.path.join(directory, "teaching.ndjson")
+        history = HistoryBuffer(maxlen=3, spill_path=spill_path,
+                                distinct_fields=('student',), sum_fields=('positions',))
+        for i in range(10):
+            history.append({'student': f"s{i % 4}", 'positions': i, 'timestamp': 100.0 + i})
+
+        print(f"İstatistikler: {history.get_stats()}")
+        assert len(history) == 3 and history.total == 10
+        assert history[-1]['positions'] == 9 and history.last is history[-1]
+        assert [h['positions'] for h in history] == [7, 8, 9]
+        assert history.distinct_count('student') == 4
+        assert history.sum('positions') == 45
+        assert abs(history.rate() - 10 / 9) < 1e-9
+
+        spilled = list(history.iter_spilled())
+        assert [h['positions'] for h in spilled] == list(range(7))
+        history.close()
+
+def test_agent_histories():
+    """Ajan geçmişleri sınırlı olmalı, istatistikler tüm geçmişi saymalı"""
+    student = StudentAgent("Bounded Student", history_size=2)
+    for i in range(5):
+        student.make_move("", f"e2e{i}")
+    assert list(student.move_history) == ["e2e3", "e2e4"]
+    assert student.get_stats()['total_moves'] == 5
+    student.reset_game()
+    assert not student.move_history
+
+def test_agent_spill_files():
+    """Taşan kayıtlar hemen diske yazılmalı, ajan kapanınca dosyalar kapanmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with StudentAgent("Spilling Student", history_size=2, history_dir=temp_dir) as student:
+            for i in range(5):
+                student.make_move("", f"e2e{i}")
+            spill_path = student.move_history.spill_path
+            with open(spill_path) as f:
+                assert len(f.readlines()) == 3
+        assert all(history._spill_file is None for history in student._histories)
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_ring_buffer_and_spill()
+    test_agent_histories()
+    test_agent_spill_files()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# tests/test_knowledge_store.py
+
+import sys
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+import chess.polyglot
+from src.chess_agents import StudentAgent
+from src.knowledge_store import KnowledgeStore
+from src.memory_format import encode_move
+from src.memory_tokenizer import MemoryTokenizer
+from src.position_index import NO_MOVE
+
+POSITIONS = [
+    ("r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4", "h5f7", 99.0),
+    ("rnbqkbnr/ppp1pppp/8/3p4/2PP4/8/PP2PPPP/RNBQKBNR b KQkq - 0 2", "e7e6", 0.3),
+    ("rnbqkb1r/pppppppp/5n2/8/3P4/8/PPP1PPPP/RNBQKBNR w KQkq - 1 2", "c2c4", 0.2),
+]
+
+def _tokenized_package():
+    """Küçük bir tokenize edilmiş paket oluştur"""
+    memories = {
+        f"pos_{i}": {"position": fen, "best_move": move, "evaluation": evaluation, "depth": 10}
+        for i, (fen, move, evaluation) in enumerate(POSITIONS)
+    }
+    return MemoryTokenizer().tokenize_stockfish_memory({"metadata": {}, "memories": memories})
+
+def _worker_moves(name):
+    """Başka bir süreçte depoya bağlanıp hamleleri sor"""
+    student = StudentAgent("Worker Student")
+    assert student.attach_knowledge(name)
+    moves = student.get_moves([fen for fen, _, _ in POSITIONS])
+    student.knowledge.close()
+    return moves
+
+def test_shared_memory_store():
+    """Paylaşılan bellek deposu diğer süreçlerden okunabilmeli"""
+    print("\n=== Shared Knowledge Store Test ===")
+    store = KnowledgeStore.from_tokenized_package(_tokenized_package())
+    try:
+        print(f"Depo: {store.name}, {len(store)} pozisyon, {store.nbytes} byte")
+        assert len(store) == 3
+        move, evaluation, confidence = store.get(chess.polyglot.zobrist_hash(chess.Board(POSITIONS[1][0])))
+        assert move == "e7e6" and abs(evaluation - 0.3) < 1e-4 and confidence > 30
+
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            moves = pool.submit(_worker_moves, store.name).result()
+        assert moves == [move for _, move, _ in POSITIONS]
+    finally:
+        store.unlink()
+
+def test_independent_attachers():
+    """Bağımsız süreçler bağlanıp çıktıktan sonra blok silinmemeli"""
+    store = KnowledgeStore.from_tokenized_package(_tokenized_package())
+    key = chess.polyglot.zobrist_hash(chess.Board(POSITIONS[1][0]))
+    script = (
+        f"import sys; sys.path.append({parent_dir!r})\n"
+        "from src.knowledge_store import KnowledgeStore\n"
+        f"store = KnowledgeStore.attach({store.name!r})\n"
+        f"print(store.get_move({key}))\n"
+        "store.close()\n"
+    )
+    try:
+        for _ in range(2):
+            result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+            assert result.returncode == 0 and result.stdout.strip() == "e7e6", result.stderr
+            assert "leaked" not in result.stderr
+        attached = KnowledgeStore.attach(store.name)
+        assert attached.get_move(key) == "e7e6"
+        attached.close()
+        assert store.get_move(key) == "e7e6"
+    finally:
+        store.unlink()
+
+def test_file_store():
+    """Dosya deposu mmap ile açılmalı ve arama katmanı olmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        columns = KnowledgeStore.columns_from_tokenized_package(_tokenized_package())
+        filename = KnowledgeStore.save(os.path.join(temp_dir, "shared"), *columns)
+
+        student = StudentAgent("File Student")
+        assert student.attach_knowledge(filename)
+        assert student._get_memory_move(POSITIONS[2][0]) == "c2c4"
+        assert student.get_learning_stats()['shared_positions'] == 3
+        student.knowledge.close()
+
+def test_no_move_is_a_miss():
+    """NO_MOVE satırları tekli ve toplu aramada aynı şekilde ıska sayılmalı"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = KnowledgeStore.save(os.path.join(temp_dir, "no_move"), [1, 2], [NO_MOVE, encode_move("e2e4")], [0.0, 0.5])
+        store = KnowledgeStore.open(filename)
+        assert store.get_many([1, 2, 3]) == [None, "e2e4", None]
+        assert store.get_move(1) is None and store.get(1) is None and 1 not in store
+        assert store.get_move(2) == "e2e4" and store.get(2)[0] == "e2e4" and 2 in store
+        store.close()
+
+def test_bulk_learning():
+    """Toplu öğrenme her pozisyonun hamlesini hatırlamalı"""
+    print("\n=== Bulk Learning Test ===")
+    package = _tokenized_package()
+    student = StudentAgent("Bulk Student", store_fen_keys=True)
+    student.learn_from_tokenized_memory(package)
+    assert student.learned_moves == 3
+    assert student.learning_history[-1]['positions_per_second'] > 0
+
+    for fen, move, _ in POSITIONS:
+        assert student.get_move_from_memory(fen) == move
+    assert abs(student.position_evaluations[POSITIONS[1][0]] - 0.3) < 1e-9
+    # Öğrenilen desenler FEN ile sorgulandığında bulunmalı
+    assert len(student.pattern_memory) == 3
+    assert student._get_pattern_confidence(POSITIONS[2][0]) > 0
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = MemoryTokenizer().save_tokenized_package_binary(package, os.path.join(temp_dir, "bulk"))
+        with MemoryTokenizer().load_tokenized_package_binary(filename) as binary_package:
+            binary_student = StudentAgent("Binary Student")
+            binary_student.learn_from_binary_package(binary_package)
+        for fen, move, _ in POSITIONS:
+            assert binary_student.get_move_from_memory(fen) == move
+        # FEN anahtarlı sözlükler varsayılan olarak tutulmamalı
+        assert not binary_student.position_memory and not binary_student.position_evaluations
+        assert not binary_student.confidence_scores
+        assert binary_student.get_learning_stats()['positions_with_confidence'] == 3
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_shared_memory_store()
+    test_independent_attachers()
+    test_file_store()
+    test_no_move_is_a_miss()
+    test_bulk_learning()
+
+if __name__ == "__main__":
+    main()
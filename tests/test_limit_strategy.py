@@ -0,0 +1,73 @@
+# tests/test_limit_strategy.py
+
+import sys
+import os
+import tempfile
+import threading
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+from src.chess_agents import StudentAgent, TeacherAgent
+from src.engine_pool import EnginePool
+from src.limit_strategy import AdaptiveLimit, FixedLimit
+from src.opening_book import OpeningBook
+from fake_engines import fake_engine
+
+def test_adaptive_limit():
+    """Tek hamle ve kitap pozisyonları aramasız, kararlı PV erken durmalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, crash_file = fake_engine(directory)
+        book = OpeningBook()
+        book.add_line("King's Pawn", ["e2e4"])
+        strategy = AdaptiveLimit(min_depth=8, stable_depths=4, session_budget=10.0, books=[book])
+
+        single_reply = chess.Board("k7/8/8/8/8/8/1R6/1R5K b - - 0 1")
+        after_e5 = chess.Board("rnbqkbnr/pppp1ppp/8/4p3/8/5N2/PPPPPPPP/RNBQKB1R w KQkq - 0 2")
+        with EnginePool(command) as pool:
+            teacher = TeacherAgent("Adaptive Teacher", pool, limit_strategy=strategy)
+            taught = teacher.teach_batch([StudentAgent("Student")],
+                                         [chess.STARTING_FEN, single_reply.fen(), after_e5.fen()])
+
+        with open(crash_file + ".go") as f:
+            searches = f.readlines()
+        stats = teacher.get_teaching_stats()['search_stats']
+        print(f"Arama istatistikleri: {stats}")
+        assert len(searches) == 1
+        assert taught[chess.STARTING_FEN] == "e2e4"
+        assert taught[single_reply.fen()] == "a8a7"
+        assert stats['book'] == 1 and stats['single_reply'] == 1 and stats['stable'] == 1
+
+        # Kararlı arama min_depth derinliğinde durmalı
+        with EnginePool(command) as pool:
+            result = pool.run(lambda engine: AdaptiveLimit(min_depth=8).search(engine, after_e5))
+        assert result.reason == "stable" and result.depth == 8 and result.evaluation == 0.3
+
+def test_fixed_limit_threads():
+    """Paralel aramalar FixedLimit istatistiklerinde kaybolmamalı"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, _ = fake_engine(directory)
+        strategy = FixedLimit(depth=1)
+        board = chess.Board()
+        with EnginePool(command, size=4) as pool:
+            def search():
+                for _ in range(25):
+                    assert pool.run(lambda engine: strategy.search(engine, board)).move == "e2e4"
+            threads = [threading.Thread(target=search) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    stats = strategy.get_stats()
+    print(f"FixedLimit istatistikleri: {stats}")
+    assert stats['positions'] == 200 and stats['seconds'] > 0
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_adaptive_limit()
+    test_fixed_limit_threads()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,149 @@
 # tests/test_memory_extraction.py
 
+import sys
+import os
+import asyncio
+import tempfile
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+import chess.polyglot
+from src.analysis_cache import AnalysisCache
+from src.engine_pool import EnginePool
+from src.memory_extractor import AsyncStockfishMemoryExtractor, StockfishMemoryExtractor
+from src.memory_stream import MemoryStreamWriter, iter_memory_stream
+from fake_engines import ANALYSIS_ENGINE, fake_engine
+
+def _memories(package):
+    """Zaman damgası olmadan karşılaştırılabilir hafızalar"""
+    return {
+        key: {name: value for name, value in memory.to_dict().items() if name != "timestamp"}
+        for key, memory in package["memories"].items()
+    }
+
+def test_parallel_matches_serial():
+    """İşçili çıkarım seri çıkarımla aynı anahtar ve hafızaları üretmeli"""
+    print("\n=== Parallel Extraction Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        command, _ = fake_engine(directory, ANALYSIS_ENGINE)
+        with EnginePool(command) as pool:
+            extractor = StockfishMemoryExtractor(pool=pool)
+            serial = extractor.create_memory_package(num_games=4, positions_per_game=5, depth=2)
+            parallel = extractor.create_memory_package(num_games=4, positions_per_game=5, depth=2, workers=3)
+            stats = extractor.get_engine_stats()
+
+    print(f"Engine istatistikleri: {stats}")
+    assert list(parallel["memories"]) == list(serial["memories"])
+    assert len(serial["memories"]) == 20
+    assert _memories(parallel) == _memories(serial)
+    assert parallel["metadata"]["workers"] == 3 and stats['size'] == 3
+    assert sum(worker["positions"] for worker in parallel["metadata"]["worker_stats"]) == 20
+
+def test_async_matches_sync():
+    """Asyncio çıkarıcısı senkron çıkarıcıyla aynı hafızaları üretmeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, _ = fake_engine(directory, ANALYSIS_ENGINE)
+        with EnginePool(command) as pool:
+            sync_package = StockfishMemoryExtractor(pool=pool).create_memory_package(
+                num_games=3, positions_per_game=4, depth=2)
+
+        streamed = []
+        async def extract():
+            async with AsyncStockfishMemoryExtractor(command, engines=2) as extractor:
+                return await extractor.create_memory_package(
+                    num_games=3, positions_per_game=4, depth=2,
+                    on_memory=lambda key, memory: streamed.append(key))
+        async_package = asyncio.run(extract())
+
+    print(f"Async hafızalar: {len(async_package['memories'])}")
+    assert list(async_package["memories"]) == list(sync_package["memories"])
+    assert _memories(async_package) == _memories(sync_package)
+    assert sorted(streamed) == sorted(sync_package["memories"])
+    assert async_package["metadata"]["workers"] == 2
+
+def test_frontier_dedupes_transpositions():
+    """Sınır modunda transpozisyonlar bir kez analiz edilmeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, crash_file = fake_engine(directory, ANALYSIS_ENGINE)
+        with EnginePool(command) as pool:
+            extractor = StockfishMemoryExtractor(pool=pool)
+            extractor.multipv = 2
+            package = extractor.create_frontier_package(max_nodes=100, depth=1, max_ply=4)
+        with open(crash_file + ".go") as f:
+            analysed = f.read().splitlines()
+
+    positions = [memory.position for memory in package["memories"].values()]
+    keys = {chess.polyglot.zobrist_hash(chess.Board(position)) for position in positions}
+    print(f"Sınır düğümleri: {len(positions)}, analiz: {len(analysed)}")
+    assert len(keys) == len(positions) == len(analysed)
+    # Dallanma 2 iken tekrarsız ağaç 1 + 2 + 4 + 8 + 16 düğüm olurdu
+    assert len(positions) < 31
+
+    # 1.Nf3 Nf6 2.Nc3 Nc6 ile 1.Nc3 Nc6 2.Nf3 Nf6 aynı pozisyon
+    board = chess.Board()
+    for move in ("g1f3", "g8f6", "b1c3", "b8c6"):
+        board.push_uci(move)
+    assert positions.count(board.fen()) == 1
+    assert package["metadata"]["mode"] == "frontier"
+
+def test_resume_after_torn_line():
+    """Yarım kalan son satırdan sonra tekrarsız devam edilmeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, crash_file = fake_engine(directory, ANALYSIS_ENGINE)
+        stream = os.path.join(directory, "memories.ndjson")
+        with EnginePool(command) as pool:
+            extractor = StockfishMemoryExtractor(pool=pool)
+            complete = extractor.create_memory_package(num_games=2, positions_per_game=4, depth=2)
+
+            extractor.create_memory_package(num_games=2, positions_per_game=4, depth=2, stream_to=stream)
+            # Kesintiyi taklit et: son iki kayıt kayıp, üçüncüsü yarım yazılmış
+            with open(stream) as f:
+                lines = f.readlines()
+            with open(stream, "w") as f:
+                f.writelines(lines[:-3])
+                f.write(lines[-3][:len(lines[-3]) // 2])
+            os.remove(crash_file + ".go")
+
+            resumed = extractor.create_memory_package(num_games=2, positions_per_game=4, depth=2, stream_to=stream)
+        with open(crash_file + ".go") as f:
+            analysed = f.read().splitlines()
+        streamed = {"memories": dict(iter_memory_stream(stream))}
+        keys = [key for key, _ in iter_memory_stream(stream)]
+
+        # Yarım satır dosyanın tamamı okunmadan, sondan geriye taranarak atılmalı
+        with open(stream) as f:
+            before = f.read()
+        writer = MemoryStreamWriter(stream)
+        with open(stream, "a") as f:
+            f.write('{"key": "game_9", "memory": {"position": "8/8')
+        writer._drop_partial_line(block_size=8)
+        writer.close()
+        with open(stream) as f:
+            assert f.read() == before
+
+    print(f"Devam sonrası kayıtlar: {keys}")
+    assert keys == list(complete["memories"])
+    assert _memories(streamed) == _memories(complete)
+    assert len(analysed) == 3
+    assert resumed["metadata"]["total_positions"] == 8
+
+def test_cache_uses_reached_depth():
+    """Önbellek, istenen değil ulaşılan derinliği kaydetmeli"""
+    with tempfile.TemporaryDirectory() as directory:
+        command, _ = fake_engine(directory, ANALYSIS_ENGINE)
+        cache = AnalysisCache()
+        with EnginePool(command + ["3"]) as pool:
+            extractor = StockfishMemoryExtractor(pool=pool, cache=cache)
+            memory = extractor.extract_position_knowledge(chess.STARTING_FEN, depth=10)
+
+    assert memory.depth == 3
+    board = chess.Board()
+    # Derinlik 10 isteği sığ sonuçla karşılanmamalı
+    assert cache.get(board, 10, extractor.multipv) is None
+    assert cache.get(board, 3, extractor.multipv)["best_move"] == memory.best_move
+
 def test_memory_extraction():
     print("Stockfish hafızası çekiliyor...")
     
@@ -23,5 +167,14 @@ def test_memory_extraction():
     print(f"Hamle: {memory_data[sample_position]['move']}")
     print(f"Güven: {memory_data[sample_position]['confidence']:.2f}")
 
+def main():
+    """Tüm testleri çalıştır"""
+    test_parallel_matches_serial()
+    test_async_matches_sync()
+    test_frontier_dedupes_transpositions()
+    test_resume_after_torn_line()
+    test_cache_uses_reached_depth()
+    test_memory_extraction()
+
 if __name__ == "__main__":
-    test_memory_extraction()
\ No newline at end of file
+    main()
@@ -0,0 +1,83 @@
+# tests/test_memory_format.py
+
+import sys
+import os
+import tempfile
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import numpy as np
+from src.memory_format import write_memory_package, read_memory_package, encode_move, decode_move
+from src.memory_tokenizer import MemoryTokenizer
+
+TEST_PACKAGE = {
+    "metadata": {"source": "Test", "engine_depth": 12},
+    "memories": {
+        "game_0_pos_0": {
+            "position": "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+            "best_move": "e2e4",
+            "evaluation": 0.3,
+            "depth": 12,
+            "principal_variation": ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5"],
+            "alternative_moves": [{"move": "d2d4", "evaluation": 0.25}],
+            "timestamp": 1700000000.5
+        },
+        "game_0_pos_1": {
+            "position": "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",
+            "best_move": "e5f6",
+            "evaluation": -1.37,
+            "depth": 10,
+            "principal_variation": ["e5f6"],
+            "alternative_moves": [],
+            "timestamp": 1700000001.0
+        },
+        "game_1_pos_0": {
+            "position": "8/P6k/8/8/8/8/8/K7 w - - 4 60",
+            "best_move": "a7a8q",
+            "evaluation": 10000,
+            "depth": 20,
+            "principal_variation": ["a7a8q"],
+            "alternative_moves": [
+                {"move": "a7a8r", "evaluation": 10000},
+                {"move": "a1b2", "evaluation": -10000}
+            ],
+            "timestamp": 1700000002.0
+        }
+    }
+}
+
+def test_move_encoding():
+    """Hamle kodlaması terfi bilgisini korumalı"""
+    for move in ["e2e4", "a7a8q", "h2h1n", "e1g1"]:
+        assert decode_move(encode_move(move)) == move
+
+def test_binary_round_trip():
+    """İkili paket sözlük formatına birebir dönmeli"""
+    print("\n=== Binary Package Round Trip Test ===")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = write_memory_package(TEST_PACKAGE, os.path.join(temp_dir, "test"))
+        with read_memory_package(filename) as package:
+            assert len(package) == 3
+            assert package.bitboards.dtype == np.dtype('<u8')
+            assert not package.bitboards.flags['OWNDATA']  # mmap görünümü
+            assert package.to_dict() == TEST_PACKAGE
+            print(f"Binary size: {os.path.getsize(filename)} bytes")
+
+def test_tokenized_round_trip():
+    """Token paketleri de ikili formattan aynı şekilde üretilmeli"""
+    tokenizer = MemoryTokenizer()
+    tokenized = tokenizer.tokenize_stockfish_memory(TEST_PACKAGE)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = write_memory_package(TEST_PACKAGE, os.path.join(temp_dir, "test"))
+        with tokenizer.load_tokenized_package_binary(filename) as package:
+            assert tokenizer.tokenize_binary_package(package) == tokenized
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_move_encoding()
+    test_binary_round_trip()
+    test_tokenized_round_trip()
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,13 @@
 
 import sys
 import os
+import random
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
+import chess
+import numpy as np
 from src.memory_tokenizer import MemoryTokenizer
 from src.chess_env import ChessEnvironment
 from demo.demo_data import CHESS_OPENINGS
@@ -120,6 +123,91 @@ def test_memory_efficiency():
     print(f"Tokenized size: {tokenized_size:,} bytes")
     print(f"Compression ratio: {tokenized_size/original_size:.2%}")
 
+def _legacy_position_tokens(fen):
+    """Toplu tokenization öncesi pozisyon başına kodlama (referans)"""
+    board = chess.Board(fen)
+    tokens = []
+    for piece_type in chess.PIECE_TYPES:
+        for color in [chess.WHITE, chess.BLACK]:
+            mask = board.pieces_mask(piece_type, color)
+            for i in range(64):
+                tokens.append(float((mask >> i) & 1))
+    tokens.extend([
+        float(board.turn),
+        float(board.has_kingside_castling_rights(chess.WHITE)),
+        float(board.has_queenside_castling_rights(chess.WHITE)),
+        float(board.has_kingside_castling_rights(chess.BLACK)),
+        float(board.has_queenside_castling_rights(chess.BLACK)),
+        float(board.is_check()),
+        float(len(list(board.legal_moves)))
+    ])
+    return tokens
+
+def _legacy_tokenize(tokenizer, memory):
+    """Bir hafızanın pozisyon başına tokenization sonucu"""
+    return {
+        "position_tokens": _legacy_position_tokens(memory["position"]),
+        "evaluation_token": tokenizer._tokenize_evaluation(memory["evaluation"]),
+        "move_tokens": tokenizer._tokenize_move(memory["best_move"]),
+        "pv_tokens": tokenizer._tokenize_principal_variation(memory["principal_variation"]),
+        "alternative_tokens": tokenizer._tokenize_alternatives(memory["alternative_moves"]),
+        "metadata": {
+            "original_position": memory["position"],
+            "depth": memory["depth"],
+            "timestamp": memory["timestamp"]
+        }
+    }
+
+def _random_memories(count, seed=3):
+    """Rastgele oyunlardan, geçerken alma ve terfi içeren hafızalar"""
+    rng = random.Random(seed)
+    special = [
+        # Geçerken alma mümkün: e5xd6
+        ("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq d6 0 3", ["e5d6", "d8d6"]),
+        # Terfiler, biri alarak
+        ("1r5k/P7/8/8/8/8/6p1/K4R2 w - - 0 1", ["a7b8q", "h8g7"]),
+        ("1r5k/P7/8/8/8/8/6p1/K4R2 b - - 0 1", ["g2f1n", "a7b8r"]),
+    ]
+    memories = {}
+    board = chess.Board()
+    while len(memories) < count:
+        if special and len(memories) % 50 == 0:
+            fen, pv = special.pop()
+        else:
+            if board.is_game_over() or board.ply() > 80:
+                board = chess.Board()
+            legal = [move.uci() for move in board.legal_moves]
+            fen, pv = board.fen(), rng.sample(legal, min(3, len(legal)))
+            board.push_uci(pv[0])
+        memories[f"pos_{len(memories)}"] = {
+            "position": fen,
+            "best_move": pv[0],
+            "evaluation": rng.choice([rng.uniform(-12, 12), 10000, -10000, 0.0]),
+            "depth": rng.randint(1, 20),
+            "principal_variation": pv,
+            "alternative_moves": [{"move": move, "evaluation": rng.uniform(-3, 3)} for move in pv[1:]],
+            "timestamp": 1700000000.0 + len(memories)
+        }
+    return memories
+
+def test_batch_matches_per_position():
+    """Toplu ve paralel tokenization pozisyon başına sonuçla aynı olmalı"""
+    print("\n=== Batch Tokenization Equivalence Test ===")
+    tokenizer = MemoryTokenizer()
+    package = {"metadata": {"source": "Test"}, "memories": _random_memories(300)}
+    legacy = {key: _legacy_tokenize(tokenizer, memory) for key, memory in package["memories"].items()}
+
+    serial = tokenizer.tokenize_stockfish_memory(package, workers=1)["tokenized_memories"]
+    sharded = tokenizer.tokenize_stockfish_memory(package, workers=3)["tokenized_memories"]
+
+    assert list(serial) == list(sharded) == list(legacy)
+    for key, expected in legacy.items():
+        assert serial[key] == expected, key
+        assert sharded[key] == expected, key
+    assert any(" d6 " in memory["position"] for memory in package["memories"].values())
+    assert any(np.asarray(tokens["move_tokens"])[3] == 1.0 for tokens in legacy.values())
+    print(f"{len(legacy)} pozisyon üç yolda da aynı")
+
 def main():
     """Tüm testleri çalıştır"""
     try:
@@ -127,6 +215,7 @@ def main():
         test_package_tokenization()
         test_detokenization()
         test_memory_efficiency()
+        test_batch_matches_per_position()
         
     except Exception as e:
         print(f"Test error: {e}")
@@ -0,0 +1,173 @@
+# tests/test_opening_book.py
+
+import sys
+import os
+import struct
+import tempfile
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+import chess.polyglot
+from src.chess_agents import StudentAgent
+from src.book_builder import PolyglotBookBuilder
+from src.opening_book import OpeningBook, PolyglotBook
+
+def _polyglot_move(move_uci: str) -> int:
+    """Polyglot hamle kodlaması: to | from << 6 | terfi << 12"""
+    move = chess.Move.from_uci(move_uci)
+    promotion = move.promotion - 1 if move.promotion else 0
+    return move.to_square | (move.from_square << 6) | (promotion << 12)
+
+def _write_book(path, entries):
+    """Sıralı, geçerli bir Polyglot kitabı yaz"""
+    rows = []
+    for fen, move_uci, weight in entries:
+        key = chess.polyglot.zobrist_hash(chess.Board(fen))
+        rows.append((key, _polyglot_move(move_uci), weight))
+    with open(path, 'wb') as f:
+        for key, move, weight in sorted(rows):
+            f.write(struct.pack('>QHHI', key, move, weight, 0))
+
+def test_compiled_opening_book():
+    """Açılış kitabı her hamlede ve transpozisyonda çalışmalı"""
+    print("\n=== Compiled Opening Book Test ===")
+    student = StudentAgent("Book Student")
+    board = chess.Board()
+    line = []
+    while True:
+        move = student._get_opening_move(board.fen())
+        if move is None:
+            break
+        line.append(move)
+        board.push_uci(move)
+    print(f"Kitap hattı: {line} ({student.current_opening})")
+    assert line == ["e2e4", "e7e5", "g1f3", "b8c6", "f1b5"]
+
+    book = OpeningBook()
+    book.add_line("Test", ["g1f3", "g8f6", "d2d4"])
+    transposed = chess.Board()
+    for move in ["d2d4", "g8f6", "g1f3"]:
+        transposed.push_uci(move)
+    assert book.best_move(chess.Board(transposed.fen())) is None  # d4 zaten oynandı
+    assert book.best_move(chess.Board()) == ("g1f3", "Test")
+
+def test_book_moves_after_first_ply():
+    """İsimli açılışlar ilk hamleden sonra ve transpozisyonda da bulunmalı"""
+    print("\n=== Opening Book Ply Test ===")
+    student = StudentAgent("Book Student")
+
+    def after(moves):
+        board = chess.Board()
+        for move in moves:
+            board.push_uci(move)
+        return board.fen()
+
+    assert student.get_move(after(["e2e4", "c7c5", "g1f3"])) == "d7d6"
+    assert student.current_opening == "Sicilian Defense"
+    assert student.get_move(after(["e2e4", "e7e6", "d2d4", "d7d5"])) == "e4e5"
+    assert student.current_opening == "French Defense"
+    # Aynı pozisyon farklı hamle sırasıyla ve farklı sayaçlarla
+    transposed = after(["d2d4", "e7e6", "e2e4", "d7d5"])
+    assert student._get_opening_move(transposed) == "e4e5"
+    assert student._get_opening_move(transposed.replace(" 0 3", " 0 30")) == "e4e5"
+
+    # Eklenen ve değiştirilen açılışlar kitaba yansımalı
+    student.add_opening("Queen's Gambit", [("d2d4", "d7d5"), ("c2c4", None)])
+    assert student._get_opening_move(after(["d2d4", "d7d5"])) == "c2c4"
+    assert student.current_opening == "Queen's Gambit"
+    student.load_openings({"English": [("c2c4", "e7e5"), ("b1c3", None)]})
+    assert student._get_opening_move(after(["c2c4", "e7e5"])) == "b1c3"
+    assert student._get_opening_move(after(["d2d4", "d7d5"])) is None
+
+def test_polyglot_book_tier():
+    """Polyglot kitabı ilk arama katmanı olmalı"""
+    print("\n=== Polyglot Book Test ===")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "test.bin")
+        _write_book(path, [
+            (chess.STARTING_FEN, "d2d4", 50),
+            (chess.STARTING_FEN, "c2c4", 20),
+            ("rnbqkbnr/pppppppp/8/8/3P4/8/PPP1PPPP/RNBQKBNR b KQkq - 0 1", "g8f6", 10),
+        ])
+
+        with PolyglotBook(path) as book:
+            assert len(book) == 3
+            assert [c[0] for c in book.candidates(chess.Board())] == ["d2d4", "c2c4"]
+
+        student = StudentAgent("Book Student")
+        assert student.load_opening_book(path)
+        assert student._get_opening_move(chess.STARTING_FEN) == "d2d4"
+        assert student.current_opening == "test.bin"
+        # Kitapta olmayan pozisyonda isimli açılışlara düşülmeli
+        after_e4 = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+        assert student._get_opening_move(after_e4) == "e7e5"
+        student.polyglot_book.close()
+
+def test_book_builder_merges_runs():
+    """Diske taşan parçalar birleştirilip sıralı kitap üretilmeli"""
+    print("\n=== Book Builder Test ===")
+    pgn = (
+        '[Result "1-0"]\n\n1. e4 e5 2. Nf3 Nc6 3. Bb5 (3. Bc4 Bc5) a6 1-0\n\n'
+        '[Result "1/2-1/2"]\n\n1. e4 e5 2. Nf3 Nc6 3. Bc4 Nf6 1/2-1/2\n\n'
+        '[Result "0-1"]\n\n1. d4 d5 2. c4 e6 0-1\n\n'
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pgn_path = os.path.join(temp_dir, "games.pgn")
+        with open(pgn_path, 'w') as f:
+            f.write(pgn * 50)
+
+        book_path = os.path.join(temp_dir, "book.bin")
+        builder = PolyglotBookBuilder(max_ply=5, max_entries=3, temp_dir=temp_dir)
+        entries = builder.build(book_path, [pgn_path])
+        print(f"{builder.games_read} oyundan {entries} kayıt")
+        assert builder.games_read == 150
+        assert not [name for name in os.listdir(temp_dir) if name.endswith('.run')]
+
+        with PolyglotBook(book_path) as book:
+            assert len(book) == entries
+            start = book.candidates(chess.Board())
+            # 1. d4 oyunları kaybedildi, ağırlığı sıfır olduğu için yazılmaz
+            assert [(move, weight) for move, weight, _ in start] == [("e2e4", 150)]
+
+            board = chess.Board()
+            for move in ["e2e4", "e7e5", "g1f3", "b8c6"]:
+                board.push_uci(move)
+            # Yan varyant (3. Bc4 Bc5) kitaba girmemeli; beraberlik 1 puan
+            assert [(move, weight) for move, weight, _ in book.candidates(board)] == [("f1b5", 100), ("f1c4", 50)]
+
+def test_book_builder_skips_bad_games():
+    """Hatalı bir oyun atlanmalı, kitabın geri kalanı yine de üretilmeli"""
+    pgn = (
+        '[Result "1-0"]\n\n1. e4 e5 2. Nf3 1-0\n\n'
+        '[Result "1-0"]\n\n1. e4 Ke7 2. Nf3 1-0\n\n'  # 1... Ke7 yasal değil
+        '[Result "1-0"]\n\n1. d4 d5 1-0\n\n'
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pgn_path = os.path.join(temp_dir, "games.pgn")
+        with open(pgn_path, 'w') as f:
+            f.write(pgn)
+
+        book_path = os.path.join(temp_dir, "book.bin")
+        builder = PolyglotBookBuilder(max_ply=5, max_entries=1, temp_dir=temp_dir)
+        entries = builder.build(book_path, [pgn_path])
+        assert builder.games_read == 2 and builder.games_skipped == 1
+        assert not [name for name in os.listdir(temp_dir) if name.endswith('.run')]
+
+        with PolyglotBook(book_path) as book:
+            assert len(book) == entries
+            # Hatalı oyunun 1. e4 hamlesi de sayılmamalı
+            start = sorted((move, weight) for move, weight, _ in book.candidates(chess.Board()))
+            assert start == [("d2d4", 2), ("e2e4", 2)]
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_compiled_opening_book()
+    test_book_moves_after_first_ply()
+    test_polyglot_book_tier()
+    test_book_builder_merges_runs()
+    test_book_builder_skips_bad_games()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# tests/test_position_index.py
+
+import sys
+import os
+import random
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+import numpy as np
+from src.chess_agents import StudentAgent
+from src.memory_format import BITBOARD_LAYOUT, encode_move
+from src.position_index import ZobristMoveIndex, position_key, zobrist_keys
+
+def _play(moves, fen=chess.STARTING_FEN):
+    """Hamleleri oynanmış tahta"""
+    board = chess.Board(fen)
+    for move in moves:
+        board.push_uci(move)
+    return board
+
+def test_transpositions_and_move_counters():
+    """Transpozisyonlar ve farklı hamle sayaçları aynı hafızayı paylaşmalı"""
+    print("\n=== Zobrist Position Index Test ===")
+    student = StudentAgent("Index Student")
+    board = _play(["g1f3", "g8f6", "b1c3", "b8c6"])
+    student.remember_move(board.fen(), "e2e4")
+
+    transposed = _play(["b1c3", "b8c6", "g1f3", "g8f6"])
+    assert student.get_move_from_memory(transposed.fen()) == "e2e4"
+    other_counters = board.fen().replace(" 4 3", " 0 12")
+    assert other_counters != board.fen()
+    assert student.get_move_from_memory(other_counters) == "e2e4"
+
+    # Sıra, rok hakkı ve alınabilir geçerken alma pozisyonu değiştirir
+    assert student.get_move_from_memory(board.fen().replace(" w ", " b ")) is None
+    assert student.get_move_from_memory(board.fen().replace("KQkq", "Qkq")) is None
+    en_passant = _play(["e2e4", "a7a6", "e4e5", "d7d5"])
+    student.remember_move(en_passant.fen(), "e5d6")
+    assert student.get_move_from_memory(en_passant.fen().replace(" d6 ", " - ")) is None
+    assert student.get_move_from_memory(en_passant.fen()) == "e5d6"
+    print(f"İndeks: {len(student.position_index)} pozisyon, {student.position_index.nbytes} byte")
+
+def test_vectorized_keys_match_position_key():
+    """Toplu Zobrist anahtarları position_key ile aynı olmalı"""
+    random.seed(5)
+    boards = []
+    board = chess.Board()
+    while len(boards) < 500:
+        legal = list(board.legal_moves)
+        if not legal or board.ply() > 60:
+            board = chess.Board()
+            continue
+        board.push(random.choice(legal))
+        boards.append(board.copy(stack=False))
+    boards.append(_play(["e2e4", "a7a6", "e4e5", "d7d5"]))
+
+    bitboards = np.array([[b.pieces_mask(p, c) for p, c in BITBOARD_LAYOUT] for b in boards], dtype=np.uint64)
+    turn = np.array([b.turn for b in boards])
+    castling = np.array([[b.has_kingside_castling_rights(chess.WHITE), b.has_queenside_castling_rights(chess.WHITE),
+                          b.has_kingside_castling_rights(chess.BLACK), b.has_queenside_castling_rights(chess.BLACK)]
+                         for b in boards])
+    ep_squares = np.array([-1 if b.ep_square is None else b.ep_square for b in boards])
+    keys = zobrist_keys(bitboards, turn, castling, ep_squares)
+    assert keys.tolist() == [position_key(b) for b in boards]
+
+def test_index_merges():
+    """Bekleyen ve birleştirilmiş kayıtlarda en yeni hamle kazanmalı"""
+    index = ZobristMoveIndex(merge_threshold=4)
+    index.add(3, "e2e4")
+    index.add_many([1, 2, 3], [encode_move("d2d4")] * 3)
+    assert index.get(3) == "d2d4"
+    index.add_many([5, 2, 6, 7, 8], [encode_move(m) for m in ["c2c4", "g1f3", "b1c3", "a2a3", "h2h3"]])
+    assert not index._pending and len(index) == 7
+    assert index.get_many([1, 2, 3, 4, 8]) == ["d2d4", "g1f3", "d2d4", None, "h2h3"]
+    assert index.nbytes == 7 * 10
+
+def test_batch_get_moves():
+    """Toplu sorgu tekli sorgularla aynı hamleleri vermeli, oyun durumunu değiştirmemeli"""
+    student = StudentAgent("Batch Student")
+    learned = _play(["d2d4", "d7d5", "c2c4", "e7e6"])
+    student.remember_move(learned.fen(), "b1c3")
+    stale = _play(["d2d4", "g8f6"])
+    student.remember_move(stale.fen(), "e2e5")  # yasal değil, aranmalı
+    positions = [
+        chess.STARTING_FEN,                   # kitap
+        learned.fen(),                        # hafıza
+        learned.fen().replace(" 0 3", " 7 20"),  # aynı pozisyon, farklı sayaçlar
+        stale.fen(),                          # yasal olmayan hafıza hamlesi
+        "geçersiz fen",
+    ]
+
+    moves = student.get_moves(positions)
+    print(f"Toplu hamleler: {moves}")
+    assert moves[:3] == ["e2e4", "b1c3", "b1c3"]
+    assert moves[3] is not None and chess.Move.from_uci(moves[3]) in stale.legal_moves and moves[3] != "e2e5"
+    assert moves[4] is None
+    assert not student.move_history and not student.position_history
+    assert moves[1] == student.get_move(learned.fen())
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_transpositions_and_move_counters()
+    test_vectorized_keys_match_position_key()
+    test_index_merges()
+    test_batch_get_moves()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# tests/test_records.py
+
+import sys
+import os
+import json
+import tempfile
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import numpy as np
+from src.memory_tokenizer import MemoryTokenizer
+from src.records import AlternativeMove, PositionMemory, TokenizedMemory, to_jsonable
+
+LEGACY_MEMORY = {
+    "position": "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "best_move": "e2e4",
+    "evaluation": 0.3,
+    "depth": 12,
+    "principal_variation": ["e2e4", "e7e5"],
+    "alternative_moves": [{"move": "d2d4", "evaluation": 0.25}],
+    "timestamp": 1700000000.0
+}
+
+def test_legacy_access():
+    """Kayıtlar eski dict erişimiyle okunabilmeli ve dict'e dönmeli"""
+    print("\n=== Record Test ===")
+    memory = PositionMemory.from_dict(LEGACY_MEMORY)
+    assert not hasattr(memory, '__dict__')  # __slots__
+    assert memory["best_move"] == memory.best_move == "e2e4"
+    assert memory.get("missing", 1) == 1 and "depth" in memory
+    assert memory["alternative_moves"][0]["move"] == "d2d4"
+    assert isinstance(memory.alternative_moves[0], AlternativeMove)
+    assert memory.to_dict() == LEGACY_MEMORY and memory == LEGACY_MEMORY
+    assert json.loads(json.dumps(memory, default=to_jsonable)) == LEGACY_MEMORY
+
+def test_tokenized_records():
+    """Token kayıtları dizi görünümü tutmalı, JSON'dan kayıt olarak yüklenmeli"""
+    tokenizer = MemoryTokenizer()
+    package = {"metadata": {}, "memories": {"pos_0": PositionMemory.from_dict(LEGACY_MEMORY)}}
+    tokenized = tokenizer.tokenize_stockfish_memory(package)
+    tokens = tokenized["tokenized_memories"]["pos_0"]
+    assert isinstance(tokens, TokenizedMemory)
+    assert isinstance(tokens.position_tokens, np.ndarray)
+    assert tokens["metadata"]["original_position"] == LEGACY_MEMORY["position"]
+    assert tokens.pv_tokens.shape == (2, 5)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        filename = os.path.join(temp_dir, "records.tokens")
+        tokenizer.save_tokenized_package(tokenized, filename)
+        loaded = tokenizer.load_tokenized_package(filename)
+    assert loaded["tokenized_memories"]["pos_0"] == tokens
+
+    memory = tokenizer._memory_from_tokens(tokens.to_dict())
+    print(f"Geri çözülen hafıza: {memory}")
+    assert memory.best_move == "e2e4" and memory.principal_variation == ["e2e4", "e7e5"]
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_legacy_access()
+    test_tokenized_records()
+
+if __name__ == "__main__":
+    main()
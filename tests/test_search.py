@@ -0,0 +1,44 @@
+# tests/test_search.py
+
+import sys
+import os
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+from src.chess_agents import StudentAgent
+
+def test_finds_mate_in_one():
+    """Arama bir hamlede matı bulmalı"""
+    print("\n=== Search Mate Test ===")
+    student = StudentAgent("Search Student")
+    board = chess.Board("r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4")
+    move = student._calculate_best_move(board)
+    print(f"Seçilen hamle: {move}, {student.search.last_stats}")
+    assert move == chess.Move.from_uci("h5f7")
+
+def test_wins_hanging_queen():
+    """Korumasız vezir alınmalı"""
+    student = StudentAgent("Search Student")
+    board = chess.Board("rnb1kbnr/ppp1pppp/8/3q4/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 0 3")
+    assert student._calculate_best_move(board) == chess.Move.from_uci("e4d5")
+
+def test_node_budget():
+    """Düğüm bütçesi aşılmamalı ve yine de yasal hamle dönmeli"""
+    student = StudentAgent("Search Student")
+    student.search.time_limit = None
+    student.search.node_limit = 200
+    board = chess.Board()
+    move = student._calculate_best_move(board)
+    assert move in board.legal_moves
+    assert student.search.last_stats['nodes'] <= 201
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_finds_mate_in_one()
+    test_wins_hanging_queen()
+    test_node_budget()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# tests/test_similarity.py
+
+import sys
+import os
+import random
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+import numpy as np
+from src.chess_agents import StudentAgent
+from src.memory_format import decode_move, encode_move
+from src.memory_tokenizer import MemoryTokenizer
+from src.similarity import PositionSimilarityIndex, board_bitboards
+
+LEARNED_FEN = "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+
+def test_similar_position_move():
+    """Hafızada olmayan ama benzer pozisyonda öğrenilen hamle kullanılmalı"""
+    print("\n=== Similarity Tier Test ===")
+    package = MemoryTokenizer().tokenize_stockfish_memory({
+        "metadata": {},
+        "memories": {"pos_0": {"position": LEARNED_FEN, "best_move": "f3g5", "evaluation": 0.4, "depth": 10}}
+    })
+    student = StudentAgent("Similar Student")
+    student.learn_from_tokenized_memory(package)
+
+    board = chess.Board(LEARNED_FEN)
+    board.push_uci("a2a3")
+    board.push_uci("a7a6")
+    assert student._get_memory_move(board.fen()) is None
+    print(f"Benzer pozisyon: {student.similarity.nearest(board)}")
+    assert student.similarity.nearest(board) == [("f3g5", 4)]
+    assert student.get_moves([board.fen()]) == ["f3g5"]
+
+    # Hamle yasal değilse kullanılmamalı
+    board.push_uci("f3h4")
+    board.push_uci("h7h6")
+    assert student.similarity.nearest(board) == []
+
+def test_lsh_matches_brute_force():
+    """LSH tabloları yakın pozisyonları kaba kuvvet ile aynı bulmalı"""
+    random.seed(7)
+    boards, moves = [], []
+    board = chess.Board()
+    while len(boards) < 2000:
+        legal = list(board.legal_moves)
+        if not legal or board.fullmove_number > 40:
+            board = chess.Board()
+            continue
+        move = random.choice(legal)
+        boards.append(board.copy(stack=False))
+        moves.append(encode_move(move.uci()))
+        board.push(move)
+
+    bitboards = np.array([board_bitboards(b) for b in boards])
+    turn = np.array([b.turn for b in boards])
+    brute = PositionSimilarityIndex()
+    lsh = PositionSimilarityIndex(brute_force_limit=0)
+    for index in (brute, lsh):
+        index.add_many(bitboards, turn, np.array(moves, dtype=np.uint16))
+
+    for board in random.sample(boards, 50):
+        assert lsh.nearest(board, k=1) == brute.nearest(board, k=1)
+
+def test_incremental_adds_keep_tables():
+    """Tablolar kurulduktan sonraki eklemeler tabloları silmemeli, tekrarlar eklenmemeli"""
+    random.seed(11)
+    boards, moves = [], []
+    board = chess.Board()
+    while len(boards) < 3000:
+        legal = list(board.legal_moves)
+        if not legal or board.fullmove_number > 40:
+            board = chess.Board()
+            continue
+        move = random.choice(legal)
+        boards.append(board.copy(stack=False))
+        moves.append(encode_move(move.uci()))
+        board.push(move)
+    bitboards = np.array([board_bitboards(b) for b in boards])
+    turn = np.array([b.turn for b in boards])
+    moves = np.array(moves, dtype=np.uint16)
+
+    lsh = PositionSimilarityIndex(brute_force_limit=0, merge_threshold=64)
+    brute = PositionSimilarityIndex()
+    lsh.add_many(bitboards[:2000], turn[:2000], moves[:2000])
+    brute.add_many(bitboards, turn, moves)
+    lsh.nearest(boards[0])
+    tables = lsh._bucket_hashes
+
+    # Tekli eklemeler önce bekleyen tampona, sonra mevcut kovalara girmeli
+    for board, move in zip(boards[2000:2100], moves[2000:2100]):
+        lsh.add(board, decode_move(move))
+    lsh.add_many(bitboards[2100:], turn[2100:], moves[2100:])
+    assert lsh._sampled_bits is not None and len(lsh._bucket_hashes) > len(tables)
+    for board in random.sample(boards, 50):
+        assert lsh.nearest(board, k=1) == brute.nearest(board, k=1)
+
+    size = len(lsh.bitboards) + len(lsh._pending)
+    lsh.add_many(bitboards, turn, moves)
+    for board, move in zip(boards[:10], moves[:10]):
+        lsh.add(board, decode_move(move))
+    lsh._merge()
+    print(f"Tekrar eklemeden sonra boyut: {len(lsh)}")
+    assert len(lsh) == size
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_similar_position_move()
+    test_lsh_matches_brute_force()
+    test_incremental_adds_keep_tables()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# tests/test_visualizer.py
+
+import sys
+import os
+import tempfile
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import chess
+import imageio.v3 as iio
+import numpy as np
+from src.visualizer import ChessVisualizer, FrameRenderer
+
+def test_frame_cache():
+    """Aynı pozisyon ve hamle önbellekten gelmeli"""
+    print("\n=== Frame Renderer Test ===")
+    renderer = FrameRenderer(size=200)
+    board = chess.Board()
+    frame = renderer.render(board, "e2e4")
+    assert frame.shape == (200, 200, 3) and frame.dtype == np.uint8
+    assert renderer.render(board, "e2e4") is frame
+    assert not np.array_equal(renderer.render(board), frame)
+    print(f"Önbellek: {renderer.hits} isabet, {renderer.misses} ıska")
+    assert renderer.hits == 1 and renderer.misses == 2
+
+def test_animation_without_temp_files():
+    """Animasyon geçici dosya olmadan yazılmalı"""
+    board = chess.Board()
+    positions, moves = [], []
+    for move in ["e2e4", "e7e5", "g1f3", "b8c6"]:
+        positions.append(board.fen())
+        moves.append(move)
+        board.push_uci(move)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        visualizer = ChessVisualizer(output_dir)
+        output_path = visualizer.create_learning_animation(positions, moves)
+        assert os.listdir(output_dir) == ["game_animation.gif"]
+        frames = iio.imread(output_path)
+        assert frames.shape[0] == len(moves)
+
+def main():
+    """Tüm testleri çalıştır"""
+    test_frame_cache()
+    test_animation_without_temp_files()
+
+if __name__ == "__main__":
+    main()